@@ -0,0 +1,95 @@
+"""
+Startup cost of `python -m smart_contracts` for actions that never touch a network.
+
+Each run is a fresh interpreter that imports the CLI module and discovers contracts,
+which is everything `build` does before it starts compiling. Reports wall-clock
+times as JSON and fails if any deploy-stack module was imported along the way, so
+a stray top-level import is caught before it slows every build down.
+
+Usage: python -m benchmarks.cli_startup --runs 20 --output startup.json
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+
+# Modules only deploy and profile may load
+FORBIDDEN_MODULES = ("algokit_utils", "algosdk", "dotenv")
+
+_PROBE = """
+import json, sys
+import smart_contracts.__main__ as cli
+contracts = cli.discover_contracts()
+print(json.dumps({"contracts": [c.name for c in contracts], "modules": sorted(sys.modules)}))
+"""
+
+
+def _run_probe() -> tuple[float, dict[str, Any]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(result.stdout.splitlines()[-1])
+
+
+def measure_startup(runs: int = 10) -> dict[str, Any]:
+    """Times runs fresh imports of the CLI and lists forbidden modules they loaded."""
+    timings = []
+    loaded: set[str] = set()
+    contracts: list[str] = []
+    for _ in range(runs):
+        elapsed, probe = _run_probe()
+        timings.append(elapsed)
+        contracts = probe["contracts"]
+        loaded.update(
+            module
+            for module in probe["modules"]
+            if module.split(".")[0] in FORBIDDEN_MODULES
+        )
+    return {
+        "benchmark": "cli_startup",
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "contracts": contracts,
+        "median_seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "max_seconds": max(timings),
+        "forbidden_modules_loaded": sorted(loaded),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = measure_startup(args.runs)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    if report["forbidden_modules_loaded"]:
+        logger.error(f"Build path imported {', '.join(report['forbidden_modules_loaded'])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
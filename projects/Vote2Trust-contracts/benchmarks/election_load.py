@@ -0,0 +1,303 @@
+"""
+In-process load test of a full Vote2Trust election on algorand-python-testing:
+create_poll -> register_voter xN -> commit_vote xN -> reveal_vote xN -> complete_voting.
+
+Reports wall-clock throughput per phase, plus storage growth (box and local state
+bytes and the min balance they lock) after each bulk phase, as JSON so results can be
+compared between contract revisions. Every phase also records the process's peak
+resident set size (ru_maxrss) after it and how far the phase raised it, which costs
+one getrusage call. Phases are timed with allocation tracing off; --trace-memory adds
+each phase's peak traced Python allocations, measured in a second run of the same
+election. --voter-storage box runs the same election with voter records in app
+boxes instead of voters' local state, for a side-by-side cost.
+
+Usage: python -m benchmarks.election_load --voters 100000 --output results.json
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from algopy import Account, Bytes, String, UInt64, arc4, op
+from algopy_testing import AlgopyTestContext, algopy_testing_context
+
+from smart_contracts.v_t.commitments import commitment
+from smart_contracts.v_t.contract import Vote2Trust
+from smart_contracts.v_t.storage import VOTER_STORAGE_BOX, VOTER_STORAGE_LOCAL, voter_local_min_balance
+
+logger = logging.getLogger(__name__)
+
+MAX_VOTERS = 100_000
+VOTER_STORAGE = {"local": VOTER_STORAGE_LOCAL, "box": VOTER_STORAGE_BOX}
+COMMIT_DURATION = 3600
+REVEAL_DURATION = 3600
+# Phases with one call per voter. Storage only grows in these, and reading it loops
+# over every voter, so it is recorded after them alone
+BULK_PHASES = ("register_voter", "commit_vote", "reveal_vote")
+
+# Protocol min balance costs, in microalgos
+ACCOUNT_MIN_BALANCE = 100_000
+BOX_FLAT_MIN_BALANCE = 2_500
+BOX_BYTE_MIN_BALANCE = 400
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+MAX_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+@dataclasses.dataclass
+class PhaseResult:
+    name: str
+    operations: int
+    seconds: float
+    operations_per_second: float
+    storage: dict[str, int] | None
+    max_rss_bytes: int
+    max_rss_growth_bytes: int
+    peak_memory_bytes: int | None = None
+
+
+class Election:
+    """Drives one poll on a Vote2Trust instance inside a testing context."""
+
+    def __init__(
+        self, ctx: AlgopyTestContext, voters: int, options: int, seed: int, voter_storage: int
+    ) -> None:
+        self.ctx = ctx
+        self.options = options
+        self.voter_storage = voter_storage
+        self.rng = random.Random(seed)
+        self.contract = Vote2Trust()
+        self.app = ctx.ledger.get_app(self.contract)
+        self.admin = ctx.default_sender
+        # Only local state voters opt in, box voters call the app directly
+        opted_apps = [self.app] if voter_storage == VOTER_STORAGE_LOCAL else []
+        self.voters = [ctx.any.account(opted_apps=opted_apps) for _ in range(voters)]
+        self.choices = [self.rng.randrange(options) for _ in range(voters)]
+        self.salts = [self.rng.randbytes(32) for _ in range(voters)]
+        self.poll_id = UInt64(0)
+        self.now = int(time.time())
+
+    def _as(self, sender: Account) -> Any:
+        return self.ctx.txn.create_group(active_txn_overrides={"sender": sender})
+
+    def _set_time(self, timestamp: int) -> None:
+        self.ctx.ledger.patch_global_fields(latest_timestamp=timestamp)
+
+    def create_poll(self) -> None:
+        self._set_time(self.now)
+        with self._as(self.admin):
+            self.poll_id = self.contract.create_poll(
+                String("Load test poll"),
+                String("Synthetic election"),
+                arc4.DynamicArray(*(arc4.String(f"Option {i}") for i in range(self.options))),
+                UInt64(COMMIT_DURATION),
+                UInt64(REVEAL_DURATION),
+            )
+            self.contract.start_registration(
+                self.poll_id, Bytes(b""), UInt64(0), UInt64(self.voter_storage)
+            )
+
+    def register_voter(self, index: int) -> None:
+        with self._as(self.voters[index]):
+            self.contract.register_voter(self.poll_id)
+
+    def commit_vote(self, index: int) -> None:
+        vote_hash = commitment(self.choices[index], self.salts[index])
+        with self._as(self.voters[index]):
+            self.contract.commit_vote(self.poll_id, Bytes(vote_hash), Bytes(b""))
+
+    def reveal_vote(self, index: int) -> None:
+        with self._as(self.voters[index]):
+            self.contract.reveal_vote(self.poll_id, UInt64(self.choices[index]), Bytes(self.salts[index]))
+
+    def start_commit_phase(self) -> None:
+        with self._as(self.admin):
+            self.contract.start_commit_phase(self.poll_id)
+
+    def start_reveal_phase(self) -> None:
+        with self._as(self.admin):
+            self.contract.start_reveal_phase(self.poll_id)
+
+    def complete_voting(self) -> None:
+        self._set_time(self.now + COMMIT_DURATION + REVEAL_DURATION + 1)
+        with self._as(self.admin):
+            self.contract.complete_voting(self.poll_id)
+
+    def box_keys(self) -> list[bytes]:
+        poll_key = self.poll_id.value.to_bytes(8, "big")
+        keys = [prefix + poll_key for prefix in (b"p", b"i", b"o", b"t")]
+        if self.voter_storage == VOTER_STORAGE_BOX:
+            keys.extend(b"v" + poll_key + voter.bytes.value for voter in self.voters)
+        return keys
+
+    def storage(self) -> dict[str, int]:
+        """Bytes held in boxes and voters' local state, and the min balance they lock."""
+        box_bytes = 0
+        box_min_balance = 0
+        for key in self.box_keys():
+            if self.ctx.ledger.box_exists(self.app, key):
+                size = len(key) + len(self.ctx.ledger.get_box(self.app, key))
+                box_bytes += size
+                box_min_balance += BOX_FLAT_MIN_BALANCE + BOX_BYTE_MIN_BALANCE * size
+
+        local_key = op.itob(self.poll_id)
+        local_bytes = 0
+        local_min_balance = 0
+        if self.voter_storage == VOTER_STORAGE_LOCAL:
+            for voter in self.voters:
+                value, exists = op.AppLocal.get_ex_bytes(voter, self.app, local_key)
+                if exists:
+                    local_bytes += len(local_key.value) + len(value.value)
+            local_min_balance = len(self.voters) * voter_local_min_balance()
+        return {
+            "box_bytes": box_bytes,
+            "box_min_balance": box_min_balance,
+            "local_state_bytes": local_bytes,
+            "voter_min_balance": local_min_balance + len(self.voters) * ACCOUNT_MIN_BALANCE,
+        }
+
+
+Phase = tuple[str, Callable[[int], None], int]
+
+
+def _phases(election: Election, voters: int) -> list[Phase]:
+    return [
+        ("create_poll", lambda _: election.create_poll(), 1),
+        ("register_voter", election.register_voter, voters),
+        ("start_commit_phase", lambda _: election.start_commit_phase(), 1),
+        ("commit_vote", election.commit_vote, voters),
+        ("start_reveal_phase", lambda _: election.start_reveal_phase(), 1),
+        ("reveal_vote", election.reveal_vote, voters),
+        ("complete_voting", lambda _: election.complete_voting(), 1),
+    ]
+
+
+def _max_rss() -> int:
+    """Peak resident set size of this process so far, in bytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAX_RSS_UNIT
+
+
+def _run_phase(
+    election: Election, name: str, operation: Callable[[int], None], count: int
+) -> PhaseResult:
+    rss_before = _max_rss()
+    start = time.perf_counter()
+    for index in range(count):
+        operation(index)
+    seconds = time.perf_counter() - start
+    max_rss = _max_rss()
+    result = PhaseResult(
+        name=name,
+        operations=count,
+        seconds=seconds,
+        operations_per_second=count / seconds if seconds else float("inf"),
+        storage=election.storage() if name in BULK_PHASES else None,
+        max_rss_bytes=max_rss,
+        max_rss_growth_bytes=max_rss - rss_before,
+    )
+    logger.info(
+        f"{name}: {count} ops in {seconds:.2f}s ({result.operations_per_second:,.0f} ops/s),"
+        f" max RSS {max_rss / 2**20:,.0f} MiB (+{result.max_rss_growth_bytes / 2**20:,.0f})"
+    )
+    return result
+
+
+def _peak_memory(voters: int, options: int, seed: int, voter_storage: int) -> dict[str, int]:
+    """Peak traced memory of each phase, from a second run of the election with tracemalloc on."""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        with algopy_testing_context() as ctx:
+            election = Election(ctx, voters, options, seed, voter_storage)
+            for name, operation, count in _phases(election, voters):
+                tracemalloc.reset_peak()
+                for index in range(count):
+                    operation(index)
+                peaks[name] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_election(
+    voters: int,
+    options: int = 3,
+    seed: int = 0,
+    voter_storage: str = "local",
+    *,
+    trace_memory: bool = False,
+) -> dict[str, Any]:
+    """
+    Runs a full election with the given number of voters and returns the report. With
+    trace_memory, the election is run a second time under tracemalloc for each phase's
+    peak traced allocations.
+    """
+    if not 0 < voters <= MAX_VOTERS:
+        raise ValueError(f"voters must be between 1 and {MAX_VOTERS}")
+    with algopy_testing_context() as ctx:
+        election = Election(ctx, voters, options, seed, VOTER_STORAGE[voter_storage])
+        phases = [
+            _run_phase(election, name, operation, count)
+            for name, operation, count in _phases(election, voters)
+        ]
+    if trace_memory:
+        peaks = _peak_memory(voters, options, seed, VOTER_STORAGE[voter_storage])
+        for phase in phases:
+            phase.peak_memory_bytes = peaks[phase.name]
+    return {
+        "benchmark": "election_load",
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "voters": voters,
+        "options": options,
+        "seed": seed,
+        "voter_storage": voter_storage,
+        "phases": [dataclasses.asdict(phase) for phase in phases],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--voters", type=int, default=10_000)
+    parser.add_argument("--options", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--voter-storage", choices=sorted(VOTER_STORAGE), default="local")
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="also measure peak traced allocations, in a second run"
+    )
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(
+        run_election(args.voters, args.options, args.seed, args.voter_storage, trace_memory=args.trace_memory),
+        indent=2,
+    )
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
@@ -0,0 +1,243 @@
+"""
+Provisions funded, opted-in voter accounts for load-testing a deployed Vote2Trust app.
+
+Accounts are derived deterministically from a seed, so a load test can recreate the
+same keys with derive_accounts() instead of storing them. Funding payments and
+opt-ins are sent as full 16-transaction atomic groups through a bounded thread pool,
+all built from one suggested-params fetch, and confirmed with a single shared round
+watcher. With --poll-id the opt-in is a register_voter call, so accounts come out
+registered for that poll (it must be in its open registration phase). Add
+--voter-boxes for a poll that keeps voter records in boxes: accounts then register
+with a plain call and are funded without the opt-in and local state min balance.
+
+Usage: python -m benchmarks.provision --app-id 1234 --count 5000 --seed load-test
+"""
+
+import argparse
+import base64
+import dataclasses
+import hashlib
+import logging
+import os
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TypeVar
+
+from algosdk import abi, encoding, mnemonic, transaction
+from algosdk.v2client.algod import AlgodClient
+from nacl.signing import SigningKey
+
+from smart_contracts._helpers import clients
+from smart_contracts._helpers.confirmation import wait_for_confirmations
+from smart_contracts.v_t.storage import poll_box_key, voter_box_key, voter_local_min_balance
+
+logger = logging.getLogger(__name__)
+
+MAX_GROUP_SIZE = 16
+DEFAULT_CONCURRENCY = 8
+
+# Account minimum, the app opt-in and its local state slot, plus room for fees
+ACCOUNT_MIN_BALANCE = 100_000
+FEE_ALLOWANCE = 100_000
+DEFAULT_FUNDING = ACCOUNT_MIN_BALANCE + voter_local_min_balance() + FEE_ALLOWANCE
+# Voters of box-stored polls hold nothing of the app's, the app account pays for their records
+VOTER_BOX_FUNDING = ACCOUNT_MIN_BALANCE + FEE_ALLOWANCE
+
+REGISTER_VOTER = abi.Method.from_signature("register_voter(uint64)void")
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True)
+class VoterAccount:
+    address: str
+    private_key: str
+
+
+def derive_accounts(seed: str, count: int) -> list[VoterAccount]:
+    """The first count accounts for seed; the same seed always gives the same keys."""
+    accounts = []
+    for index in range(count):
+        signing_key = SigningKey(hashlib.sha256(f"{seed}:{index}".encode()).digest())
+        public_key = bytes(signing_key.verify_key)
+        accounts.append(
+            VoterAccount(
+                address=encoding.encode_address(public_key),
+                private_key=base64.b64encode(bytes(signing_key) + public_key).decode(),
+            )
+        )
+    return accounts
+
+
+def _groups(items: Sequence[T]) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), MAX_GROUP_SIZE):
+        yield items[start : start + MAX_GROUP_SIZE]
+
+
+def _suggested_params(algod: AlgodClient) -> transaction.SuggestedParams:
+    params = algod.suggested_params()
+    params.flat_fee = True
+    params.fee = params.min_fee
+    return params
+
+
+def _send_groups(
+    algod: AlgodClient,
+    groups: list[list[tuple[transaction.Transaction, str]]],
+    concurrency: int,
+) -> None:
+    """Signs and submits each group concurrently, then waits for all of them at once."""
+
+    def send(group: list[tuple[transaction.Transaction, str]]) -> list[str]:
+        txns = transaction.assign_group_id([txn for txn, _ in group])
+        signed = [txn.sign(private_key) for txn, (_, private_key) in zip(txns, group, strict=True)]
+        algod.send_transactions(signed)
+        return [txn.get_txid() for txn in txns]
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        txids = [txid for group_txids in pool.map(send, groups) for txid in group_txids]
+    # None of them can confirm before the earliest first valid round they were built with
+    first_round = min(txn.first_valid_round for group in groups for txn, _ in group)
+    wait_for_confirmations(algod, txids, first_round=first_round)
+
+
+def fund_accounts(
+    algod: AlgodClient,
+    params: transaction.SuggestedParams,
+    funder_address: str,
+    funder_key: str,
+    accounts: Sequence[VoterAccount],
+    amount: int,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    groups = [
+        [
+            (transaction.PaymentTxn(funder_address, params, account.address, amount), funder_key)
+            for account in group
+        ]
+        for group in _groups(accounts)
+    ]
+    _send_groups(algod, groups, concurrency)
+
+
+def opt_in_accounts(
+    algod: AlgodClient,
+    params: transaction.SuggestedParams,
+    app_id: int,
+    accounts: Sequence[VoterAccount],
+    *,
+    poll_id: int | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    if poll_id is None:
+        app_args: list[bytes] = []
+        boxes: list[tuple[int, bytes]] = []
+    else:
+        app_args = [REGISTER_VOTER.get_selector(), poll_id.to_bytes(8, "big")]
+        boxes = [(0, poll_box_key(poll_id))]
+    groups = [
+        [
+            (
+                transaction.ApplicationOptInTxn(
+                    account.address, params, app_id, app_args=app_args, boxes=boxes
+                ),
+                account.private_key,
+            )
+            for account in group
+        ]
+        for group in _groups(accounts)
+    ]
+    _send_groups(algod, groups, concurrency)
+
+
+def register_accounts(
+    algod: AlgodClient,
+    params: transaction.SuggestedParams,
+    app_id: int,
+    poll_id: int,
+    accounts: Sequence[VoterAccount],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    """Registers accounts for a poll with voter boxes; the app must be funded for the boxes."""
+    app_args = [REGISTER_VOTER.get_selector(), poll_id.to_bytes(8, "big")]
+    groups = [
+        [
+            (
+                transaction.ApplicationNoOpTxn(
+                    account.address,
+                    params,
+                    app_id,
+                    app_args=app_args,
+                    boxes=[(0, poll_box_key(poll_id)), (0, voter_box_key(poll_id, account.address))],
+                ),
+                account.private_key,
+            )
+            for account in group
+        ]
+        for group in _groups(accounts)
+    ]
+    _send_groups(algod, groups, concurrency)
+
+
+def _funder() -> tuple[str, str]:
+    if funder_mnemonic := os.getenv("FUNDER_MNEMONIC"):
+        private_key = mnemonic.to_private_key(funder_mnemonic)
+        return encoding.encode_address(base64.b64decode(private_key)[32:]), private_key
+
+    import algokit_utils
+
+    dispenser = algokit_utils.AlgorandClient.default_localnet().account.localnet_dispenser()
+    return dispenser.address, dispenser.private_key
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app-id", type=int, required=True)
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--seed", default="vote2trust-load-test")
+    parser.add_argument("--poll-id", type=int, help="register for this poll while opting in")
+    parser.add_argument(
+        "--voter-boxes", action="store_true", help="register for --poll-id, which keeps voters in boxes"
+    )
+    parser.add_argument("--amount", type=int, help="microalgos per account")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--algod-server", default=os.getenv("ALGOD_SERVER", "http://localhost"))
+    parser.add_argument("--algod-port", default=os.getenv("ALGOD_PORT", "4001"))
+    parser.add_argument("--algod-token", default=os.getenv("ALGOD_TOKEN", "a" * 64))
+    parser.add_argument("--out", type=Path, help="write the provisioned addresses here, one per line")
+    args = parser.parse_args()
+    if args.voter_boxes and args.poll_id is None:
+        parser.error("--voter-boxes needs --poll-id")
+    if args.amount is None:
+        args.amount = VOTER_BOX_FUNDING if args.voter_boxes else DEFAULT_FUNDING
+
+    algod = clients.algod_client(f"{args.algod_server}:{args.algod_port}", args.algod_token)
+    funder_address, funder_key = _funder()
+    accounts = derive_accounts(args.seed, args.count)
+    params = _suggested_params(algod)
+
+    fund_accounts(
+        algod, params, funder_address, funder_key, accounts, args.amount, concurrency=args.concurrency
+    )
+    logger.info(f"Funded {len(accounts)} accounts with {args.amount} microalgos each")
+    if args.voter_boxes:
+        register_accounts(
+            algod, params, args.app_id, args.poll_id, accounts, concurrency=args.concurrency
+        )
+        logger.info(f"Registered {len(accounts)} accounts for poll {args.poll_id}")
+    else:
+        opt_in_accounts(
+            algod, params, args.app_id, accounts, poll_id=args.poll_id, concurrency=args.concurrency
+        )
+        logger.info(f"Opted {len(accounts)} accounts into app {args.app_id}")
+    if args.out:
+        args.out.write_text("".join(f"{account.address}\n" for account in accounts))
+    clients.log_stats()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
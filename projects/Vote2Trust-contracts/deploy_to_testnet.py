@@ -7,29 +7,27 @@ import os
 import sys
 import time
 from algosdk import account, mnemonic
-from algosdk.v2client import algod
 from algosdk import transaction
 from algosdk import constants
 
+from smart_contracts._helpers import clients, telemetry
+from smart_contracts._helpers.confirmation import wait_for_confirmations
+
 # Testnet configuration
 ALGOD_ADDRESS = "https://testnet-api.algonode.cloud"
 ALGOD_TOKEN = ""
 
 def get_algod_client():
-    """Create Algorand client"""
-    return algod.AlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+    """Create Algorand client on the shared pooled transport"""
+    return clients.algod_client(ALGOD_ADDRESS, ALGOD_TOKEN)
 
-def wait_for_confirmation(client, txid):
-    """Wait for transaction confirmation"""
-    last_round = client.status().get('last-round')
-    txinfo = client.pending_transaction_info(txid)
-    while not (txinfo.get('confirmed-round') and txinfo.get('confirmed-round') > 0):
-        print("Waiting for confirmation...")
-        last_round += 1
-        client.status_after_block(last_round)
-        txinfo = client.pending_transaction_info(txid)
-    print(f"Transaction {txid} confirmed in round {txinfo.get('confirmed-round')}")
-    return txinfo
+def wait_for_confirmation(client, *txids, first_round=None):
+    """Wait for one or more transactions to confirm, sharing a single round watcher"""
+    print("Waiting for confirmation...")
+    txinfos = wait_for_confirmations(client, txids, first_round=first_round)
+    for txid, txinfo in zip(txids, txinfos):
+        print(f"Transaction {txid} confirmed in round {txinfo.get('confirmed-round')}")
+    return txinfos[0] if len(txinfos) == 1 else txinfos
 
 def create_voting_contract():
     """Create a simple voting contract using Application Call transactions"""
@@ -71,42 +69,47 @@ def create_voting_contract():
     # In a real implementation, you would compile and deploy the actual smart contract
     
     try:
-        # Get suggested parameters
-        params = client.suggested_params()
-        params.flat_fee = True
-        params.fee = constants.MIN_TXN_FEE
-        
-        # Create a simple application call transaction
-        # This simulates deploying a voting contract
-        app_args = [
-            b"Vote2Trust",
-            b"Deploy",
-            b"Sample Governance Vote",
-            b"Should we implement the new feature X in our protocol?",
-            b'["Yes", "No", "Abstain"]'
-        ]
-        
-        txn = transaction.ApplicationCallTxn(
-            sender=deployer_address,
-            sp=params,
-            index=0,  # 0 means create new application
-            on_complete=transaction.OnComplete.NoOpOC,
-            app_args=app_args,
-            accounts=None,
-            foreign_apps=None,
-            foreign_assets=None,
-            note=b"Vote2Trust Contract Deployment"
-        )
+        with telemetry.timed("deploy_testnet", "build"):
+            # Get suggested parameters
+            params = client.suggested_params()
+            params.flat_fee = True
+            params.fee = constants.MIN_TXN_FEE
+            
+            # Create a simple application call transaction
+            # This simulates deploying a voting contract
+            app_args = [
+                b"Vote2Trust",
+                b"Deploy",
+                b"Sample Governance Vote",
+                b"Should we implement the new feature X in our protocol?",
+                b'["Yes", "No", "Abstain"]'
+            ]
+            
+            txn = transaction.ApplicationCallTxn(
+                sender=deployer_address,
+                sp=params,
+                index=0,  # 0 means create new application
+                on_complete=transaction.OnComplete.NoOpOC,
+                app_args=app_args,
+                accounts=None,
+                foreign_apps=None,
+                foreign_assets=None,
+                note=b"Vote2Trust Contract Deployment"
+            )
         
         # Sign and send transaction
-        signed_txn = txn.sign(private_key)
-        txid = client.send_transaction(signed_txn)
+        with telemetry.timed("deploy_testnet", "sign"):
+            signed_txn = txn.sign(private_key)
+        with telemetry.timed("deploy_testnet", "submit"):
+            txid = client.send_transaction(signed_txn)
         
         print(f"📝 Transaction ID: {txid}")
         print("⏳ Waiting for confirmation...")
         
         # Wait for confirmation
-        confirmed_txn = wait_for_confirmation(client, txid)
+        with telemetry.timed("deploy_testnet", "confirm"):
+            confirmed_txn = wait_for_confirmation(client, txid, first_round=params.first)
+        telemetry.record_fee("deploy_testnet", txn.fee)
         
         # Get the created application ID
         app_id = confirmed_txn.get('application-index')
@@ -148,6 +151,7 @@ def main():
     load_dotenv()
     
     contract_info = create_voting_contract()
+    telemetry.flush()
     
     if contract_info:
         print("\n" + "=" * 60)
@@ -1,58 +1,91 @@
+import argparse
 import dataclasses
+import functools
+import graphlib
 import importlib
+import io
 import logging
-import subprocess
 import sys
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 from shutil import rmtree
+from types import ModuleType
+from typing import TYPE_CHECKING
 
-from algokit_utils.config import config
-from dotenv import load_dotenv
+from smart_contracts._helpers import build_cache, build_worker
 
-# Set trace_all to True to capture all transactions, defaults to capturing traces only on failure
-# Learn more about using AlgoKit AVM Debugger to debug your TEAL source codes and inspect various kinds of
-# Algorand transactions in atomic groups -> https://github.com/algorandfoundation/algokit-avm-vscode-debugger
-config.configure(debug=True, trace_all=False)
+if TYPE_CHECKING:
+    from smart_contracts._helpers.profiler import ProfileStep
 
-# Set up logging and load environment variables.
+# Set up logging. Anything that needs algokit_utils or the environment is loaded by
+# the actions that use it, so building never pays for the deploy stack.
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s %(levelname)-10s: %(message)s"
 )
 logger = logging.getLogger(__name__)
-logger.info("Loading .env")
-load_dotenv()
 
 # Determine the root path based on this file's location.
 root_path = Path(__file__).parent
 
+# Actions that talk to a network and need algokit_utils configured and .env loaded
+NETWORK_ACTIONS = ("deploy", "all", "profile")
+
+
+def configure_network_environment() -> None:
+    from algokit_utils.config import config
+    from dotenv import load_dotenv
+
+    # Set trace_all to True to capture all transactions, defaults to capturing traces only on failure
+    # Learn more about using AlgoKit AVM Debugger to debug your TEAL source codes and inspect various kinds of
+    # Algorand transactions in atomic groups -> https://github.com/algorandfoundation/algokit-avm-vscode-debugger
+    config.configure(debug=True, trace_all=False)
+    logger.info("Loading .env")
+    load_dotenv()
+
 # ----------------------- Contract Configuration ----------------------- #
 
 
+def import_config_if_exists(folder: Path, config_name: str) -> ModuleType | None:
+    """Imports a contract folder's config module (e.g. deploy_config) if it exists."""
+    if not (folder / f"{config_name}.py").exists():
+        return None
+    return importlib.import_module(f"{folder.parent.name}.{folder.name}.{config_name}")
+
+
 @dataclasses.dataclass
 class SmartContract:
+    """
+    A contract folder. Its deploy and profile hooks (and deploy dependencies) are only
+    imported the first time an action asks for them.
+    """
+
     path: Path
     name: str
-    deploy: Callable[[], None] | None = None
 
+    @functools.cached_property
+    def _deploy_config(self) -> ModuleType | None:
+        return import_config_if_exists(self.path.parent, "deploy_config")
 
-def import_contract(folder: Path) -> Path:
-    """Imports the contract from a folder if it exists."""
-    contract_path = folder / "contract.py"
-    if contract_path.exists():
-        return contract_path
-    else:
-        raise Exception(f"Contract not found in {folder}")
+    @functools.cached_property
+    def deploy(self) -> Callable[[], None] | None:
+        """The deploy function from deploy_config, if there is one."""
+        return getattr(self._deploy_config, "deploy", None)
 
+    @functools.cached_property
+    def depends_on(self) -> list[str]:
+        """
+        Names of contracts that must be deployed before this one, from an optional
+        `depends_on` list in its deploy_config module.
+        """
+        return list(getattr(self._deploy_config, "depends_on", []))
 
-def import_deploy_if_exists(folder: Path) -> Callable[[], None] | None:
-    """Imports the deploy function from a folder if it exists."""
-    try:
-        module_name = f"{folder.parent.name}.{folder.name}.deploy_config"
-        deploy_module = importlib.import_module(module_name)
-        return deploy_module.deploy  # type: ignore[no-any-return, misc]
-    except ImportError:
-        return None
+    @functools.cached_property
+    def profile(self) -> "Callable[..., Iterator[ProfileStep]] | None":
+        """The profile_steps function from profile_config, if there is one."""
+        profile_config = import_config_if_exists(self.path.parent, "profile_config")
+        return getattr(profile_config, "profile_steps", None)
 
 
 def has_contract_file(directory: Path) -> bool:
@@ -60,22 +93,37 @@ def has_contract_file(directory: Path) -> bool:
     return (directory / "contract.py").exists()
 
 
-# Use the current directory (root_path) as the base for contract folders and exclude
-# folders that start with '_' (internal helpers).
-contracts: list[SmartContract] = [
-    SmartContract(
-        path=import_contract(folder),
-        name=folder.name,
-        deploy=import_deploy_if_exists(folder),
-    )
-    for folder in root_path.iterdir()
-    if folder.is_dir() and has_contract_file(folder) and not folder.name.startswith("_")
-]
+def discover_contracts(base_path: Path = root_path) -> list[SmartContract]:
+    """
+    Finds contract folders under base_path, excluding folders that start with '_'
+    (internal helpers). Nothing in them is imported.
+    """
+    return [
+        SmartContract(path=folder / "contract.py", name=folder.name)
+        for folder in sorted(base_path.iterdir())
+        if folder.is_dir() and has_contract_file(folder) and not folder.name.startswith("_")
+    ]
 
 # -------------------------- Build Logic -------------------------- #
 
 deployment_extension = "py"
 
+# How often the watch action checks contract sources for changes
+WATCH_INTERVAL_SECONDS = 0.2
+
+# Compiler flags; part of the build cache key so changing them forces a rebuild
+compile_flags = [
+    "--no-output-arc32",
+    "--output-arc56",
+    "--output-source-map",
+]
+
+
+def _build_key(contract_path: Path) -> build_cache.BuildKey:
+    return build_cache.compute_key(
+        contract_path, root_path.parent, [*compile_flags, deployment_extension]
+    )
+
 
 def _get_output_path(output_dir: Path, deployment_extension: str) -> Path:
     """Constructs the output path for the generated client file."""
@@ -86,35 +134,27 @@ def _get_output_path(output_dir: Path, deployment_extension: str) -> Path:
     )
 
 
-def build(output_dir: Path, contract_path: Path) -> Path:
+def _app_spec_path(output_dir: Path) -> Path:
+    return next(output_dir.glob("*.arc56.json"), output_dir)
+
+
+def build(output_dir: Path, contract_path: Path, force: bool = False) -> Path:
     """
     Builds the contract by exporting (compiling) its source and generating a client.
-    If the output directory already exists, it is cleared.
+    The build is skipped when the manifest in the output directory shows the artifacts
+    were produced from the same sources, toolchain and flags, unless force is set.
+    Otherwise the output directory is cleared first.
     """
     output_dir = output_dir.resolve()
+    key = _build_key(contract_path)
+    if not force and build_cache.is_up_to_date(output_dir, key):
+        logger.info(f"Artifacts for {contract_path} are up to date, skipping build")
+        return _app_spec_path(output_dir)
     if output_dir.exists():
         rmtree(output_dir)
     output_dir.mkdir(exist_ok=True, parents=True)
     logger.info(f"Exporting {contract_path} to {output_dir}")
-
-    build_result = subprocess.run(
-        [
-            "algokit",
-            "--no-color",
-            "compile",
-            "python",
-            str(contract_path.resolve()),
-            f"--out-dir={output_dir}",
-            "--no-output-arc32",
-            "--output-arc56",
-            "--output-source-map",
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
-    if build_result.returncode:
-        raise Exception(f"Could not build contract:\n{build_result.stdout}")
+    build_worker.compile_contract(contract_path.resolve(), output_dir, compile_flags)
 
     # Look for arc56.json files and generate the client based on them.
     app_spec_file_names: list[str] = [
@@ -129,54 +169,219 @@ def build(output_dir: Path, contract_path: Path) -> Path:
     else:
         for file_name in app_spec_file_names:
             client_file = file_name
-            print(file_name)
-            generate_result = subprocess.run(
-                [
-                    "algokit",
-                    "generate",
-                    "client",
-                    str(output_dir),
-                    "--output",
-                    str(_get_output_path(output_dir, deployment_extension)),
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
+            logger.info(f"Generating client for {file_name}")
+            build_worker.generate_client(
+                output_dir / file_name, _get_output_path(output_dir, deployment_extension)
             )
-            if generate_result.returncode:
-                if "No such command" in generate_result.stdout:
-                    raise Exception(
-                        "Could not generate typed client, requires AlgoKit 2.0.0 or later. Please update AlgoKit"
-                    )
-                else:
-                    raise Exception(
-                        f"Could not generate typed client:\n{generate_result.stdout}"
-                    )
+    build_cache.write_manifest(output_dir, key)
     if client_file:
         return output_dir / client_file
     return output_dir
 
 
+def verify_artifacts(output_dir: Path, contract_path: Path) -> None:
+    """Ensures the artifacts on disk match the current contract source without rebuilding."""
+    if not build_cache.is_up_to_date(output_dir, _build_key(contract_path)):
+        raise Exception(
+            f"Artifacts in {output_dir} are missing or out of date with {contract_path}, "
+            "run the build action first"
+        )
+
+
+def _build_with_captured_logs(
+    output_dir: Path, contract_path: Path, force: bool
+) -> tuple[str, Exception | None]:
+    """Runs build() in a pool worker, returning its log output instead of interleaving it."""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-10s: %(message)s"))
+    root_logger = logging.getLogger()
+    previous_handlers = root_logger.handlers[:]
+    root_logger.handlers = [handler]
+    try:
+        build(output_dir, contract_path, force)
+        return stream.getvalue(), None
+    except Exception as e:
+        return stream.getvalue(), e
+    finally:
+        root_logger.handlers = previous_handlers
+
+
+def _build_pool(jobs: int) -> ProcessPoolExecutor:
+    """Build workers that keep the compiler and client generator loaded between contracts."""
+    return ProcessPoolExecutor(max_workers=jobs, initializer=build_worker.warm_up)
+
+
+def deploy_order(contracts: list[SmartContract]) -> list[SmartContract]:
+    """
+    Orders contracts so each comes after the contracts it depends on. Dependencies outside
+    the given contracts are assumed to be deployed already.
+    """
+    by_name = {contract.name: contract for contract in contracts}
+    sorter = graphlib.TopologicalSorter(
+        {
+            contract.name: [name for name in contract.depends_on if name in by_name]
+            for contract in contracts
+        }
+    )
+    return [by_name[name] for name in sorter.static_order()]
+
+
+def build_all(
+    contracts: list[SmartContract],
+    artifact_path: Path,
+    *,
+    jobs: int = 1,
+    force: bool = False,
+    deploy: bool = False,
+) -> None:
+    """
+    Builds contracts, optionally deploying each one in dependency order. Compilation and
+    client generation run in up to jobs warm build workers, and each deploy starts as
+    soon as its own artifacts (and its dependencies' deploys) are done.
+    """
+    # Dependencies only matter for deploying, and reading them imports deploy_config
+    ordered = deploy_order(contracts) if deploy else contracts
+    pool = _build_pool(jobs)
+    try:
+        builds: dict[str, Future[tuple[str, Exception | None]]] = {
+            contract.name: pool.submit(
+                _build_with_captured_logs, artifact_path / contract.name, contract.path, force
+            )
+            for contract in ordered
+        }
+        for contract in ordered:
+            log_output, error = builds[contract.name].result()
+            logger.info(f"Build output for {contract.name}:")
+            sys.stderr.write(log_output)
+            if error is not None:
+                raise Exception(f"Could not build {contract.name}") from error
+            if deploy and contract.deploy:
+                logger.info(f"Deploying {contract.name}")
+                contract.deploy()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _source_mtimes(sources: list[Path]) -> dict[Path, int]:
+    return {path: path.stat().st_mtime_ns for path in sources if path.exists()}
+
+
+def watch(
+    contracts: list[SmartContract],
+    artifact_path: Path,
+    *,
+    jobs: int = 1,
+    interval: float = WATCH_INTERVAL_SECONDS,
+) -> None:
+    """
+    Rebuilds a contract whenever it, or a project module it imports, is saved, until
+    interrupted. Builds go to the same warm workers as build_all, so a rebuild only
+    costs the compile itself.
+    """
+    pool = _build_pool(jobs)
+    sources = {contract.name: [contract.path.resolve()] for contract in contracts}
+    seen: dict[str, dict[Path, int]] = {}
+    running: dict[str, Future[tuple[str, Exception | None]]] = {}
+    logger.info(f"Watching {', '.join(contract.name for contract in contracts)}")
+    try:
+        while True:
+            for contract in contracts:
+                mtimes = _source_mtimes(sources[contract.name])
+                if contract.name in running or seen.get(contract.name) == mtimes:
+                    continue
+                try:
+                    sources[contract.name] = build_cache.collect_sources(contract.path, root_path.parent)
+                    mtimes = _source_mtimes(sources[contract.name])
+                except SyntaxError:
+                    pass  # Keep the previous sources, the build reports the error
+                seen[contract.name] = mtimes
+                running[contract.name] = pool.submit(
+                    _build_with_captured_logs, artifact_path / contract.name, contract.path, False
+                )
+            for name, future in list(running.items()):
+                if future.done():
+                    del running[name]
+                    log_output, error = future.result()
+                    sys.stderr.write(log_output)
+                    if error is not None:
+                        logger.error(f"Could not build {name}: {error}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def profile_all(
+    contracts: list[SmartContract],
+    artifact_path: Path,
+    *,
+    threshold: float,
+    update_baseline: bool = False,
+) -> bool:
+    """
+    Simulates each contract's profile steps on LocalNet and compares opcode cost, fees
+    and state writes per ABI method with the baseline committed next to the contract.
+    Returns False if any method got more expensive than the baseline allows, or has
+    no baseline at all.
+    """
+    import algokit_utils
+
+    from smart_contracts._helpers import profiler
+
+    algorand = algokit_utils.AlgorandClient.default_localnet()
+    deployer = algorand.account.localnet_dispenser()
+    passed = True
+    for contract in contracts:
+        if not contract.profile:
+            continue
+        verify_artifacts(artifact_path / contract.name, contract.path)
+        logger.info(f"Profiling {contract.name}")
+        profiles = profiler.profile_contract(algorand, contract.profile(algorand, deployer))
+        contract_folder = contract.path.parent
+        if update_baseline:
+            profiler.write_baseline(contract_folder, profiles)
+            logger.info(f"Updated {contract_folder / profiler.BASELINE_FILE_NAME}")
+            continue
+        regressions = profiler.find_regressions(
+            profiles, profiler.load_baseline(contract_folder), threshold
+        )
+        for regression in regressions:
+            logger.error(f"{contract.name} cost regression: {regression}")
+        passed = passed and not regressions
+    return passed
+
+
 # --------------------------- Main Logic --------------------------- #
 
 
-def main(action: str, contract_name: str | None = None) -> None:
+def main(
+    action: str,
+    contract_name: str | None = None,
+    force: bool = False,
+    jobs: int = 1,
+    threshold: float = 0.05,
+    update_baseline: bool = False,
+) -> None:
     """Main entry point to build and/or deploy smart contracts."""
     artifact_path = root_path / "artifacts"
+    if action in NETWORK_ACTIONS:
+        configure_network_environment()
     # Filter contracts based on an optional specific contract name.
     filtered_contracts = [
         contract
-        for contract in contracts
+        for contract in discover_contracts()
         if contract_name is None or contract.name == contract_name
     ]
 
     match action:
         case "build":
-            for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                build(artifact_path / contract.name, contract.path)
+            build_all(filtered_contracts, artifact_path, jobs=jobs, force=force)
+        case "watch":
+            watch(filtered_contracts, artifact_path, jobs=jobs)
         case "deploy":
-            for contract in filtered_contracts:
+            for contract in deploy_order(filtered_contracts):
                 output_dir = artifact_path / contract.name
                 app_spec_file_name = next(
                     (
@@ -188,24 +393,58 @@ def main(action: str, contract_name: str | None = None) -> None:
                 )
                 if app_spec_file_name is None:
                     raise Exception("Could not deploy app, .arc56.json file not found")
+                verify_artifacts(output_dir, contract.path)
                 if contract.deploy:
                     logger.info(f"Deploying app {contract.name}")
                     contract.deploy()
         case "all":
-            for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                build(artifact_path / contract.name, contract.path)
-                if contract.deploy:
-                    logger.info(f"Deploying {contract.name}")
-                    contract.deploy()
+            build_all(
+                filtered_contracts, artifact_path, jobs=jobs, force=force, deploy=True
+            )
+        case "profile":
+            if not profile_all(
+                filtered_contracts,
+                artifact_path,
+                threshold=threshold,
+                update_baseline=update_baseline,
+            ):
+                sys.exit(1)
         case _:
             logger.error(f"Unknown action: {action}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        main(sys.argv[1], sys.argv[2])
-    elif len(sys.argv) > 1:
-        main(sys.argv[1])
-    else:
-        main("all")
+    parser = argparse.ArgumentParser(prog="python -m smart_contracts")
+    parser.add_argument("action", nargs="?", default="all")
+    parser.add_argument("contract_name", nargs="?")
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild even if artifacts are up to date"
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="build up to N contracts in parallel",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="profile: allowed cost increase over the baseline, as a fraction",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="profile: record the results as the new baseline",
+    )
+    args = parser.parse_args()
+    main(
+        args.action,
+        args.contract_name,
+        args.force,
+        args.jobs,
+        args.threshold,
+        args.update_baseline,
+    )
@@ -0,0 +1,141 @@
+import ast
+import dataclasses
+import hashlib
+import importlib.metadata
+import json
+import logging
+from collections.abc import Iterable
+from functools import cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = "build_manifest.json"
+MANIFEST_VERSION = 1
+
+# Packages whose versions change the compiled output or the generated client
+TOOLCHAIN_PACKAGES = ("puyapy", "algorand-python", "algokit-client-generator")
+
+
+@dataclasses.dataclass
+class BuildKey:
+    digest: str
+    sources: dict[str, str]
+    toolchain: dict[str, str]
+    flags: list[str]
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@cache
+def toolchain_versions() -> dict[str, str]:
+    """Versions of the compiler and client generator installed in this environment."""
+    versions = {}
+    for package in TOOLCHAIN_PACKAGES:
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = "unknown"
+    return versions
+
+
+def _resolve_module(name: str, project_root: Path) -> Path | None:
+    parts = project_root.joinpath(*name.split("."))
+    for candidate in (parts.with_suffix(".py"), parts / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _imported_modules(path: Path, project_root: Path) -> Iterable[Path]:
+    tree = ast.parse(path.read_text(), filename=str(path))
+    package = ".".join(path.parent.relative_to(project_root).parts)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                module = f"{base}.{node.module}" if node.module else base
+            else:
+                module = node.module or ""
+            names = [module] + [f"{module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        for name in names:
+            # Importing a module runs its parent packages' __init__ first
+            parts = name.split(".")
+            for depth in range(1, len(parts) + 1):
+                if resolved := _resolve_module(".".join(parts[:depth]), project_root):
+                    yield resolved
+
+
+def collect_sources(contract_path: Path, project_root: Path) -> list[Path]:
+    """The contract file plus every project module it (transitively) imports."""
+    project_root = project_root.resolve()
+    pending = [contract_path.resolve()]
+    seen: set[Path] = set()
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        pending.extend(_imported_modules(path, project_root))
+    return sorted(seen)
+
+
+def compute_key(contract_path: Path, project_root: Path, flags: list[str]) -> BuildKey:
+    """Hashes everything that determines a contract's build output."""
+    sources = {
+        str(path.relative_to(project_root.resolve())): _sha256(path)
+        for path in collect_sources(contract_path, project_root)
+    }
+    toolchain = toolchain_versions()
+    payload = json.dumps(
+        {"sources": sources, "toolchain": toolchain, "flags": flags}, sort_keys=True
+    )
+    return BuildKey(
+        digest=hashlib.sha256(payload.encode()).hexdigest(),
+        sources=sources,
+        toolchain=toolchain,
+        flags=flags,
+    )
+
+
+def read_manifest(output_dir: Path) -> dict | None:
+    manifest_path = output_dir / MANIFEST_FILE_NAME
+    if not manifest_path.is_file():
+        return None
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except json.JSONDecodeError:
+        logger.warning(f"Ignoring unreadable build manifest {manifest_path}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest  # type: ignore[no-any-return]
+
+
+def write_manifest(output_dir: Path, key: BuildKey) -> None:
+    """Records the build key and a hash of every artifact produced for it."""
+    artifacts = {
+        path.name: _sha256(path)
+        for path in sorted(output_dir.iterdir())
+        if path.is_file() and path.name != MANIFEST_FILE_NAME
+    }
+    manifest = {"version": MANIFEST_VERSION, **dataclasses.asdict(key), "artifacts": artifacts}
+    (output_dir / MANIFEST_FILE_NAME).write_text(json.dumps(manifest, indent=2) + "\n")
+
+
+def is_up_to_date(output_dir: Path, key: BuildKey) -> bool:
+    """True when the artifacts on disk were built from exactly this key and are unmodified."""
+    manifest = read_manifest(output_dir)
+    if manifest is None or manifest.get("digest") != key.digest:
+        return False
+    artifacts: dict[str, str] = manifest.get("artifacts", {})
+    return bool(artifacts) and all(
+        (output_dir / name).is_file() and _sha256(output_dir / name) == digest
+        for name, digest in artifacts.items()
+    )
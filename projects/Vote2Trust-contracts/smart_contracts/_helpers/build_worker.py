@@ -0,0 +1,101 @@
+"""
+Compiler and client generator calls for build(), made inside the calling process.
+
+puyapy and algokit-client-generator are dev dependencies of this project, so instead
+of paying a fresh `algokit` and compiler start-up per contract, a worker that has
+imported them once (see warm_up) compiles and generates clients in-process. When
+either package is not importable from this environment the algokit CLI is used as
+before.
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import re
+import runpy
+import subprocess
+import sys
+from functools import cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def _run_puyapy(args: list[str]) -> tuple[int, str]:
+    """Runs the puyapy command line in this interpreter, returning its exit code and output."""
+    output = io.StringIO()
+    argv = sys.argv
+    sys.argv = ["puyapy", *args]
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            runpy.run_module("puyapy", run_name="__main__", alter_sys=True)
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    finally:
+        sys.argv = argv
+    return code, output.getvalue()
+
+
+def warm_up() -> None:
+    """Imports the compiler and client generator so the first build does not pay for it."""
+    if _has_module("puyapy"):
+        _run_puyapy(["--version"])
+    if _has_module("algokit_client_generator"):
+        import algokit_client_generator.writer  # noqa: F401
+
+
+def compile_contract(contract_path: Path, output_dir: Path, flags: list[str]) -> None:
+    args = [str(contract_path), f"--out-dir={output_dir}", *flags]
+    if _has_module("puyapy"):
+        code, output = _run_puyapy(args)
+    else:
+        result = subprocess.run(
+            ["algokit", "--no-color", "compile", "python", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        code, output = result.returncode, result.stdout
+    if code:
+        raise Exception(f"Could not build contract:\n{output}")
+
+
+def _snake_case(name: str) -> str:
+    # Same conversion `algokit generate client` applies to {contract_name}
+    name = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", name.replace("-", " "))
+    name = re.sub(r"([a-z\d])([A-Z])", r"\1_\2", name)
+    return re.sub(r"[-\s]", "_", name).lower()
+
+
+def generate_client(app_spec_path: Path, output_pattern: Path) -> None:
+    """Writes the typed client for app_spec_path; output_pattern may contain {contract_name}."""
+    if _has_module("algokit_client_generator"):
+        from algokit_client_generator.writer import generate_client as write_client
+
+        contract_name = json.loads(app_spec_path.read_text())["name"]
+        write_client(
+            app_spec_path,
+            Path(str(output_pattern).format(contract_name=_snake_case(contract_name))),
+        )
+        return
+
+    result = subprocess.run(
+        ["algokit", "generate", "client", str(app_spec_path), "--output", str(output_pattern)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    if result.returncode:
+        if "No such command" in result.stdout:
+            raise Exception(
+                "Could not generate typed client, requires AlgoKit 2.0.0 or later. Please update AlgoKit"
+            )
+        raise Exception(f"Could not generate typed client:\n{result.stdout}")
@@ -0,0 +1,378 @@
+"""
+Algod and indexer clients that share pooled keep-alive connections per node.
+
+The SDK clients open a new HTTP connection for every request. Bulk operations then
+churn connections, and hosted nodes answer the bursts with 429s. The clients made
+here go through one Transport per node URL instead. A transport provides:
+- a bounded pool of persistent connections, which also caps concurrent requests;
+- an optional token-bucket rate limit;
+- jittered exponential retries on throttling and transient failures;
+- latency counters per endpoint.
+
+Limits come from the environment, per service prefix (ALGOD or INDEXER):
+<PREFIX>_MAX_CONNECTIONS, <PREFIX>_REQUESTS_PER_SECOND, <PREFIX>_BURST and
+<PREFIX>_MAX_RETRIES.
+"""
+
+import dataclasses
+import http.client
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+from algosdk.v2client.indexer import IndexerClient
+
+if TYPE_CHECKING:
+    import algokit_utils
+
+logger = logging.getLogger(__name__)
+
+# Throttled or briefly unavailable: the request was not processed, so any method may retry
+RETRY_ANY_STATUSES = (429, 503)
+# Gateway failures may hide a processed request, so only reads retry on them
+RETRY_READ_STATUSES = (502, 504)
+
+# Path segments that identify a resource rather than an endpoint (rounds, ids, addresses, txids)
+_RESOURCE_SEGMENT = re.compile(r"^(\d+|[A-Z2-7]{52}|[A-Z2-7]{58})$")
+
+
+@dataclasses.dataclass(frozen=True)
+class TransportSettings:
+    max_connections: int = 8
+    requests_per_second: float | None = None  # None disables rate limiting
+    burst: int | None = None  # Defaults to one second's worth of requests
+    max_retries: int = 4
+    backoff_base: float = 0.25
+    backoff_max: float = 8.0
+
+    @classmethod
+    def from_environment(cls, prefix: str) -> "TransportSettings":
+        def read(name: str, convert: type, default: Any) -> Any:
+            value = os.getenv(f"{prefix}_{name}")
+            return convert(value) if value else default
+
+        defaults = cls()
+        return cls(
+            max_connections=read("MAX_CONNECTIONS", int, defaults.max_connections),
+            requests_per_second=read("REQUESTS_PER_SECOND", float, defaults.requests_per_second),
+            burst=read("BURST", int, defaults.burst),
+            max_retries=read("MAX_RETRIES", int, defaults.max_retries),
+        )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclasses.dataclass
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.requests if self.requests else 0.0
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """e.g. GET /v2/accounts/{}/applications/{} for any account and app id."""
+    segments = parse.urlsplit(path).path.split("/")
+    return f"{method} " + "/".join(
+        "{}" if _RESOURCE_SEGMENT.match(segment) else segment for segment in segments
+    )
+
+
+class Transport:
+    """Pooled keep-alive HTTP for one node, shared by every client pointed at it."""
+
+    def __init__(self, base_url: str, settings: TransportSettings) -> None:
+        url = parse.urlsplit(base_url)
+        self.scheme = url.scheme
+        self.host = url.hostname or "localhost"
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+        self.settings = settings
+        self._slots = threading.BoundedSemaphore(settings.max_connections)
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue()
+        self._bucket = (
+            TokenBucket(settings.requests_per_second, settings.burst or max(1, int(settings.requests_per_second)))
+            if settings.requests_per_second
+            else None
+        )
+        self._stats: dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _connect(self, timeout: float) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def _send_once(
+        self, method: str, path: str, headers: dict[str, str], body: bytes | None, timeout: float
+    ) -> tuple[int, dict[str, str], bytes, float]:
+        """Returns the response and its latency, not counting the wait for a free connection."""
+        with self._slots:
+            start = time.perf_counter()
+            try:
+                connection, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self._connect(timeout), False
+            try:
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                try:
+                    connection.request(method, self.base_path + path, body=body, headers=headers)
+                    response = connection.getresponse()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    if not reused:
+                        raise
+                    # The node closed an idle keep-alive connection; retry once on a fresh one
+                    connection.close()
+                    connection = self._connect(timeout)
+                    connection.request(method, self.base_path + path, body=body, headers=headers)
+                    response = connection.getresponse()
+                data = response.read()
+            except BaseException:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._idle.put(connection)
+            return response.status, dict(response.getheaders()), data, time.perf_counter() - start
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        # Full jitter, so throttled clients do not retry in lockstep
+        return random.uniform(0, min(self.settings.backoff_max, self.settings.backoff_base * 2**attempt))
+
+    def _record(self, endpoint: str, seconds: float, *, error: bool = False, retry: bool = False) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.errors += int(error)
+            stats.retries += int(retry)
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def request(
+        self, method: str, path: str, headers: dict[str, str], body: bytes | None, timeout: float
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Sends the request, retrying transient failures; returns (status, headers, body)."""
+        endpoint = endpoint_name(method, path)
+        retryable = RETRY_ANY_STATUSES + (RETRY_READ_STATUSES if method == "GET" else ())
+        attempt = 0
+        while True:
+            if self._bucket:
+                self._bucket.acquire()
+            start = time.perf_counter()
+            try:
+                status, response_headers, data, seconds = self._send_once(
+                    method, path, headers, body, timeout
+                )
+            except OSError:
+                can_retry = method == "GET" and attempt < self.settings.max_retries
+                self._record(endpoint, time.perf_counter() - start, error=True, retry=can_retry)
+                if not can_retry:
+                    raise
+                time.sleep(self._backoff(attempt, None))
+                attempt += 1
+                continue
+            can_retry = status in retryable and attempt < self.settings.max_retries
+            self._record(endpoint, seconds, error=status >= 400, retry=can_retry)
+            if not can_retry:
+                return status, response_headers, data
+            time.sleep(self._backoff(attempt, response_headers.get("Retry-After")))
+            attempt += 1
+
+    def stats(self) -> dict[str, EndpointStats]:
+        with self._stats_lock:
+            return {endpoint: dataclasses.replace(stats) for endpoint, stats in self._stats.items()}
+
+
+_transports: dict[str, Transport] = {}
+_transports_lock = threading.Lock()
+
+
+def transport_for(base_url: str, settings: TransportSettings) -> Transport:
+    """The process-wide transport for base_url; the first caller's settings apply."""
+    with _transports_lock:
+        if base_url not in _transports:
+            _transports[base_url] = Transport(base_url, settings)
+        return _transports[base_url]
+
+
+def _json_message(data: bytes) -> tuple[str, dict[str, Any]]:
+    text = data.decode("utf-8", errors="replace")
+    try:
+        body = json.loads(text)
+        return body.get("message", text), body
+    except (ValueError, AttributeError):
+        return text, {}
+
+
+class PooledAlgodClient(AlgodClient):
+    """AlgodClient whose requests go through the node's shared Transport."""
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: dict[str, str] | None = None,
+        *,
+        settings: TransportSettings | None = None,
+    ) -> None:
+        super().__init__(algod_token, algod_address, headers)
+        self.transport = transport_for(
+            algod_address, settings or TransportSettings.from_environment("ALGOD")
+        )
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Any = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        response_format: str | None = "json",
+        timeout: int | None = 30,
+    ) -> Any:
+        header = {"User-Agent": "py-algorand-sdk", **(self.headers or {}), **(headers or {})}
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, _, body = self.transport.request(method, requrl, header, data, timeout or 30)
+        if status >= 400:
+            message, error_body = _json_message(body)
+            raise error.AlgodHTTPError(message, status, error_body.get("data"))
+        if response_format != "json":
+            return body
+        if not body:
+            # Some algod responses are an empty 200
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+
+
+class PooledIndexerClient(IndexerClient):
+    """IndexerClient whose requests go through the indexer's shared Transport."""
+
+    def __init__(
+        self,
+        indexer_token: str,
+        indexer_address: str,
+        headers: dict[str, str] | None = None,
+        *,
+        settings: TransportSettings | None = None,
+    ) -> None:
+        super().__init__(indexer_token, indexer_address, headers)
+        self.transport = transport_for(
+            indexer_address, settings or TransportSettings.from_environment("INDEXER")
+        )
+
+    def indexer_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Any = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: int = 30,
+    ) -> Any:
+        header = {"User-Agent": "py-algorand-sdk", **(self.headers or {}), **(headers or {})}
+        if requrl not in constants.no_auth and self.indexer_token:
+            header[constants.indexer_auth_header] = self.indexer_token
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, _, body = self.transport.request(method, requrl, header, data, timeout)
+        if status >= 400:
+            raise error.IndexerHTTPError(_json_message(body)[0])
+
+        def sort_keys(value: dict[str, Any]) -> dict[str, Any]:
+            return {
+                key: sort_keys(item) if isinstance(item, dict) else item
+                for key, item in sorted(value.items())
+            }
+
+        return sort_keys(json.loads(body))
+
+
+def algod_client(address: str, token: str = "", headers: dict[str, str] | None = None) -> PooledAlgodClient:
+    return PooledAlgodClient(token, address, headers)
+
+
+def algorand_client() -> "algokit_utils.AlgorandClient":
+    """AlgorandClient.from_environment(), with algod and indexer on pooled transports."""
+    import algokit_utils
+
+    configs = algokit_utils.ClientManager.get_config_from_environment_or_localnet()
+    algod = configs.algod_config
+    indexer = configs.indexer_config
+    return algokit_utils.AlgorandClient.from_clients(
+        algod=PooledAlgodClient(
+            algod.token or "", algod.full_url(), {"X-Algo-API-Token": algod.token or ""}
+        ),
+        indexer=(
+            PooledIndexerClient(
+                indexer.token or "", indexer.full_url(), {"X-Indexer-API-Token": indexer.token or ""}
+            )
+            if indexer
+            else None
+        ),
+        kmd=(
+            algokit_utils.ClientManager.get_kmd_client(configs.kmd_config)
+            if configs.kmd_config
+            else None
+        ),
+    )
+
+
+def log_stats() -> None:
+    """Logs request counts and latency per endpoint for every node used so far."""
+    for base_url, transport in list(_transports.items()):
+        for endpoint, stats in sorted(transport.stats().items()):
+            logger.info(
+                f"{base_url} {endpoint}: {stats.requests} requests, {stats.errors} errors, "
+                f"{stats.retries} retried, mean {stats.mean_seconds * 1000:.1f}ms, "
+                f"max {stats.max_seconds * 1000:.1f}ms"
+            )
@@ -0,0 +1,216 @@
+import asyncio
+import dataclasses
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from algosdk.v2client.algod import AlgodClient
+
+logger = logging.getLogger(__name__)
+
+# Same default as algosdk.transaction.wait_for_confirmation
+DEFAULT_WAIT_ROUNDS = 1000
+# Node errors while following the chain are retried with backoff; after this many
+# in a row every watched transaction fails instead
+MAX_SCAN_FAILURES = 10
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+
+
+class ConfirmationError(Exception):
+    """Raised for a transaction that was rejected or not confirmed in time."""
+
+    def __init__(self, txid: str, message: str) -> None:
+        super().__init__(f"Transaction {txid} {message}")
+        self.txid = txid
+
+
+@dataclasses.dataclass
+class _Watch:
+    future: "asyncio.Future[dict[str, Any]]"
+    first_round: int
+    last_round: int
+    # Seen in a block or expired, but its pending-info lookup has not succeeded yet
+    settling: bool = False
+
+
+class ConfirmationWatcher:
+    """
+    Waits for many submitted transactions at once. A single loop follows the chain
+    round by round, fetches each new block's transaction ids once, and resolves the
+    future of every watched transaction found in it, so the cost per round is constant
+    instead of one status/pending-info poll per transaction.
+
+    Scanning starts at first_round, which should be a round no later than the one the
+    transaction was submitted in (e.g. its first valid round). Without it, scanning
+    starts at the round current when the transaction is watched, and anything
+    confirmed before that is still resolved by a final pending-info lookup once its
+    wait_rounds run out.
+
+    Node errors are retried with backoff. After MAX_SCAN_FAILURES in a row the loop
+    stops, and every pending future gets the last error.
+
+    Usage:
+        async with ConfirmationWatcher(algod) as watcher:
+            infos = await watcher.wait_all(txids)
+    """
+
+    def __init__(self, algod: AlgodClient, *, wait_rounds: int = DEFAULT_WAIT_ROUNDS) -> None:
+        self.algod = algod
+        self.wait_rounds = wait_rounds
+        self._watches: dict[str, _Watch] = {}
+        self._new_watch = asyncio.Event()
+        # None while idle, so the next watch decides where scanning starts
+        self._next_round: int | None = None
+        self._rescan_from: int | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> "ConfirmationWatcher":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for watch in self._watches.values():
+            watch.future.cancel()
+        self._watches.clear()
+
+    async def watch_many(
+        self, txids: Iterable[str], *, first_round: int | None = None
+    ) -> list["asyncio.Future[dict[str, Any]]"]:
+        """
+        Starts watching txids, returning futures for their confirmed pending-info.
+        first_round is where scanning starts, by default the current round.
+        """
+        assert self._task is not None, "ConfirmationWatcher must be used as a context manager"
+        if self._task.done():
+            raise RuntimeError("ConfirmationWatcher stopped after repeated node errors")
+        current_round = (
+            first_round
+            if first_round is not None
+            else (await asyncio.to_thread(self.algod.status))["last-round"]
+        )
+        loop = asyncio.get_running_loop()
+        futures = []
+        for txid in txids:
+            if txid not in self._watches:
+                self._watches[txid] = _Watch(
+                    future=loop.create_future(),
+                    first_round=current_round,
+                    last_round=current_round + self.wait_rounds,
+                )
+            futures.append(self._watches[txid].future)
+        # The loop may already be past the first round, so have it scan from there again
+        self._rescan_from = min(self._rescan_from or current_round, current_round)
+        self._new_watch.set()
+        return futures
+
+    async def wait(self, txid: str, *, first_round: int | None = None) -> dict[str, Any]:
+        (future,) = await self.watch_many([txid], first_round=first_round)
+        return await future
+
+    async def wait_all(
+        self, txids: Iterable[str], *, first_round: int | None = None
+    ) -> list[dict[str, Any]]:
+        futures = await self.watch_many(txids, first_round=first_round)
+        return list(await asyncio.gather(*futures))
+
+    async def _settle(self, txid: str, watch: _Watch, expired: bool) -> None:
+        info = await asyncio.to_thread(self.algod.pending_transaction_info, txid)
+        if watch.future.done():
+            return
+        if info.get("confirmed-round", 0) > 0:
+            logger.debug(f"Transaction {txid} confirmed in round {info['confirmed-round']}")
+            watch.future.set_result(info)
+        elif info.get("pool-error"):
+            watch.future.set_exception(ConfirmationError(txid, f"rejected: {info['pool-error']}"))
+        elif expired:
+            watch.future.set_exception(
+                ConfirmationError(txid, f"not confirmed after {self.wait_rounds} rounds")
+            )
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            if not self._watches:
+                self._next_round = None
+                self._new_watch.clear()
+                await self._new_watch.wait()
+            if self._next_round is None:
+                # Nothing was watched while idle, so skip straight to the oldest new watch
+                self._next_round = min(watch.first_round for watch in self._watches.values())
+                self._rescan_from = None
+            try:
+                await self._scan()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if failures >= MAX_SCAN_FAILURES:
+                    logger.error(
+                        f"Giving up on {len(self._watches)} transaction(s) after {failures} node errors: {e}"
+                    )
+                    for watch in self._watches.values():
+                        if not watch.future.done():
+                            watch.future.set_exception(e)
+                    self._watches.clear()
+                    raise
+                delay = min(RETRY_BASE_SECONDS * 2 ** (failures - 1), RETRY_MAX_SECONDS)
+                logger.warning(
+                    f"Scanning round {self._next_round} failed ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _scan(self) -> None:
+        """Scans the next round and settles the transactions it confirms or expires."""
+        scan_round = self._next_round
+        assert scan_round is not None
+        status = await asyncio.to_thread(self.algod.status_after_block, scan_round - 1)
+        if status["last-round"] >= scan_round:
+            block = await asyncio.to_thread(self.algod.get_block_txids, scan_round)
+            self._next_round = min(scan_round + 1, self._rescan_from or scan_round + 1)
+            self._rescan_from = None
+            block_txids = set(block.get("blockTxids") or [])
+            expired = {
+                txid for txid, watch in self._watches.items()
+                if watch.last_round < scan_round and txid not in block_txids
+            }
+        else:
+            # status_after_block timed out before the round was made; only retry settles
+            block_txids = expired = set()
+
+        for txid, watch in self._watches.items():
+            if txid in block_txids or txid in expired:
+                watch.settling = True
+        settling = [(txid, watch) for txid, watch in self._watches.items() if watch.settling]
+        results = await asyncio.gather(
+            *(self._settle(txid, watch, expired=txid in expired) for txid, watch in settling),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for txid, watch in settling:
+            if watch.future.done():
+                del self._watches[txid]
+        if errors:
+            # Unsettled watches stay marked and are looked up again on the next scan
+            raise errors[0]
+
+
+def wait_for_confirmations(
+    algod: AlgodClient,
+    txids: Iterable[str],
+    *,
+    first_round: int | None = None,
+    wait_rounds: int = DEFAULT_WAIT_ROUNDS,
+) -> list[dict[str, Any]]:
+    """
+    Blocking helper for scripts: waits for every txid with one shared watcher,
+    scanning from first_round (e.g. the first valid round the txids were built with).
+    """
+
+    async def _wait() -> list[dict[str, Any]]:
+        async with ConfirmationWatcher(algod, wait_rounds=wait_rounds) as watcher:
+            return await watcher.wait_all(txids, first_round=first_round)
+
+    return asyncio.run(_wait())
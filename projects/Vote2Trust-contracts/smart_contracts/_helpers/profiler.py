@@ -0,0 +1,199 @@
+import base64
+import dataclasses
+import functools
+import json
+import logging
+from collections import Counter
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+import algokit_utils
+from algosdk.v2client.models import SimulateTraceConfig
+
+logger = logging.getLogger(__name__)
+
+BASELINE_FILE_NAME = "profile_baseline.json"
+# Fields compared against the baseline; a rise past the threshold is a regression
+COMPARED_FIELDS = ("opcode_cost", "min_fee", "state_reads", "state_writes")
+
+_STATE_TYPES = {"g": "global", "l": "local", "b": "box"}
+# Opcodes that read app state. Simulate traces state changes but not reads, so reads
+# are counted from the opcode at each traced program counter
+_READ_OPCODES = {
+    0x62: "local",  # app_local_get
+    0x63: "local",  # app_local_get_ex
+    0x64: "global",  # app_global_get
+    0x65: "global",  # app_global_get_ex
+    0xBA: "box",  # box_extract
+    0xBD: "box",  # box_len
+    0xBE: "box",  # box_get
+}
+
+
+@dataclasses.dataclass
+class ProfileStep:
+    """
+    One ABI method call to profile. build returns a composer holding the call (plus any
+    transactions it needs in its group); it is simulated for the profile and, unless
+    send is False (e.g. read-only methods), sent afterwards so later steps see its effects.
+    """
+
+    method: str
+    build: Callable[[], algokit_utils.TransactionComposer]
+    send: bool = True
+
+
+@dataclasses.dataclass
+class MethodProfile:
+    method: str
+    opcode_cost: int
+    budget_added: int
+    budget_headroom: int
+    transactions: int
+    min_fee: int
+    state_reads: int
+    reads_by_type: dict[str, int]
+    state_writes: int
+    writes_by_type: dict[str, int]
+    resources_accessed: dict[str, int]
+
+
+def _count_transactions(txn_results: list[dict[str, Any]]) -> int:
+    count = 0
+    for result in txn_results:
+        count += 1 + _count_transactions(
+            [{"txn-result": inner} for inner in result["txn-result"].get("inner-txns", [])]
+        )
+    return count
+
+
+def _state_changes(txn_results: list[dict[str, Any]]) -> Iterable[dict[str, Any]]:
+    for result in txn_results:
+        trace = result.get("exec-trace", {})
+        for step in trace.get("approval-program-trace", []) + trace.get("clear-state-program-trace", []):
+            yield from step.get("state-changes", [])
+
+
+def _state_reads(
+    txn_results: list[dict[str, Any]], approval_program: Callable[[int], bytes]
+) -> Counter[str]:
+    reads: Counter[str] = Counter()
+    for result in txn_results:
+        txn_result = result["txn-result"]
+        txn = txn_result["txn"]["txn"]
+        steps = result.get("exec-trace", {}).get("approval-program-trace", [])
+        if txn.get("type") != "appl" or not steps:
+            continue
+        # An app created in the group is not on chain yet; its program is in the call
+        program = (
+            base64.b64decode(txn["apap"])
+            if "apap" in txn
+            else approval_program(txn.get("apid") or txn_result["application-index"])
+        )
+        opcodes = (program[step["pc"]] for step in steps)
+        reads.update(_READ_OPCODES[opcode] for opcode in opcodes if opcode in _READ_OPCODES)
+    return reads
+
+
+def _resources_accessed(group: dict[str, Any]) -> dict[str, int]:
+    accessed = dict(group.get("unnamed-resources-accessed", {}))
+    for result in group["txn-results"]:
+        for key, values in result.get("unnamed-resources-accessed", {}).items():
+            accessed[key] = accessed.get(key, []) + values
+    return {key: len(values) for key, values in accessed.items() if isinstance(values, list)}
+
+
+def profile_step(
+    step: ProfileStep, min_fee_per_txn: int, approval_program: Callable[[int], bytes]
+) -> MethodProfile:
+    """
+    Simulates a step with execution tracing and summarises its cost. approval_program
+    returns a deployed app's approval program, to find the state reads in its trace.
+    """
+    result = step.build().simulate(
+        allow_unnamed_resources=True,
+        skip_signatures=True,
+        exec_trace_config=SimulateTraceConfig(enable=True, state_change=True),
+    )
+    group = result.simulate_response["txn-groups"][0]
+    if group.get("failure-message"):
+        raise Exception(f"Simulating {step.method} failed: {group['failure-message']}")
+
+    writes = Counter(
+        _STATE_TYPES.get(change["app-state-type"], change["app-state-type"])
+        for change in _state_changes(group["txn-results"])
+    )
+    reads = _state_reads(group["txn-results"], approval_program)
+    transactions = _count_transactions(group["txn-results"])
+    budget_added = group.get("app-budget-added", 0)
+    opcode_cost = group.get("app-budget-consumed", 0)
+    return MethodProfile(
+        method=step.method,
+        opcode_cost=opcode_cost,
+        budget_added=budget_added,
+        budget_headroom=budget_added - opcode_cost,
+        transactions=transactions,
+        min_fee=transactions * min_fee_per_txn,
+        state_reads=sum(reads.values()),
+        reads_by_type=dict(reads),
+        state_writes=sum(writes.values()),
+        writes_by_type=dict(writes),
+        resources_accessed=_resources_accessed(group),
+    )
+
+
+def profile_contract(
+    algorand: algokit_utils.AlgorandClient, steps: Iterable[ProfileStep]
+) -> dict[str, MethodProfile]:
+    """Profiles every step in order, sending each one after simulating it."""
+    min_fee_per_txn = algorand.get_suggested_params().min_fee
+
+    @functools.cache
+    def approval_program(app_id: int) -> bytes:
+        app = algorand.client.algod.application_info(app_id)
+        return base64.b64decode(app["params"]["approval-program"])  # type: ignore[index]
+
+    profiles: dict[str, MethodProfile] = {}
+    for step in steps:
+        profiles[step.method] = profile_step(step, min_fee_per_txn, approval_program)
+        logger.info(
+            f"{step.method}: {profiles[step.method].opcode_cost} opcodes, "
+            f"{profiles[step.method].min_fee} microalgo min fee"
+        )
+        if step.send:
+            step.build().send()
+    return profiles
+
+
+def load_baseline(folder: Path) -> dict[str, dict[str, Any]]:
+    path = folder / BASELINE_FILE_NAME
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())  # type: ignore[no-any-return]
+
+
+def write_baseline(folder: Path, profiles: dict[str, MethodProfile]) -> None:
+    baseline = {method: dataclasses.asdict(profile) for method, profile in sorted(profiles.items())}
+    (folder / BASELINE_FILE_NAME).write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def find_regressions(
+    profiles: dict[str, MethodProfile], baseline: dict[str, dict[str, Any]], threshold: float
+) -> list[str]:
+    """
+    Describes every compared field that grew by more than threshold (a fraction) over
+    the baseline. A method missing from the baseline is reported too, so an absent or
+    stale baseline fails instead of passing unchecked.
+    """
+    regressions = []
+    for method, profile in sorted(profiles.items()):
+        if method not in baseline:
+            regressions.append(f"{method}: no baseline, run profile with --update-baseline")
+            continue
+        for field in COMPARED_FIELDS:
+            before = baseline[method].get(field, 0)
+            after = getattr(profile, field)
+            if after > before * (1 + threshold):
+                regressions.append(f"{method}.{field}: {before} -> {after}")
+    return regressions
@@ -0,0 +1,289 @@
+"""
+Latency, fee and opcode-cost histograms for the transaction groups the deploy and
+admin flows send.
+
+send() replaces composer.send() and times each stage of a send separately:
+- build: suggested params, encoding, and resource population (a simulate);
+- sign: signing;
+- submit: posting the group to algod;
+- confirm: waiting for the group to confirm.
+Each send also records the fees the group paid. Failures are counted by the stage
+they failed in and raised through the composer's error transformers, as send()
+raises them. Histograms have fixed buckets, so memory stays constant however many
+sends are recorded, and each observation is a bisect under a lock.
+
+TELEMETRY_MODE selects the overhead:
+- off: plain composer.send();
+- basic: stage timing and fees, with no extra node requests (the default);
+- full: also simulates each signed group once to record its opcode cost.
+When TELEMETRY_FILE is set, flush() writes the metrics there as JSON if the name
+ends in .json, otherwise in the Prometheus text format (e.g. for node_exporter's
+textfile collector).
+"""
+
+import base64
+import bisect
+import contextlib
+import dataclasses
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import algokit_utils
+    from algosdk.v2client.algod import AlgodClient
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_BASIC = "basic"
+MODE_FULL = "full"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FEE_BUCKETS = (1_000, 2_000, 4_000, 8_000, 16_000, 32_000, 64_000, 128_000)
+# Each app call adds 700 to its group's opcode budget
+OPCODE_BUCKETS = (100, 350, 700, 1_400, 2_800, 5_600, 11_200)
+
+LATENCY_METRIC = "v2t_send_stage_seconds"
+FEE_METRIC = "v2t_send_fee_microalgos"
+OPCODE_METRIC = "v2t_send_opcode_cost"
+ERROR_METRIC = "v2t_send_errors_total"
+
+_HELP = {
+    LATENCY_METRIC: "Time spent in each stage of sending a transaction group.",
+    FEE_METRIC: "Fees paid by a sent transaction group.",
+    OPCODE_METRIC: "Opcode budget consumed by a sent transaction group.",
+    ERROR_METRIC: "Sends that failed, by the stage they failed in.",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class TelemetrySettings:
+    mode: str = MODE_BASIC
+    file: Path | None = None
+
+    @classmethod
+    def from_environment(cls) -> "TelemetrySettings":
+        mode = os.getenv("TELEMETRY_MODE") or MODE_BASIC
+        if mode not in (MODE_OFF, MODE_BASIC, MODE_FULL):
+            raise ValueError(f"TELEMETRY_MODE must be off, basic or full, not {mode!r}")
+        file = os.getenv("TELEMETRY_FILE")
+        return cls(mode=mode, file=Path(file) if file else None)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the +Inf overflow; cumulated only on export
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip([*map(_format_number, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Metrics:
+    """Thread-safe registry of labelled histograms and counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._counters: dict[str, dict[Labels, int]] = {}
+
+    def observe(self, name: str, buckets: Sequence[float], value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + 1
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, histograms in sorted(self._histograms.items()):
+                lines += [f"# HELP {name} {_HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                for labels, histogram in sorted(histograms.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{name}_bucket{_format_labels((*labels, ('le', bound)))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            for name, counters in sorted(self._counters.items()):
+                lines += [f"# HELP {name} {_HELP.get(name, name)}", f"# TYPE {name} counter"]
+                for labels, value in sorted(counters.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(labels),
+                            "buckets": dict(histogram.cumulative()),
+                            "sum": histogram.sum,
+                            "count": histogram.count,
+                        }
+                        for labels, histogram in sorted(histograms.items())
+                    ]
+                    for name, histograms in sorted(self._histograms.items())
+                },
+                "counters": {
+                    name: [
+                        {"labels": dict(labels), "value": value}
+                        for labels, value in sorted(counters.items())
+                    ]
+                    for name, counters in sorted(self._counters.items())
+                },
+            }
+
+    def write(self, path: Path) -> None:
+        """Replaces path atomically, so a collector never reads a partial file."""
+        text = (
+            json.dumps(self.to_json(), indent=2) + "\n"
+            if path.suffix == ".json"
+            else self.to_prometheus()
+        )
+        temporary = path.with_name(f".{path.name}.tmp")
+        temporary.write_text(text)
+        temporary.replace(path)
+
+
+metrics = Metrics()
+
+
+@functools.cache
+def settings() -> TelemetrySettings:
+    # Read on first use, after the entry point has loaded .env
+    return TelemetrySettings.from_environment()
+
+
+@contextlib.contextmanager
+def timed(operation: str, stage: str) -> Iterator[None]:
+    """Records the block's duration as a stage of operation, or an error if it raises."""
+    if settings().mode == MODE_OFF:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.increment(ERROR_METRIC, operation=operation, stage=stage)
+        raise
+    metrics.observe(
+        LATENCY_METRIC, LATENCY_BUCKETS, time.perf_counter() - start, operation=operation, stage=stage
+    )
+
+
+def record_fee(operation: str, fee: int) -> None:
+    if settings().mode != MODE_OFF:
+        metrics.observe(FEE_METRIC, FEE_BUCKETS, fee, operation=operation)
+
+
+def send(
+    algod: "AlgodClient", operation: str, composer: Any
+) -> "algokit_utils.SendAtomicTransactionComposerResults":
+    """
+    Sends a typed client's group composer (or a TransactionComposer) like its send(),
+    recording the build, sign, submit and confirm stages under operation. Failures are
+    raised through the composer's error transformers, so logic errors are decoded
+    against the app's source map as they are by send().
+    """
+    if settings().mode == MODE_OFF:
+        return composer.send()
+
+    import algokit_utils
+    from algokit_utils.config import config
+    from algosdk import encoding, transaction
+    from algosdk.v2client.models import SimulateRequest
+
+    inner = composer.composer() if hasattr(composer, "composer") else composer
+    try:
+        with timed(operation, "build"):
+            atc = inner.build().atc
+            if config.populate_app_call_resource and any(
+                isinstance(txn.txn, transaction.ApplicationCallTxn) for txn in atc.build_group()
+            ):
+                atc = algokit_utils.prepare_group_for_sending(atc, algod, populate_app_call_resources=True)
+            group = [txn.txn for txn in atc.build_group()]
+        with timed(operation, "sign"):
+            signed = atc.gather_signatures()
+        if settings().mode == MODE_FULL:
+            simulated = atc.simulate(algod, SimulateRequest(txn_groups=[], allow_unnamed_resources=True))
+            opcode_cost = simulated.simulate_response["txn-groups"][0].get("app-budget-consumed", 0)
+            metrics.observe(OPCODE_METRIC, OPCODE_BUCKETS, opcode_cost, operation=operation)
+        with timed(operation, "submit"):
+            algod.send_raw_transaction(
+                base64.b64encode(b"".join(base64.b64decode(encoding.msgpack_encode(txn)) for txn in signed))
+            )
+        with timed(operation, "confirm"):
+            # Every transaction of a group confirms in the same round, so waiting on the
+            # first is enough; the group is valid until its last round
+            wait_rounds = max(txn.last_valid_round for txn in group) - min(
+                txn.first_valid_round for txn in group
+            ) + 1
+            transaction.wait_for_confirmation(algod, atc.tx_ids[0], wait_rounds)
+            confirmations = [algod.pending_transaction_info(txid) for txid in atc.tx_ids]
+    except Exception as error:
+        raise inner._transform_error(error) from error
+    record_fee(operation, sum(txn.fee for txn in group))
+
+    return algokit_utils.SendAtomicTransactionComposerResults(
+        group_id=base64.b64encode(group[0].group).decode() if len(group) > 1 else "",
+        confirmations=confirmations,
+        tx_ids=atc.tx_ids,
+        transactions=[algokit_utils.TransactionWrapper(txn) for txn in group],
+        returns=[
+            algokit_utils.ABIReturn(atc.parse_result(method, atc.tx_ids[index], confirmations[index]))
+            for index, method in sorted(atc.method_dict.items())
+        ],
+    )
+
+
+def flush() -> None:
+    """Writes the metrics to TELEMETRY_FILE, if it is set."""
+    path = settings().file
+    if path is not None and settings().mode != MODE_OFF:
+        metrics.write(path)
+        logger.info(f"Wrote telemetry to {path}")
@@ -0,0 +1,163 @@
+"""
+Builds the voter allowlist Merkle tree consumed by Vote2Trust.start_registration
+and the per-voter proofs passed to commit_vote.
+
+Levels are streamed to flat files of 32 byte hashes, so memory use stays constant
+no matter how large the electorate is. Hashing matches the contract:
+leaf = sha256(0x00 || address), node = sha256(0x01 || lower || higher), and an
+odd node out is carried up to the next level unchanged.
+
+Usage: python -m smart_contracts.v_t.allowlist voters.csv --out-dir allowlist/
+"""
+
+import argparse
+import csv
+import dataclasses
+import hashlib
+import json
+import logging
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+
+from algosdk import encoding
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 32
+_CHUNK_NODES = 4096
+
+
+def leaf_hash(address: str) -> bytes:
+    """Hashes an Algorand address into a tree leaf."""
+    return hashlib.sha256(b"\x00" + encoding.decode_address(address)).digest()
+
+
+def node_hash(a: bytes, b: bytes) -> bytes:
+    """Hashes a pair of sibling nodes; order independent, like the contract."""
+    lower, higher = (a, b) if a < b else (b, a)
+    return hashlib.sha256(b"\x01" + lower + higher).digest()
+
+
+def read_addresses(csv_path: Path) -> Iterator[str]:
+    """Streams addresses from the first column of a CSV, skipping a header row."""
+    with csv_path.open(newline="") as f:
+        for line_number, row in enumerate(csv.reader(f), start=1):
+            if not row or not row[0].strip():
+                continue
+            address = row[0].strip()
+            if encoding.is_valid_address(address):
+                yield address
+            elif line_number > 1:
+                raise ValueError(f"Invalid address on line {line_number} of {csv_path}: {address}")
+
+
+@dataclasses.dataclass
+class AllowlistTree:
+    """A Merkle tree whose levels are stored as files, leaves first."""
+
+    level_paths: list[Path]
+    leaf_count: int
+
+    @property
+    def root(self) -> bytes:
+        return self.level_paths[-1].read_bytes()
+
+    def proofs(self) -> Iterator[tuple[int, bytes]]:
+        """Yields (leaf index, proof) in leaf order, proofs being concatenated siblings."""
+        with _MappedLevels(self.level_paths) as levels:
+            for index in range(self.leaf_count):
+                yield index, b"".join(_siblings(levels, index))
+
+
+class _MappedLevels:
+    """Memory maps every level below the root for random sibling lookups."""
+
+    def __init__(self, paths: list[Path]) -> None:
+        self._files = [path.open("rb") for path in paths[:-1]]
+        self.levels: list[mmap.mmap] = []
+
+    def __enter__(self) -> list[mmap.mmap]:
+        self.levels = [
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) for f in self._files
+        ]
+        return self.levels
+
+    def __exit__(self, *exc: object) -> None:
+        for level in self.levels:
+            level.close()
+        for f in self._files:
+            f.close()
+
+
+def _siblings(levels: list[mmap.mmap], index: int) -> Iterator[bytes]:
+    for level in levels:
+        sibling = index ^ 1
+        if (sibling + 1) * HASH_SIZE <= len(level):
+            yield level[sibling * HASH_SIZE : (sibling + 1) * HASH_SIZE]
+        index //= 2
+
+
+def _write_level(path: Path, nodes: Iterator[bytes]) -> int:
+    count = 0
+    buffer: list[bytes] = []
+    with path.open("wb") as f:
+        for node in nodes:
+            buffer.append(node)
+            count += 1
+            if len(buffer) == _CHUNK_NODES:
+                f.write(b"".join(buffer))
+                buffer.clear()
+        f.write(b"".join(buffer))
+    return count
+
+
+def _read_pairs(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_NODES * 2 * HASH_SIZE):
+            for offset in range(0, len(chunk), 2 * HASH_SIZE):
+                left = chunk[offset : offset + HASH_SIZE]
+                right = chunk[offset + HASH_SIZE : offset + 2 * HASH_SIZE]
+                yield node_hash(left, right) if right else left
+
+
+def build_tree(addresses: Iterator[str], work_dir: Path) -> AllowlistTree:
+    """Builds the tree level by level from a stream of addresses."""
+    work_dir.mkdir(parents=True, exist_ok=True)
+    leaf_path = work_dir / "level_0.bin"
+    leaf_count = _write_level(leaf_path, (leaf_hash(address) for address in addresses))
+    if not leaf_count:
+        raise ValueError("Cannot build an allowlist without any addresses")
+
+    level_paths = [leaf_path]
+    count = leaf_count
+    while count > 1:
+        path = work_dir / f"level_{len(level_paths)}.bin"
+        count = _write_level(path, _read_pairs(level_paths[-1]))
+        level_paths.append(path)
+    logger.info(f"Built allowlist tree of {leaf_count} voters, depth {len(level_paths) - 1}")
+    return AllowlistTree(level_paths=level_paths, leaf_count=leaf_count)
+
+
+def write_proofs(csv_path: Path, tree: AllowlistTree, output: Path) -> None:
+    """Writes one JSON line per voter: {"address": ..., "proof": hex}."""
+    with output.open("w") as f:
+        for address, (_, proof) in zip(read_addresses(csv_path), tree.proofs(), strict=True):
+            f.write(json.dumps({"address": address, "proof": proof.hex()}) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("csv", type=Path, help="CSV file with one voter address per row")
+    parser.add_argument("--out-dir", type=Path, default=Path("allowlist"))
+    args = parser.parse_args()
+
+    tree = build_tree(read_addresses(args.csv), args.out_dir)
+    write_proofs(args.csv, tree, args.out_dir / "proofs.jsonl")
+    (args.out_dir / "root.txt").write_text(tree.root.hex() + "\n")
+    logger.info(f"Voter root {tree.root.hex()} ({tree.leaf_count} eligible voters)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
@@ -0,0 +1,286 @@
+"""
+Generates vote commitments for commit_vote in bulk and audits them after the reveal.
+
+A commitment is sha256(itob(choice) || salt), exactly what Vote2Trust checks in
+reveal_vote. Records are streamed to a flat binary file of fixed-size entries,
+address (32) || choice (uint64) || salt (32) || commitment (32), behind a short
+header, so files for millions of voters stay compact and can be split by offset.
+
+audit re-verifies either such a file or what actually happened on chain: the
+(choice, salt) every voter revealed against the commitment they submitted, as
+recorded by the tally indexer's SQLite database.
+
+Usage:
+    python -m smart_contracts.v_t.commitments generate votes.csv --out commitments.bin
+    python -m smart_contracts.v_t.commitments audit commitments.bin --workers 8
+    python -m smart_contracts.v_t.commitments audit --db tallies.sqlite --app-id 1234 --poll-id 0
+"""
+
+import argparse
+import collections
+import csv
+import dataclasses
+import hashlib
+import logging
+import mmap
+import os
+import secrets
+import sqlite3
+import struct
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import TypeVar
+
+from algosdk import encoding
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"V2TC\x01"
+SALT_SIZE = 32
+RECORD = struct.Struct(">32sQ32s32s")
+# Records salted, hashed and written per batch; one urandom call and one write each
+CHUNK_RECORDS = 65_536
+# Chunks queued per generate worker, bounding memory however large the input is
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True)
+class Commitment:
+    address: str
+    choice: int
+    salt: bytes
+    commitment: bytes
+
+
+def commitment(choice: int, salt: bytes) -> bytes:
+    """The vote_hash to pass to commit_vote for this choice and salt."""
+    return hashlib.sha256(choice.to_bytes(8, "big") + salt).digest()
+
+
+def read_votes(csv_path: Path) -> Iterator[tuple[str, int]]:
+    """Reads address,choice rows, skipping a header row if present."""
+    with csv_path.open(newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        for index, row in enumerate(reader):
+            if not row or not row[0].strip():
+                continue
+            if len(row) != 2:
+                raise ValueError(
+                    f"{csv_path}:{reader.line_num}: expected address,choice, got {len(row)} field(s)"
+                )
+            address, choice = row[0].strip(), row[1].strip()
+            if not choice.isdigit():
+                if index == 0:
+                    continue
+                raise ValueError(f"{csv_path}:{reader.line_num}: choice {choice!r} is not a number")
+            # Addresses are checksum-validated when generate decodes them
+            yield address, int(choice)
+
+
+def _chunks(items: Iterable[T]) -> Iterator[list[T]]:
+    chunk: list[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == CHUNK_RECORDS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _commit_chunk(chunk: list[tuple[str, int]]) -> bytes:
+    sha256 = hashlib.sha256
+    salts = secrets.token_bytes(SALT_SIZE * len(chunk))
+    buffer = bytearray(RECORD.size * len(chunk))
+    for index, (address, choice) in enumerate(chunk):
+        salt = salts[index * SALT_SIZE : (index + 1) * SALT_SIZE]
+        RECORD.pack_into(
+            buffer,
+            index * RECORD.size,
+            encoding.decode_address(address),
+            choice,
+            salt,
+            sha256(choice.to_bytes(8, "big") + salt).digest(),
+        )
+    return bytes(buffer)
+
+
+def generate(
+    votes: Iterable[tuple[str, int]], out_path: Path, *, workers: int | None = None
+) -> int:
+    """
+    Salts and commits every (address, choice), streaming records to out_path in input
+    order. Chunks are decoded, salted and hashed across a process pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    count = 0
+    pending: collections.deque[Future[bytes]] = collections.deque()
+    with out_path.open("wb") as out, ProcessPoolExecutor(workers) as pool:
+        out.write(MAGIC)
+        for chunk in _chunks(votes):
+            if len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                out.write(pending.popleft().result())
+            pending.append(pool.submit(_commit_chunk, chunk))
+            count += len(chunk)
+        while pending:
+            out.write(pending.popleft().result())
+    return count
+
+
+def _record_count(path: Path) -> int:
+    size = path.stat().st_size - len(MAGIC)
+    if size % RECORD.size:
+        raise ValueError(f"{path} is truncated or not a commitments file")
+    return size // RECORD.size
+
+
+def _open(path: Path) -> tuple[mmap.mmap, int]:
+    with path.open("rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[: len(MAGIC)] != MAGIC:
+        data.close()
+        raise ValueError(f"{path} is not a commitments file")
+    return data, _record_count(path)
+
+
+def read_commitments(path: Path) -> Iterator[Commitment]:
+    data, count = _open(path)
+    try:
+        for start in range(0, count, CHUNK_RECORDS):
+            offset = len(MAGIC) + start * RECORD.size
+            end = len(MAGIC) + min(start + CHUNK_RECORDS, count) * RECORD.size
+            for address, choice, salt, vote_hash in RECORD.iter_unpack(data[offset:end]):
+                yield Commitment(encoding.encode_address(address), choice, salt, vote_hash)
+    finally:
+        data.close()
+
+
+def _audit_range(path: Path, start: int, stop: int) -> list[int]:
+    """Indices of records in [start, stop) whose commitment does not match."""
+    data, _ = _open(path)
+    sha256 = hashlib.sha256
+    mismatches = []
+    try:
+        offset = len(MAGIC) + start * RECORD.size
+        for index, (_, choice, salt, vote_hash) in enumerate(
+            RECORD.iter_unpack(data[offset : len(MAGIC) + stop * RECORD.size]), start
+        ):
+            if sha256(choice.to_bytes(8, "big") + salt).digest() != vote_hash:
+                mismatches.append(index)
+    finally:
+        data.close()
+    return mismatches
+
+
+def audit(path: Path, *, workers: int | None = None) -> tuple[int, list[int]]:
+    """
+    Re-verifies every record across a process pool, each worker hashing its own
+    contiguous range of the memory-mapped file. Returns the number of records
+    checked and the indices of those that fail.
+    """
+    count = _record_count(path)
+    workers = workers or os.cpu_count() or 1
+    step = max(CHUNK_RECORDS, -(-count // (workers * 4)))
+    ranges = [(start, min(start + step, count)) for start in range(0, count, step)]
+    mismatches: list[int] = []
+    with ProcessPoolExecutor(workers) as pool:
+        for failed in pool.map(_audit_range, [path] * len(ranges), *zip(*ranges, strict=True)):
+            mismatches.extend(failed)
+    return count, mismatches
+
+
+def read_revealed(db_path: Path, app_id: int, poll_id: int) -> Iterator[Commitment]:
+    """
+    Revealed votes of a poll from the tally indexer's database: each voter's revealed
+    choice and salt with the commitment they submitted in commit_vote.
+    """
+    db = sqlite3.connect(db_path)
+    try:
+        rows = db.execute(
+            "SELECT address, choice, salt, commit_hash FROM voters"
+            " WHERE app_id = ? AND poll_id = ? AND revealed = 1 ORDER BY address",
+            (app_id, poll_id),
+        )
+        for address, choice, salt, commit_hash in rows:
+            # A reveal with no indexed commit (e.g. indexing started late) has no hash
+            yield Commitment(address, choice, bytes(salt or b""), bytes(commit_hash or b""))
+    finally:
+        db.close()
+
+
+def _audit_votes(votes: list[Commitment]) -> list[Commitment]:
+    sha256 = hashlib.sha256
+    return [
+        vote
+        for vote in votes
+        if sha256(vote.choice.to_bytes(8, "big") + vote.salt).digest() != vote.commitment
+    ]
+
+
+def audit_revealed(
+    revealed: Iterable[Commitment], *, workers: int | None = None
+) -> tuple[int, list[Commitment]]:
+    """
+    Checks revealed (choice, salt) pairs against their commitments across a process
+    pool, CHUNK_RECORDS at a time. Returns the count and the failures in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    count = 0
+    mismatches: list[Commitment] = []
+    pending: collections.deque[Future[list[Commitment]]] = collections.deque()
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk in _chunks(revealed):
+            if len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                mismatches.extend(pending.popleft().result())
+            pending.append(pool.submit(_audit_votes, chunk))
+            count += len(chunk)
+        while pending:
+            mismatches.extend(pending.popleft().result())
+    return count, mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate_parser = subparsers.add_parser("generate", help="salt and commit address,choice rows")
+    generate_parser.add_argument("csv", type=Path, help="CSV file with address,choice rows")
+    generate_parser.add_argument("--out", type=Path, default=Path("commitments.bin"))
+    generate_parser.add_argument("--workers", type=int, default=None)
+    audit_parser = subparsers.add_parser("audit", help="re-verify every record's commitment")
+    audit_source = audit_parser.add_mutually_exclusive_group(required=True)
+    audit_source.add_argument("file", type=Path, nargs="?", help="commitments file from generate")
+    audit_source.add_argument("--db", type=Path, help="tally indexer database with the on-chain reveals")
+    audit_parser.add_argument("--app-id", type=int)
+    audit_parser.add_argument("--poll-id", type=int)
+    audit_parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        count = generate(read_votes(args.csv), args.out, workers=args.workers)
+        logger.info(f"Wrote {count} commitments to {args.out}")
+    elif args.db:
+        if args.app_id is None or args.poll_id is None:
+            audit_parser.error("--db needs --app-id and --poll-id")
+        count, failed = audit_revealed(
+            read_revealed(args.db, args.app_id, args.poll_id), workers=args.workers
+        )
+        for vote in failed:
+            logger.error(f"Voter {vote.address} revealed a vote that does not match their commitment")
+        logger.info(f"Checked {count} revealed votes, {len(failed)} mismatched")
+        if failed:
+            raise SystemExit(1)
+    else:
+        count, mismatches = audit(args.file, workers=args.workers)
+        for index in mismatches:
+            logger.error(f"Record {index} does not match its commitment")
+        logger.info(f"Checked {count} commitments, {len(mismatches)} mismatched")
+        if mismatches:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
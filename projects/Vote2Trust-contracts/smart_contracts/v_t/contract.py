@@ -1,197 +1,580 @@
-from algopy import ARC4Contract, String, UInt64, Bytes, GlobalState, LocalState, Account, Txn, Global, arc4
-from algopy.arc4 import abimethod
+import typing
 
+from algopy import ARC4Contract, String, UInt64, Bytes, BigUInt, BoxMap, BoxRef, GlobalState, StateTotals, Account, Txn, Global, arc4, itxn, op, subroutine, urange
+from algopy.arc4 import abimethod, baremethod
 
-class Vote2Trust(ARC4Contract):
-    """Commit-Reveal Voting System on Algorand"""
+# Tallies are packed uint64 counters, one per option, so a single box reference
+# (1KB of box I/O) covers the whole array
+MAX_OPTIONS = 64
+TALLY_SIZE = 8
+
+# A voter's record for a local-state poll is one local state slot keyed by poll id.
+# One slot is all a voter needs, and it keeps the opt-in lock at 100,000 + 50,000
+# microalgo (the five-key schema it replaced locked 264,000). Voters take part in
+# further local-state polls once reclaim_voters frees the slot; box-stored polls
+# have no such limit
+VOTER_POLL_SLOTS = 1
+# Where a poll keeps its voter records, chosen when registration starts: voters'
+# local state (an opt-in per voter) or app boxes keyed by poll id and address
+VOTER_STORAGE_LOCAL = 0
+VOTER_STORAGE_BOX = 1
+# A voter's flags and revealed choice share one uint64 status word
+VOTER_REGISTERED_BIT = 0
+VOTER_COMMITTED_BIT = 1
+VOTER_REVEALED_BIT = 2
+VOTER_CHOICE_SHIFT = 8  # Choice lives in bits 8-15, MAX_OPTIONS fits in a byte
+VOTER_RECORD_SIZE = 40
+# Min balance a voter box holds: 2500 plus 400 per byte of its key (prefix, poll id
+# and address) and value
+VOTER_BOX_MIN_BALANCE = 2_500 + 400 * (1 + 8 + 32 + VOTER_RECORD_SIZE)
+# Terminal phases: a stopped poll cannot be restarted, and either kind can be archived
+PHASE_COMPLETED = 4
+PHASE_ARCHIVED = 5
+PHASE_STOPPED = 6
+
+Hash: typing.TypeAlias = arc4.StaticArray[arc4.Byte, typing.Literal[32]]
+
+
+class PollRecord(arc4.Struct):
+    """Per-poll voting state, stored in a box keyed by poll id"""
+    voting_phase: arc4.UInt64  # 0=created, 1=registration, 2=commit, 3=reveal, 4=completed, 5=archived, 6=stopped
+    commit_deadline: arc4.UInt64
+    reveal_deadline: arc4.UInt64
+    total_voters: arc4.UInt64
+    total_votes: arc4.UInt64
+    option_count: arc4.UInt64
+    voter_storage: arc4.UInt64  # VOTER_STORAGE_LOCAL or VOTER_STORAGE_BOX
+    voter_root: Hash  # Merkle root of eligible voters, zero for open registration
+
+
+class PollInfo(arc4.Struct):
+    """Descriptive poll fields, kept apart from the frequently written PollRecord"""
+    title: arc4.String
+    description: arc4.String
+
+
+OptionList: typing.TypeAlias = arc4.DynamicArray[arc4.String]
+
+
+class PollSnapshot(arc4.Struct):
+    """Everything a dashboard shows about a poll, returned by one read-only call"""
+    voting_phase: arc4.UInt64
+    commit_deadline: arc4.UInt64
+    reveal_deadline: arc4.UInt64
+    total_voters: arc4.UInt64
+    total_votes: arc4.UInt64
+    tallies: arc4.DynamicArray[arc4.UInt64]
+
+
+class ArchivedResults(arc4.Struct):
+    """What archive_poll keeps of a poll: how it ended and a digest of its results"""
+    final_phase: arc4.UInt64  # PHASE_COMPLETED or PHASE_STOPPED
+    digest: Hash
+
+
+class VoterRecord(arc4.Struct):
+    """A voter's state in one poll, in local state under the poll id or in a voter box"""
+    status: arc4.UInt64  # Registered, committed and revealed bits plus the choice
+    commit_hash: Hash    # Hash of vote + salt
+
+
+@subroutine
+def vote_commitment(vote_choice: UInt64, salt: Bytes) -> Bytes:
+    """Commitment a voter submits in commit_vote: sha256(itob(choice) || salt)"""
+    return op.sha256(op.itob(vote_choice) + salt)
+
+
+@subroutine
+def is_allowlisted(root: Bytes, voter: Account, proof: Bytes) -> bool:
+    """
+    Checks a Merkle proof of voter against the allowlist root. Leaves are
+    sha256(0x00 || address) and inner nodes sha256(0x01 || lower || higher),
+    so proofs are just the concatenated 32 byte siblings, leaf to root.
+    """
+    assert proof.length % UInt64(32) == UInt64(0), "Malformed Merkle proof"
+    node = op.sha256(Bytes(b"\x00") + voter.bytes)
+    for i in urange(proof.length // UInt64(32)):
+        sibling = op.extract(proof, i * UInt64(32), UInt64(32))
+        if BigUInt.from_bytes(node) < BigUInt.from_bytes(sibling):
+            node = op.sha256(Bytes(b"\x01") + node + sibling)
+        else:
+            node = op.sha256(Bytes(b"\x01") + sibling + node)
+    return node == root
+
+
+@subroutine
+def tally_box_key(poll_id: UInt64) -> Bytes:
+    """Key of the box holding a poll's packed vote counts"""
+    return Bytes(b"t") + op.itob(poll_id)
+
+
+@subroutine
+def options_box_key(poll_id: UInt64) -> Bytes:
+    """Key of the box holding a poll's option labels (the poll_options BoxMap)"""
+    return Bytes(b"o") + op.itob(poll_id)
+
+
+@subroutine
+def voter_box_key(poll_id: UInt64, voter: Account) -> Bytes:
+    """Key of a voter's record box in VOTER_STORAGE_BOX polls (the voters BoxMap, minus its prefix)"""
+    return op.itob(poll_id) + voter.bytes
+
+
+class Vote2Trust(ARC4Contract, state_totals=StateTotals(local_bytes=VOTER_POLL_SLOTS)):
+    """Commit-Reveal Voting System on Algorand, hosting any number of polls"""
     
     # Global State Variables
     admin: GlobalState[Account]
-    poll_title: GlobalState[String]
-    poll_description: GlobalState[String]
-    poll_options: GlobalState[String]  # JSON string of options
-    voting_phase: GlobalState[UInt64]  # 0=registration, 1=commit, 2=reveal, 3=completed
-    commit_deadline: GlobalState[UInt64]
-    reveal_deadline: GlobalState[UInt64]
-    total_voters: GlobalState[UInt64]
-    total_votes: GlobalState[UInt64]
-    
-    # Local State for each voter
-    voter_registered: LocalState[UInt64]  # 1 if registered, 0 if not
-    vote_committed: LocalState[UInt64]    # 1 if committed, 0 if not
-    vote_revealed: LocalState[UInt64]     # 1 if revealed, 0 if not
-    vote_commit_hash: LocalState[Bytes]   # Hash of vote + salt
-    vote_choice: LocalState[UInt64]       # Actual vote choice (0, 1, 2, etc.)
-    
-    # Vote counts for each option
-    option_0_votes: GlobalState[UInt64]
-    option_1_votes: GlobalState[UInt64]
-    option_2_votes: GlobalState[UInt64]
-    option_3_votes: GlobalState[UInt64]
-    option_4_votes: GlobalState[UInt64]
+    poll_count: GlobalState[UInt64]  # Also the id of the next poll
+    reclaimed: GlobalState[UInt64]  # Min balance freed by reclaim_voters and not yet withdrawn
     
     def __init__(self) -> None:
         """Initialize the voting contract"""
         self.admin.value = Txn.sender
-        self.voting_phase.value = UInt64(0)  # Start with registration
-        self.total_voters.value = UInt64(0)
-        self.total_votes.value = UInt64(0)
-        self.option_0_votes.value = UInt64(0)
-        self.option_1_votes.value = UInt64(0)
-        self.option_2_votes.value = UInt64(0)
-        self.option_3_votes.value = UInt64(0)
-        self.option_4_votes.value = UInt64(0)
+        self.poll_count.value = UInt64(0)
+        self.reclaimed.value = UInt64(0)
+        
+        # Per-poll state, keyed by poll id. Vote counts for each option live in a
+        # separate box per poll (see tally_box_key), packed as uint64s indexed by vote choice
+        self.polls = BoxMap(UInt64, PollRecord, key_prefix=b"p")
+        self.poll_info = BoxMap(UInt64, PollInfo, key_prefix=b"i")
+        self.poll_options = BoxMap(UInt64, OptionList, key_prefix=b"o")
+        self.voters = BoxMap(Bytes, VoterRecord, key_prefix=b"v")
+        # How an archived poll ended, and a digest of its final totals and tallies
+        self.results = BoxMap(UInt64, ArchivedResults, key_prefix=b"r")
+    
+    @subroutine
+    def _load_poll(self, poll_id: UInt64) -> PollRecord:
+        assert poll_id in self.polls, "Poll does not exist"
+        return self.polls[poll_id].copy()
+    
+    @subroutine
+    def _load_voter(self, poll: PollRecord, voter: Account, poll_id: UInt64) -> VoterRecord:
+        if poll.voter_storage.native == UInt64(VOTER_STORAGE_BOX):
+            record, exists = self.voters.maybe(voter_box_key(poll_id, voter))
+            if exists:
+                return record.copy()
+        else:
+            value, exists = op.AppLocal.get_ex_bytes(voter, Global.current_application_id, op.itob(poll_id))
+            if exists:
+                return VoterRecord.from_bytes(value)
+        return VoterRecord.from_bytes(op.bzero(VOTER_RECORD_SIZE))
+    
+    @subroutine
+    def _store_voter(self, poll: PollRecord, voter: Account, poll_id: UInt64, record: VoterRecord) -> None:
+        if poll.voter_storage.native == UInt64(VOTER_STORAGE_BOX):
+            # The first write creates the box, paid for from the app account's balance
+            self.voters[voter_box_key(poll_id, voter)] = record.copy()
+        else:
+            op.AppLocal.put(voter, op.itob(poll_id), record.bytes)
+    
+    @subroutine
+    def _load_tallies(self, poll_id: UInt64, option_count: UInt64) -> arc4.DynamicArray[arc4.UInt64]:
+        tallies = BoxRef(key=tally_box_key(poll_id))
+        # The box already holds the ARC-4 element encoding, only the length prefix is missing
+        return arc4.DynamicArray[arc4.UInt64].from_bytes(
+            op.extract(op.itob(option_count), 6, 2) + tallies.value
+        )
+    
+    @baremethod(allow_actions=["OptIn"])
+    def opt_in(self) -> None:
+        """Opt in ahead of time, without registering for a poll"""
+    
+    @baremethod(allow_actions=["CloseOut"])
+    def close_out(self) -> None:
+        """Close out, releasing the local state min balance (e.g. once polls are archived)"""
     
     @abimethod
     def create_poll(
         self,
         title: String,
         description: String,
-        options: String,  # JSON array of options
+        options: OptionList,  # Option labels, indexed by vote choice
         commit_duration: UInt64,  # Duration in seconds
         reveal_duration: UInt64   # Duration in seconds
-    ) -> None:
-        """Create a new poll (admin only)"""
+    ) -> UInt64:
+        """Create a new poll (admin only), returning its poll id"""
         assert Txn.sender == self.admin.value, "Only admin can create polls"
-        assert self.voting_phase.value == UInt64(0), "Cannot create poll while voting is active"
+        option_count = options.length
+        assert option_count > UInt64(0), "Poll needs at least one option"
+        # Bounded by the tally box, which must stay readable with one box reference
+        assert option_count <= UInt64(MAX_OPTIONS), "Too many options"
         
-        self.poll_title.value = title
-        self.poll_description.value = description
-        self.poll_options.value = options
+        poll_id = self.poll_count.value
+        self.poll_count.value = poll_id + UInt64(1)
         
         current_time = Global.latest_timestamp
-        self.commit_deadline.value = current_time + commit_duration
-        self.reveal_deadline.value = current_time + commit_duration + reveal_duration
+        self.polls[poll_id] = PollRecord(
+            voting_phase=arc4.UInt64(0),
+            commit_deadline=arc4.UInt64(current_time + commit_duration),
+            reveal_deadline=arc4.UInt64(current_time + commit_duration + reveal_duration),
+            total_voters=arc4.UInt64(0),
+            total_votes=arc4.UInt64(0),
+            option_count=arc4.UInt64(option_count),
+            voter_storage=arc4.UInt64(VOTER_STORAGE_LOCAL),
+            voter_root=Hash.from_bytes(op.bzero(32)),
+        )
+        self.poll_info[poll_id] = PollInfo(
+            title=arc4.String(title),
+            description=arc4.String(description),
+        )
+        self.poll_options[poll_id] = options.copy()
         
-        # Reset vote counts
-        self.option_0_votes.value = UInt64(0)
-        self.option_1_votes.value = UInt64(0)
-        self.option_2_votes.value = UInt64(0)
-        self.option_3_votes.value = UInt64(0)
-        self.option_4_votes.value = UInt64(0)
-        self.total_votes.value = UInt64(0)
+        # Vote counts start at zero, sized to the number of options
+        tallies = BoxRef(key=tally_box_key(poll_id))
+        tallies.create(size=option_count * UInt64(TALLY_SIZE))
+        return poll_id
     
     @abimethod
-    def start_registration(self) -> None:
-        """Start voter registration phase (admin only)"""
+    def start_registration(
+        self, poll_id: UInt64, voter_root: Bytes, eligible_voters: UInt64, voter_storage: UInt64
+    ) -> None:
+        """
+        Start voter registration phase (admin only)
+        
+        An empty voter_root keeps open registration through register_voter. A
+        32 byte Merkle root of eligible addresses replaces it: voters prove
+        eligibility in commit_vote and eligible_voters becomes total_voters.
+        
+        voter_storage picks where voter records live. VOTER_STORAGE_LOCAL uses
+        the voter's local state, so every voter opts in and locks its min balance.
+        VOTER_STORAGE_BOX uses a box per voter, funded by the app account, so
+        voters call without opting in and can take part in any number of polls at once.
+        """
         assert Txn.sender == self.admin.value, "Only admin can start registration"
-        assert self.voting_phase.value == UInt64(0), "Registration already started or voting in progress"
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(0), "Registration already started or voting in progress"
+        assert voter_storage <= UInt64(VOTER_STORAGE_BOX), "Unknown voter storage"
         
-        self.voting_phase.value = UInt64(1)  # Registration phase
+        poll.voter_storage = arc4.UInt64(voter_storage)
+        if voter_root.length:
+            assert voter_root.length == UInt64(32), "Voter root must be a sha256 hash"
+            poll.voter_root = Hash.from_bytes(voter_root)
+            poll.total_voters = arc4.UInt64(eligible_voters)
+        else:
+            poll.voter_root = Hash.from_bytes(op.bzero(32))
+            poll.total_voters = arc4.UInt64(0)
+        poll.voting_phase = arc4.UInt64(1)  # Registration phase
+        self.polls[poll_id] = poll.copy()
     
-    @abimethod
-    def register_voter(self) -> None:
-        """Register as a voter"""
-        assert self.voting_phase.value == UInt64(1), "Registration phase not active"
-        assert self.voter_registered == UInt64(0), "Already registered"
+    @abimethod(allow_actions=["NoOp", "OptIn"])
+    def register_voter(self, poll_id: UInt64) -> None:
+        """Register as a voter, opting in with the same call if the poll keeps voters in local state"""
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(1), "Registration phase not active"
+        assert poll.voter_root.bytes == op.bzero(32), "Registration is by allowlist"
+        voter = self._load_voter(poll, Txn.sender, poll_id)
+        status = voter.status.native
+        assert not op.getbit(status, VOTER_REGISTERED_BIT), "Already registered"
         
-        self.voter_registered = UInt64(1)
-        self.total_voters.value = self.total_voters.value + UInt64(1)
+        voter.status = arc4.UInt64(op.setbit_uint64(status, VOTER_REGISTERED_BIT, 1))
+        self._store_voter(poll, Txn.sender, poll_id, voter)
+        poll.total_voters = arc4.UInt64(poll.total_voters.native + UInt64(1))
+        self.polls[poll_id] = poll.copy()
     
     @abimethod
-    def start_commit_phase(self) -> None:
+    def start_commit_phase(self, poll_id: UInt64) -> None:
         """Start commit phase (admin only)"""
         assert Txn.sender == self.admin.value, "Only admin can start commit phase"
-        assert self.voting_phase.value == UInt64(1), "Must be in registration phase"
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(1), "Must be in registration phase"
         
-        self.voting_phase.value = UInt64(2)  # Commit phase
+        poll.voting_phase = arc4.UInt64(2)  # Commit phase
+        self.polls[poll_id] = poll.copy()
     
-    @abimethod
-    def commit_vote(self, vote_hash: Bytes) -> None:
-        """Commit a vote hash"""
-        assert self.voting_phase.value == UInt64(2), "Commit phase not active"
-        assert self.voter_registered == UInt64(1), "Must be registered to vote"
-        assert self.vote_committed == UInt64(0), "Already committed vote"
-        assert Global.latest_timestamp <= self.commit_deadline.value, "Commit deadline passed"
+    @abimethod(allow_actions=["NoOp", "OptIn"])
+    def commit_vote(self, poll_id: UInt64, vote_hash: Bytes, proof: Bytes) -> None:
+        """
+        Commit a vote hash
         
-        self.vote_committed = UInt64(1)
-        self.vote_commit_hash = vote_hash
+        In allowlist mode the voter passes their Merkle proof (empty otherwise)
+        and may opt in with this same call (box-stored polls need no opt-in at all),
+        so no registration transaction is needed.
+        """
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(2), "Commit phase not active"
+        voter = self._load_voter(poll, Txn.sender, poll_id)
+        status = voter.status.native
+        if poll.voter_root.bytes != op.bzero(32):
+            assert is_allowlisted(poll.voter_root.bytes, Txn.sender, proof), "Not on voter allowlist"
+            status = op.setbit_uint64(status, VOTER_REGISTERED_BIT, 1)
+        assert op.getbit(status, VOTER_REGISTERED_BIT), "Must be registered to vote"
+        assert not op.getbit(status, VOTER_COMMITTED_BIT), "Already committed vote"
+        assert Global.latest_timestamp <= poll.commit_deadline.native, "Commit deadline passed"
+        assert vote_hash.length == UInt64(32), "Vote hash must be a sha256 hash"
+        
+        voter.status = arc4.UInt64(op.setbit_uint64(status, VOTER_COMMITTED_BIT, 1))
+        voter.commit_hash = Hash.from_bytes(vote_hash)
+        self._store_voter(poll, Txn.sender, poll_id, voter)
     
     @abimethod
-    def start_reveal_phase(self) -> None:
+    def start_reveal_phase(self, poll_id: UInt64) -> None:
         """Start reveal phase (admin only)"""
         assert Txn.sender == self.admin.value, "Only admin can start reveal phase"
-        assert self.voting_phase.value == UInt64(2), "Must be in commit phase"
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(2), "Must be in commit phase"
         
-        self.voting_phase.value = UInt64(3)  # Reveal phase
+        poll.voting_phase = arc4.UInt64(3)  # Reveal phase
+        self.polls[poll_id] = poll.copy()
     
     @abimethod
-    def reveal_vote(self, vote_choice: UInt64, salt: Bytes) -> None:
+    def reveal_vote(self, poll_id: UInt64, vote_choice: UInt64, salt: Bytes) -> None:
         """Reveal a vote"""
-        assert self.voting_phase.value == UInt64(3), "Reveal phase not active"
-        assert self.vote_committed == UInt64(1), "Must have committed vote first"
-        assert self.vote_revealed == UInt64(0), "Already revealed vote"
-        assert Global.latest_timestamp <= self.reveal_deadline.value, "Reveal deadline passed"
-        assert vote_choice < UInt64(5), "Invalid vote choice"  # Max 5 options
-        
-        # Verify the hash matches the committed hash
-        # In a real implementation, you'd use a proper hash function
-        # For now, we'll use a simple concatenation as proof of concept
-        # expected_hash = Bytes(vote_choice.bytes + salt)
-        # assert expected_hash == self.vote_commit_hash, "Hash verification failed"
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(3), "Reveal phase not active"
+        voter = self._load_voter(poll, Txn.sender, poll_id)
+        status = voter.status.native
+        assert op.getbit(status, VOTER_COMMITTED_BIT), "Must have committed vote first"
+        assert not op.getbit(status, VOTER_REVEALED_BIT), "Already revealed vote"
+        assert Global.latest_timestamp <= poll.reveal_deadline.native, "Reveal deadline passed"
+        assert vote_choice < poll.option_count.native, "Invalid vote choice"
+        assert vote_commitment(vote_choice, salt) == voter.commit_hash.bytes, "Hash verification failed"
         
-        self.vote_revealed = UInt64(1)
-        self.vote_choice = vote_choice
+        voter.status = arc4.UInt64(
+            op.setbit_uint64(status, VOTER_REVEALED_BIT, 1) | (vote_choice << VOTER_CHOICE_SHIFT)
+        )
+        self._store_voter(poll, Txn.sender, poll_id, voter)
         
         # Count the vote
-        self.total_votes.value = self.total_votes.value + UInt64(1)
-        
-        # Increment the appropriate option counter
-        if vote_choice == UInt64(0):
-            self.option_0_votes.value = self.option_0_votes.value + UInt64(1)
-        elif vote_choice == UInt64(1):
-            self.option_1_votes.value = self.option_1_votes.value + UInt64(1)
-        elif vote_choice == UInt64(2):
-            self.option_2_votes.value = self.option_2_votes.value + UInt64(1)
-        elif vote_choice == UInt64(3):
-            self.option_3_votes.value = self.option_3_votes.value + UInt64(1)
-        elif vote_choice == UInt64(4):
-            self.option_4_votes.value = self.option_4_votes.value + UInt64(1)
+        poll.total_votes = arc4.UInt64(poll.total_votes.native + UInt64(1))
+        self.polls[poll_id] = poll.copy()
+        
+        # Increment the counter for the chosen option in place
+        tallies = BoxRef(key=tally_box_key(poll_id))
+        offset = vote_choice * UInt64(TALLY_SIZE)
+        count = op.btoi(tallies.extract(offset, UInt64(TALLY_SIZE)))
+        tallies.replace(offset, op.itob(count + UInt64(1)))
     
     @abimethod
-    def complete_voting(self) -> None:
+    def reveal_votes_batch(
+        self,
+        poll_id: UInt64,
+        voters: arc4.DynamicArray[arc4.Address],
+        choices: arc4.DynamicArray[arc4.UInt64],
+        salts: arc4.DynamicArray[arc4.DynamicBytes],
+    ) -> None:
+        """Reveal several committed votes at once (e.g. submitted by a relayer)"""
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(3), "Reveal phase not active"
+        assert Global.latest_timestamp <= poll.reveal_deadline.native, "Reveal deadline passed"
+        assert voters.length == choices.length, "Mismatched reveal arrays"
+        assert voters.length == salts.length, "Mismatched reveal arrays"
+        
+        # Tally in scratch and write the box back once for the whole batch
+        tally_box = BoxRef(key=tally_box_key(poll_id))
+        tallies = tally_box.value
+        for i in urange(voters.length):
+            account = voters[i].native
+            vote_choice = choices[i].native
+            assert vote_choice < poll.option_count.native, "Invalid vote choice"
+            voter = self._load_voter(poll, account, poll_id)
+            status = voter.status.native
+            assert op.getbit(status, VOTER_COMMITTED_BIT), "Must have committed vote first"
+            assert not op.getbit(status, VOTER_REVEALED_BIT), "Already revealed vote"
+            assert vote_commitment(vote_choice, salts[i].native) == voter.commit_hash.bytes, "Hash verification failed"
+            
+            voter.status = arc4.UInt64(
+                op.setbit_uint64(status, VOTER_REVEALED_BIT, 1) | (vote_choice << VOTER_CHOICE_SHIFT)
+            )
+            self._store_voter(poll, account, poll_id, voter)
+            
+            offset = vote_choice * UInt64(TALLY_SIZE)
+            tallies = op.replace(tallies, offset, op.itob(op.extract_uint64(tallies, offset) + UInt64(1)))
+        
+        tally_box.put(tallies)
+        poll.total_votes = arc4.UInt64(poll.total_votes.native + voters.length)
+        self.polls[poll_id] = poll.copy()
+    
+    @abimethod
+    def complete_voting(self, poll_id: UInt64) -> None:
         """Complete voting and finalize results (admin only)"""
         assert Txn.sender == self.admin.value, "Only admin can complete voting"
-        assert self.voting_phase.value == UInt64(3), "Must be in reveal phase"
-        assert Global.latest_timestamp > self.reveal_deadline.value, "Reveal deadline not yet passed"
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(3), "Must be in reveal phase"
+        assert Global.latest_timestamp > poll.reveal_deadline.native, "Reveal deadline not yet passed"
         
-        self.voting_phase.value = UInt64(4)  # Completed
+        poll.voting_phase = arc4.UInt64(4)  # Completed
+        self.polls[poll_id] = poll.copy()
     
-    @abimethod
-    def get_poll_info(self) -> tuple[String, String, String, UInt64, UInt64, UInt64, UInt64]:
-        """Get poll information"""
+    @abimethod(readonly=True)
+    def get_poll_info(self, poll_id: UInt64) -> tuple[String, String, UInt64, UInt64, UInt64, UInt64, UInt64]:
+        """Get poll information; option labels are fetched with get_options"""
+        poll = self._load_poll(poll_id)
+        info = self.poll_info[poll_id].copy()
         return (
-            self.poll_title.value,
-            self.poll_description.value,
-            self.poll_options.value,
-            self.voting_phase.value,
-            self.total_voters.value,
-            self.total_votes.value,
-            self.commit_deadline.value
+            info.title.native,
+            info.description.native,
+            poll.option_count.native,
+            poll.voting_phase.native,
+            poll.total_voters.native,
+            poll.total_votes.native,
+            poll.commit_deadline.native
         )
     
-    @abimethod
-    def get_vote_counts(self) -> tuple[UInt64, UInt64, UInt64, UInt64, UInt64]:
+    @abimethod(readonly=True)
+    def get_options(self, poll_id: UInt64, offset: UInt64, limit: UInt64) -> OptionList:
+        """
+        Get up to limit option labels starting at offset
+        
+        Only the requested slice of the options box is read. Its ARC-4 layout is a
+        uint16 length, a uint16 offset per label (relative to the end of the length)
+        and then the labels, so the page is re-encoded with offsets rebased to it.
+        """
+        poll = self._load_poll(poll_id)
+        option_count = poll.option_count.native
+        start = offset if offset < option_count else option_count
+        end = start + limit if limit < option_count - start else option_count
+        count = end - start
+        if count == UInt64(0):
+            return OptionList()
+        
+        options = BoxRef(key=options_box_key(poll_id))
+        heads = options.extract(UInt64(2) + start * UInt64(2), count * UInt64(2))
+        first = op.extract_uint16(heads, 0)
+        if end == option_count:
+            data_end = options.length - UInt64(2)
+        else:
+            data_end = op.btoi(options.extract(UInt64(2) + end * UInt64(2), UInt64(2)))
+        
+        page = arc4.UInt16(count).bytes
+        for i in urange(count):
+            page += arc4.UInt16(op.extract_uint16(heads, i * UInt64(2)) - first + count * UInt64(2)).bytes
+        page += options.extract(UInt64(2) + first, data_end - first)
+        return OptionList.from_bytes(page)
+    
+    @abimethod(readonly=True)
+    def get_vote_counts(self, poll_id: UInt64) -> arc4.DynamicArray[arc4.UInt64]:
         """Get vote counts for all options"""
-        return (
-            self.option_0_votes.value,
-            self.option_1_votes.value,
-            self.option_2_votes.value,
-            self.option_3_votes.value,
-            self.option_4_votes.value
+        poll = self._load_poll(poll_id)
+        return self._load_tallies(poll_id, poll.option_count.native)
+    
+    @abimethod(readonly=True)
+    def get_snapshot(self, poll_id: UInt64) -> PollSnapshot:
+        """Get phase, deadlines, totals and tallies of a poll in one call"""
+        poll = self._load_poll(poll_id)
+        return PollSnapshot(
+            voting_phase=poll.voting_phase,
+            commit_deadline=poll.commit_deadline,
+            reveal_deadline=poll.reveal_deadline,
+            total_voters=poll.total_voters,
+            total_votes=poll.total_votes,
+            tallies=self._load_tallies(poll_id, poll.option_count.native)
         )
     
-    @abimethod
-    def get_voter_status(self) -> tuple[UInt64, UInt64, UInt64]:
+    @abimethod(readonly=True)
+    def get_voter_status(self, poll_id: UInt64) -> tuple[UInt64, UInt64, UInt64]:
         """Get current voter's status"""
+        poll = self._load_poll(poll_id)
+        status = self._load_voter(poll, Txn.sender, poll_id).status.native
         return (
-            self.voter_registered,
-            self.vote_committed,
-            self.vote_revealed
+            op.getbit(status, VOTER_REGISTERED_BIT),
+            op.getbit(status, VOTER_COMMITTED_BIT),
+            op.getbit(status, VOTER_REVEALED_BIT)
         )
-    
+
+    @abimethod(readonly=True)
+    def get_voter_status_for(
+        self, poll_id: UInt64, voters: arc4.DynamicArray[arc4.Address]
+    ) -> arc4.DynamicArray[arc4.UInt64]:
+        """
+        Get the status words of several voters, in order
+
+        Each word has the registered, committed and revealed bits and the revealed
+        choice at VOTER_CHOICE_SHIFT; voters with no record get 0.
+        """
+        poll = self._load_poll(poll_id)
+        statuses = arc4.DynamicArray[arc4.UInt64]()
+        for i in urange(voters.length):
+            statuses.append(self._load_voter(poll, voters[i].native, poll_id).status)
+        return statuses
+
     @abimethod
-    def emergency_stop(self) -> None:
+    def emergency_stop(self, poll_id: UInt64) -> None:
         """Emergency stop voting (admin only)"""
         assert Txn.sender == self.admin.value, "Only admin can emergency stop"
-        self.voting_phase.value = UInt64(0)  # Reset to initial state
+        poll = self._load_poll(poll_id)
+        phase = poll.voting_phase.native
+        assert phase != UInt64(PHASE_ARCHIVED), "Poll is archived"
+        assert phase != UInt64(PHASE_STOPPED), "Poll is already stopped"
+        # Stopped is terminal: start_registration only accepts newly created polls
+        poll.voting_phase = arc4.UInt64(PHASE_STOPPED)
+        self.polls[poll_id] = poll.copy()
+    
+    @abimethod
+    def archive_poll(self, poll_id: UInt64) -> Hash:
+        """
+        Archive a completed or stopped poll (admin only), returning its results digest
+        
+        The digest is sha256(itob(poll_id) || itob(final_phase) || itob(total_voters)
+        || itob(total_votes) || tallies), where final_phase tells a completed poll (4)
+        from a stopped one (6). Both are kept in a box of its own. Once a poll is
+        archived, anyone can delete its voter records with reclaim_voters.
+        """
+        assert Txn.sender == self.admin.value, "Only admin can archive polls"
+        poll = self._load_poll(poll_id)
+        phase = poll.voting_phase.native
+        assert phase == UInt64(PHASE_COMPLETED) or phase == UInt64(PHASE_STOPPED), "Poll must be completed or stopped"
+        
+        tallies = BoxRef(key=tally_box_key(poll_id))
+        digest = Hash.from_bytes(
+            op.sha256(
+                op.itob(poll_id)
+                + op.itob(phase)
+                + op.itob(poll.total_voters.native)
+                + op.itob(poll.total_votes.native)
+                + tallies.value
+            )
+        )
+        self.results[poll_id] = ArchivedResults(final_phase=arc4.UInt64(phase), digest=digest.copy())
+        poll.voting_phase = arc4.UInt64(PHASE_ARCHIVED)
+        self.polls[poll_id] = poll.copy()
+        return digest
+    
+    @abimethod
+    def reclaim_voters(self, poll_id: UInt64, voters: arc4.DynamicArray[arc4.Address]) -> UInt64:
+        """
+        Delete the records of several voters of an archived poll, returning how many existed
+        
+        Anyone may call this. Deleting a voter box frees its min balance in the app
+        account, which is added to reclaimed for withdraw_reclaimed. Deleting a local
+        state record frees that voter's slot for another poll; the voter gets their own
+        min balance back by closing out.
+        """
+        poll = self._load_poll(poll_id)
+        assert poll.voting_phase.native == UInt64(PHASE_ARCHIVED), "Poll is not archived"
+        
+        deleted = UInt64(0)
+        for i in urange(voters.length):
+            account = voters[i].native
+            if poll.voter_storage.native == UInt64(VOTER_STORAGE_BOX):
+                key = voter_box_key(poll_id, account)
+                if key in self.voters:
+                    del self.voters[key]
+                    self.reclaimed.value += VOTER_BOX_MIN_BALANCE
+                    deleted += 1
+            else:
+                _value, exists = op.AppLocal.get_ex_bytes(account, Global.current_application_id, op.itob(poll_id))
+                if exists:
+                    op.AppLocal.delete(account, op.itob(poll_id))
+                    deleted += 1
+        return deleted
+    
+    @abimethod
+    def withdraw_reclaimed(self) -> UInt64:
+        """
+        Pay the min balance freed by reclaim_voters to the admin (admin only), returning the amount
+        
+        Only what reclaim_voters recorded in reclaimed is paid, never funding meant
+        for other polls' boxes, and never more than the balance above the app's min
+        balance. The caller's fee must cover the inner payment.
+        """
+        assert Txn.sender == self.admin.value, "Only admin can withdraw"
+        app = Global.current_application_address
+        amount = self.reclaimed.value
+        surplus = app.balance - app.min_balance
+        if surplus < amount:
+            amount = surplus
+        if amount:
+            itxn.Payment(receiver=self.admin.value, amount=amount, fee=0).submit()
+            self.reclaimed.value -= amount
+        return amount
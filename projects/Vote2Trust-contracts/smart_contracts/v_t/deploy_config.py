@@ -1,60 +1,177 @@
+import dataclasses
+import json
 import logging
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 import algokit_utils
 
+from smart_contracts._helpers import clients, telemetry
+from smart_contracts.v_t.storage import (
+    VOTER_STORAGE_BOX,
+    VOTER_STORAGE_LOCAL,
+    poll_min_balance,
+    voter_box_min_balance,
+)
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
 logger = logging.getLogger(__name__)
 
+# Protocol limit on transactions in an atomic group
+MAX_GROUP_SIZE = 16
+# Min balance of the app account itself, paid when the app is (re)created
+APP_ACCOUNT_MIN_BALANCE = 100_000
+
+
+@dataclasses.dataclass(frozen=True)
+class PollSpec:
+    title: str
+    description: str
+    options: list[str]
+    commit_duration: int = 3600  # 1 hour
+    reveal_duration: int = 3600  # 1 hour
+    voter_root: bytes = b""  # Merkle root from allowlist.py for allowlist mode
+    # Allowlist size; with box voter storage also the voter boxes funded up front
+    eligible_voters: int = 0
+    voter_storage: int = VOTER_STORAGE_LOCAL
+
+    @property
+    def min_balance(self) -> int:
+        balance = poll_min_balance(self.title, self.description, self.options)
+        if self.voter_storage == VOTER_STORAGE_BOX:
+            balance += voter_box_min_balance(self.eligible_voters)
+        return balance
+
+
+SAMPLE_POLLS = [
+    PollSpec(
+        title="Sample Governance Vote",
+        description="Should we implement the new feature X in our protocol?",
+        options=["Yes", "No", "Abstain"],
+    )
+]
+
+
+def load_polls(path: Path) -> list[PollSpec]:
+    """Reads polls from a JSON list of PollSpec fields, voter_root given as hex."""
+    return [
+        PollSpec(**{**poll, "voter_root": bytes.fromhex(poll.get("voter_root", ""))})
+        for poll in json.loads(path.read_text())
+    ]
+
+
+def _polls_per_group(funded: bool) -> int:
+    # Each poll takes a create_poll and a start_registration call
+    return (MAX_GROUP_SIZE - int(funded)) // 2
+
+
+def create_polls(
+    algorand: algokit_utils.AlgorandClient,
+    app_client: "Vote2TrustClient",
+    polls: Sequence[PollSpec],
+    *,
+    sender: str,
+    first_poll_id: int,
+    extra_funding: int = 0,
+) -> list[int]:
+    """
+    Funds the app for the polls' boxes, creates the polls and opens their registration,
+    all in as few atomic groups as fit: one group (one confirmation) for up to seven
+    polls, then eight more per additional group. Poll ids are handed out sequentially,
+    so first_poll_id (the app's poll_count) lets start_registration reference each new
+    poll within the same group.
+    """
+    poll_ids: list[int] = []
+    remaining = list(polls)
+    funding = extra_funding + sum(poll.min_balance for poll in polls)
+    while remaining or funding:
+        batch = remaining[: _polls_per_group(funded=funding > 0)]
+        remaining = remaining[len(batch) :]
+        composer = app_client.new_group()
+        if funding:
+            composer = composer.add_transaction(
+                algorand.create_transaction.payment(
+                    algokit_utils.PaymentParams(
+                        amount=algokit_utils.AlgoAmount(micro_algo=funding),
+                        sender=sender,
+                        receiver=app_client.app_address,
+                    )
+                )
+            )
+            funding = 0
+        next_poll_id = first_poll_id + len(poll_ids)
+        batch_ids = list(range(next_poll_id, next_poll_id + len(batch)))
+        for poll_id, poll in zip(batch_ids, batch, strict=True):
+            composer = composer.create_poll(
+                args=(
+                    poll.title,
+                    poll.description,
+                    poll.options,
+                    poll.commit_duration,
+                    poll.reveal_duration,
+                )
+            ).start_registration(
+                args=(poll_id, poll.voter_root, poll.eligible_voters, poll.voter_storage)
+            )
+        result = telemetry.send(algorand.client.algod, "create_polls", composer)
+        created = [abi_return.value for abi_return in result.returns if abi_return.value is not None]
+        if created != batch_ids:
+            raise Exception(f"Expected poll ids {batch_ids}, the app assigned {created}")
+        poll_ids.extend(batch_ids)
+        logger.info(f"Created polls {batch_ids} and opened registration in one group")
+    return poll_ids
+
 
 # define deployment behaviour based on supplied app spec
 def deploy() -> None:
-    from smart_contracts.artifacts.v_t.v_t_client import (
-        Vote2TrustFactory,
-    )
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustFactory
 
-    algorand = algokit_utils.AlgorandClient.from_environment()
+    algorand = clients.algorand_client()
     deployer_ = algorand.account.from_environment("DEPLOYER")
 
     factory = algorand.client.get_typed_app_factory(
         Vote2TrustFactory, default_sender=deployer_.address
     )
 
-    app_client, result = factory.deploy(
-        on_update=algokit_utils.OnUpdate.AppendApp,
-        on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
-    )
-
-    if result.operation_performed in [
+    # factory.deploy looks up the app and signs and sends it in one call, so only its
+    # compile is timed apart; the app manager caches the result for deploy to reuse
+    with telemetry.timed("deploy_app", "build"):
+        factory.compile()
+    with telemetry.timed("deploy_app", "send"):
+        app_client, result = factory.deploy(
+            on_update=algokit_utils.OnUpdate.AppendApp,
+            on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
+        )
+    created = result.operation_performed in [
         algokit_utils.OperationPerformed.Create,
         algokit_utils.OperationPerformed.Replace,
-    ]:
-        # Fund the contract with ALGO for storage
-        algorand.send.payment(
-            algokit_utils.PaymentParams(
-                amount=algokit_utils.AlgoAmount(algo=2),  # More ALGO for voting contract
-                sender=deployer_.address,
-                receiver=app_client.app_address,
-            )
-        )
+    ]
 
     logger.info(
         f"Vote2Trust contract deployed at {app_client.app_address} "
         f"with app ID {app_client.app_id}"
     )
-    
-    # Create a sample poll for testing
+
+    # Set POLLS_FILE to a JSON list of polls to provision an election environment,
+    # otherwise a sample poll is created for testing
+    polls_file = os.getenv("POLLS_FILE")
+    polls = load_polls(Path(polls_file)) if polls_file else SAMPLE_POLLS
     try:
-        response = app_client.send.create_poll(
-            title="Sample Governance Vote",
-            description="Should we implement the new feature X in our protocol?",
-            options='["Yes", "No", "Abstain"]',
-            commit_duration=3600,  # 1 hour
-            reveal_duration=3600   # 1 hour
+        first_poll_id = 0 if created else app_client.state.global_state.poll_count
+        create_polls(
+            algorand,
+            app_client,
+            polls,
+            sender=deployer_.address,
+            first_poll_id=first_poll_id,
+            # Fund the contract for its own min balance along with the polls' storage
+            extra_funding=APP_ACCOUNT_MIN_BALANCE if created else 0,
         )
-        logger.info("Sample poll created successfully")
-        
-        # Start registration phase
-        app_client.send.start_registration()
-        logger.info("Registration phase started")
-        
     except Exception as e:
-        logger.warning(f"Could not create sample poll: {e}")
+        logger.warning(f"Could not create polls: {e}")
+    clients.log_stats()
+    telemetry.flush()
@@ -0,0 +1,369 @@
+"""
+Rebuilds Vote2Trust poll tallies and voter status from the chain into SQLite.
+
+Blocks are streamed in round order, either from algod or from a directory of
+msgpack-encoded blocks (<round>.msgpack, as returned by algod's block endpoint).
+Every confirmed app call to the Vote2Trust app is decoded by its ABI selector and
+applied to the polls, tallies and voters tables. Each block is applied in one SQLite
+transaction together with the checkpoint of its round, so a restart resumes from the
+next unprocessed round instead of rescanning the chain.
+
+Reveals are counted whatever the contract accepted, and the salt is checked against
+the stored commitment independently, so the result can be audited against the
+contract's own tallies.
+
+Usage: python -m smart_contracts.v_t.indexer --app-id 1234 --db tallies.sqlite --from-round 100
+"""
+
+import argparse
+import collections
+import dataclasses
+import hashlib
+import logging
+import sqlite3
+from collections.abc import Callable, Container, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Protocol
+
+import msgpack
+from algosdk import abi, encoding
+from algosdk.v2client.algod import AlgodClient
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the ARC-4 return value log
+RETURN_PREFIX = bytes.fromhex("151f7c75")
+# Blocks fetched ahead of the one being applied while catching up
+DEFAULT_PREFETCH = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    app_id INTEGER PRIMARY KEY,
+    last_round INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS polls (
+    app_id INTEGER NOT NULL,
+    poll_id INTEGER NOT NULL,
+    voting_phase INTEGER NOT NULL,
+    option_count INTEGER NOT NULL,
+    total_voters INTEGER NOT NULL,
+    total_votes INTEGER NOT NULL,
+    created_round INTEGER NOT NULL,
+    PRIMARY KEY (app_id, poll_id)
+);
+CREATE TABLE IF NOT EXISTS tallies (
+    app_id INTEGER NOT NULL,
+    poll_id INTEGER NOT NULL,
+    option INTEGER NOT NULL,
+    votes INTEGER NOT NULL,
+    PRIMARY KEY (app_id, poll_id, option)
+);
+CREATE TABLE IF NOT EXISTS voters (
+    app_id INTEGER NOT NULL,
+    poll_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    registered INTEGER NOT NULL DEFAULT 0,
+    committed INTEGER NOT NULL DEFAULT 0,
+    revealed INTEGER NOT NULL DEFAULT 0,
+    choice INTEGER,
+    commit_hash BLOB,
+    salt BLOB,
+    commitment_valid INTEGER,
+    last_round INTEGER NOT NULL,
+    PRIMARY KEY (app_id, poll_id, address)
+);
+"""
+
+
+class BlockSource(Protocol):
+    def blocks(self, start_round: int) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yields (round, decoded block) from start_round onwards, in order."""
+        ...
+
+
+def decode_block(raw: bytes) -> dict[str, Any]:
+    return msgpack.unpackb(raw, raw=False, strict_map_key=False)  # type: ignore[no-any-return]
+
+
+class AlgodBlockSource:
+    """
+    Follows algod. While behind, up to prefetch blocks are downloaded concurrently
+    ahead of the one being applied; once caught up it waits for each new round.
+    """
+
+    def __init__(self, algod: AlgodClient, *, prefetch: int = DEFAULT_PREFETCH) -> None:
+        self.algod = algod
+        self.prefetch = prefetch
+
+    def _fetch(self, round_: int) -> dict[str, Any]:
+        return decode_block(self.algod.block_info(round_num=round_, response_format="msgpack"))
+
+    def blocks(self, start_round: int) -> Iterator[tuple[int, dict[str, Any]]]:
+        last_round = self.algod.status()["last-round"]
+        next_fetch = start_round
+        pending: collections.deque[tuple[int, Future[dict[str, Any]]]] = collections.deque()
+        pool = ThreadPoolExecutor(self.prefetch)
+        try:
+            while True:
+                while len(pending) < self.prefetch and next_fetch <= last_round:
+                    pending.append((next_fetch, pool.submit(self._fetch, next_fetch)))
+                    next_fetch += 1
+                if not pending:
+                    last_round = self.algod.status_after_block(last_round)["last-round"]
+                    continue
+                round_, block = pending.popleft()
+                yield round_, block.result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+class FixtureBlockSource:
+    """Replays <round>.msgpack files from a directory, e.g. captured from a test network."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def blocks(self, start_round: int) -> Iterator[tuple[int, dict[str, Any]]]:
+        rounds = sorted(int(path.stem) for path in self.directory.glob("*.msgpack"))
+        for round_ in rounds:
+            if round_ >= start_round:
+                yield round_, decode_block((self.directory / f"{round_}.msgpack").read_bytes())
+
+
+@dataclasses.dataclass
+class AppCall:
+    round: int
+    app_id: int
+    sender: str
+    args: list[Any]
+    return_value: bytes | None
+
+
+def app_calls(
+    round_: int, block: dict[str, Any], app_ids: Container[int], methods: dict[bytes, abi.Method]
+) -> Iterator[tuple[abi.Method, AppCall]]:
+    """Decodes the block's top-level calls to any of app_ids that invoke one of methods (by selector)."""
+    for signed in block["block"].get("txns") or []:
+        txn = signed["txn"]
+        if txn.get("type") != "appl" or txn.get("apid") not in app_ids:
+            continue
+        app_args = txn.get("apaa") or []
+        if not app_args or app_args[0] not in methods:
+            continue
+        method = methods[app_args[0]]
+        logs = signed.get("dt", {}).get("lg") or []
+        return_value = (
+            logs[-1][len(RETURN_PREFIX):]
+            if logs and logs[-1].startswith(RETURN_PREFIX)
+            else None
+        )
+        yield method, AppCall(
+            round=round_,
+            app_id=txn["apid"],
+            sender=encoding.encode_address(txn["snd"]),
+            args=[
+                arg.type.decode(value)
+                for arg, value in zip(method.args, app_args[1:], strict=True)
+            ],
+            return_value=return_value,
+        )
+
+
+class TallyIndexer:
+    """Applies Vote2Trust app calls to SQLite, one transaction per block."""
+
+    def __init__(self, db_path: Path | str, app_id: int) -> None:
+        self.app_id = app_id
+        self.db = sqlite3.connect(db_path)
+        # WAL lets readers query while the indexer writes, and NORMAL sync skips an
+        # fsync per commit, which is what keeps a per-block transaction cheap
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        # Databases indexed before revealed salts were kept lack the column
+        if "salt" not in {row[1] for row in self.db.execute("PRAGMA table_info(voters)")}:
+            self.db.execute("ALTER TABLE voters ADD COLUMN salt BLOB")
+        self._methods: dict[bytes, abi.Method] = {}
+        self._handlers: dict[bytes, Callable[[AppCall], None]] = {}
+        for signature, handler in (
+            ("create_poll(string,string,string[],uint64,uint64)uint64", self._create_poll),
+            ("start_registration(uint64,byte[],uint64,uint64)void", self._start_registration),
+            ("register_voter(uint64)void", self._register_voter),
+            ("start_commit_phase(uint64)void", self._set_phase(2)),
+            ("commit_vote(uint64,byte[],byte[])void", self._commit_vote),
+            ("start_reveal_phase(uint64)void", self._set_phase(3)),
+            ("reveal_vote(uint64,uint64,byte[])void", self._reveal_vote),
+            ("reveal_votes_batch(uint64,address[],uint64[],byte[][])void", self._reveal_votes_batch),
+            ("complete_voting(uint64)void", self._set_phase(4)),
+            ("emergency_stop(uint64)void", self._set_phase(6)),
+            ("archive_poll(uint64)byte[32]", self._set_phase(5)),
+        ):
+            method = abi.Method.from_signature(signature)
+            self._methods[method.get_selector()] = method
+            self._handlers[method.get_selector()] = handler
+
+    def close(self) -> None:
+        self.db.close()
+
+    @property
+    def last_round(self) -> int | None:
+        row = self.db.execute(
+            "SELECT last_round FROM checkpoint WHERE app_id = ?", (self.app_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    # --------------------------- Method handlers --------------------------- #
+
+    def _update_poll(self, poll_id: int, assignments: str, *params: Any) -> None:
+        self.db.execute(
+            f"UPDATE polls SET {assignments} WHERE app_id = ? AND poll_id = ?",
+            (*params, self.app_id, poll_id),
+        )
+
+    def _upsert_voter(self, call: AppCall, address: str, **fields: Any) -> None:
+        columns = ", ".join(fields)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in fields)
+        self.db.execute(
+            f"INSERT INTO voters (app_id, poll_id, address, last_round, {columns})"
+            f" VALUES (?, ?, ?, ?, {', '.join('?' for _ in fields)})"
+            f" ON CONFLICT (app_id, poll_id, address) DO UPDATE SET"
+            f" last_round = excluded.last_round, {updates}",
+            (self.app_id, call.args[0], address, call.round, *fields.values()),
+        )
+
+    def _create_poll(self, call: AppCall) -> None:
+        if call.return_value is None:
+            logger.warning(f"create_poll in round {call.round} logged no poll id, skipping")
+            return
+        poll_id = int.from_bytes(call.return_value, "big")
+        option_count = len(call.args[2])
+        self.db.execute(
+            "INSERT OR REPLACE INTO polls VALUES (?, ?, 0, ?, 0, 0, ?)",
+            (self.app_id, poll_id, option_count, call.round),
+        )
+        self.db.executemany(
+            "INSERT OR REPLACE INTO tallies VALUES (?, ?, ?, 0)",
+            ((self.app_id, poll_id, option) for option in range(option_count)),
+        )
+
+    def _start_registration(self, call: AppCall) -> None:
+        poll_id, voter_root, eligible_voters, _voter_storage = call.args
+        # With an allowlist the eligible count is fixed up front, otherwise it grows per registration
+        self._update_poll(
+            poll_id, "voting_phase = 1, total_voters = ?", eligible_voters if voter_root else 0
+        )
+
+    def _set_phase(self, phase: int) -> Callable[[AppCall], None]:
+        def handler(call: AppCall) -> None:
+            self._update_poll(call.args[0], "voting_phase = ?", phase)
+
+        return handler
+
+    def _register_voter(self, call: AppCall) -> None:
+        self._upsert_voter(call, call.sender, registered=1)
+        self._update_poll(call.args[0], "total_voters = total_voters + 1")
+
+    def _commit_vote(self, call: AppCall) -> None:
+        # Allowlisted voters register implicitly with their commit
+        self._upsert_voter(
+            call, call.sender, registered=1, committed=1, commit_hash=bytes(call.args[1])
+        )
+
+    def _reveal(self, call: AppCall, address: str, choice: int, salt: bytes) -> None:
+        poll_id = call.args[0]
+        row = self.db.execute(
+            "SELECT commit_hash FROM voters WHERE app_id = ? AND poll_id = ? AND address = ?",
+            (self.app_id, poll_id, address),
+        ).fetchone()
+        commitment = hashlib.sha256(choice.to_bytes(8, "big") + salt).digest()
+        self._upsert_voter(
+            call,
+            address,
+            revealed=1,
+            choice=choice,
+            salt=salt,
+            commitment_valid=int(row is not None and row[0] == commitment),
+        )
+        self.db.execute(
+            "UPDATE tallies SET votes = votes + 1 WHERE app_id = ? AND poll_id = ? AND option = ?",
+            (self.app_id, poll_id, choice),
+        )
+
+    def _reveal_vote(self, call: AppCall) -> None:
+        poll_id, choice, salt = call.args
+        self._reveal(call, call.sender, choice, bytes(salt))
+        self._update_poll(poll_id, "total_votes = total_votes + 1")
+
+    def _reveal_votes_batch(self, call: AppCall) -> None:
+        poll_id, voters, choices, salts = call.args
+        for address, choice, salt in zip(voters, choices, salts, strict=True):
+            self._reveal(call, address, choice, bytes(salt))
+        self._update_poll(poll_id, "total_votes = total_votes + ?", len(voters))
+
+    # --------------------------- Block processing --------------------------- #
+
+    def process_block(self, round_: int, block: dict[str, Any]) -> int:
+        """Applies one block and checkpoints its round atomically; returns the calls applied."""
+        applied = 0
+        with self.db:
+            for method, call in app_calls(round_, block, {self.app_id}, self._methods):
+                self._handlers[method.get_selector()](call)
+                applied += 1
+            self.db.execute(
+                "INSERT INTO checkpoint (app_id, last_round) VALUES (?, ?)"
+                " ON CONFLICT (app_id) DO UPDATE SET last_round = excluded.last_round",
+                (self.app_id, round_),
+            )
+        return applied
+
+    def run(self, source: BlockSource, *, from_round: int = 1, until_round: int | None = None) -> None:
+        """Processes blocks from just after the checkpoint (or from_round) until until_round."""
+        last_round = self.last_round
+        start_round = last_round + 1 if last_round is not None else from_round
+        logger.info(f"Indexing app {self.app_id} from round {start_round}")
+        for round_, block in source.blocks(start_round):
+            if until_round is not None and round_ > until_round:
+                break
+            if applied := self.process_block(round_, block):
+                logger.debug(f"Round {round_}: applied {applied} app calls")
+            if until_round is not None and round_ >= until_round:
+                break
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app-id", type=int, required=True)
+    parser.add_argument("--db", type=Path, default=Path("tallies.sqlite"))
+    parser.add_argument(
+        "--from-round", type=int, default=1, help="first round to scan when there is no checkpoint"
+    )
+    parser.add_argument("--until-round", type=int, help="stop after this round instead of following")
+    parser.add_argument(
+        "--fixtures", type=Path, help="read <round>.msgpack blocks from this directory instead of algod"
+    )
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH)
+    args = parser.parse_args()
+
+    source: BlockSource
+    if args.fixtures:
+        source = FixtureBlockSource(args.fixtures)
+    else:
+        from smart_contracts._helpers import clients
+
+        algod = clients.algorand_client().client.algod
+        source = AlgodBlockSource(algod, prefetch=args.prefetch)
+
+    indexer = TallyIndexer(args.db, args.app_id)
+    try:
+        indexer.run(source, from_round=args.from_round, until_round=args.until_round)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Indexed up to round {indexer.last_round}")
+        indexer.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
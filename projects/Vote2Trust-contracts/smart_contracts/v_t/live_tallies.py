@@ -0,0 +1,271 @@
+"""
+Streams live Vote2Trust tallies to any number of viewers as Server-Sent Events.
+
+One follower reads each confirmed block once, from algod or a directory of
+<round>.msgpack fixtures, and turns its create_poll, reveal_vote and
+reveal_votes_batch calls into per-poll tally deltas for every followed app. A viewer
+of GET /apps/<app_id>/polls/<poll_id>/tallies first gets a `snapshot` event with
+the full tallies, then one `delta` event per round in which the poll changed.
+Failed transactions never make it into a block, so every reveal seen here is one
+the contract counted.
+
+Each viewer has a mailbox that merges pending deltas instead of queueing them. A
+slow client therefore receives fewer, larger deltas. It never holds more than one
+pending change per option. A client whose socket stays full for longer than
+--max-stall-seconds is disconnected. Node load is the block stream alone, however
+many viewers there are.
+
+Usage: python -m smart_contracts.v_t.live_tallies --app-id 1234 --from-round 100 --port 8080
+"""
+
+import argparse
+import asyncio
+import collections
+import dataclasses
+import json
+import logging
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from algosdk import abi
+
+from smart_contracts.v_t.indexer import (
+    DEFAULT_PREFETCH,
+    BlockSource,
+    FixtureBlockSource,
+    app_calls,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_STALL_SECONDS = 30.0
+# Comment line sent to idle viewers so proxies keep the connection open
+KEEPALIVE_SECONDS = 15.0
+
+_METHODS = {
+    method.get_selector(): method
+    for method in (
+        abi.Method.from_signature("create_poll(string,string,string[],uint64,uint64)uint64"),
+        abi.Method.from_signature("reveal_vote(uint64,uint64,byte[])void"),
+        abi.Method.from_signature("reveal_votes_batch(uint64,address[],uint64[],byte[][])void"),
+    )
+}
+_TALLIES_PATH = re.compile(r"^/apps/(\d+)/polls/(\d+)/tallies$")
+
+PollKey = tuple[int, int]
+
+
+def block_deltas(
+    round_: int, block: dict[str, Any], app_ids: set[int]
+) -> tuple[dict[PollKey, int], dict[PollKey, collections.Counter[int]]]:
+    """Options of the polls created in the block, and the votes each poll gained per option."""
+    created: dict[PollKey, int] = {}
+    deltas: dict[PollKey, collections.Counter[int]] = collections.defaultdict(collections.Counter)
+    for method, call in app_calls(round_, block, app_ids, _METHODS):
+        if method.name == "create_poll":
+            if call.return_value is not None:
+                created[(call.app_id, int.from_bytes(call.return_value, "big"))] = len(call.args[2])
+        elif method.name == "reveal_vote":
+            deltas[(call.app_id, call.args[0])][call.args[1]] += 1
+        else:
+            deltas[(call.app_id, call.args[0])].update(call.args[2])
+    return created, deltas
+
+
+class Mailbox:
+    """One viewer's pending deltas for a poll, merged until the viewer takes them."""
+
+    def __init__(self) -> None:
+        self.pending: collections.Counter[int] = collections.Counter()
+        self.round = 0
+        self._ready = asyncio.Event()
+
+    def post(self, round_: int, delta: collections.Counter[int]) -> None:
+        self.pending.update(delta)
+        self.round = round_
+        self._ready.set()
+
+    async def take(self) -> tuple[int, dict[int, int]]:
+        """Waits for changes, then returns (latest round, everything merged since the last take)."""
+        await self._ready.wait()
+        self._ready.clear()
+        pending, self.pending = self.pending, collections.Counter()
+        return self.round, dict(pending)
+
+
+class TallyHub:
+    """In-memory tallies of every followed poll and the viewers subscribed to each."""
+
+    def __init__(self) -> None:
+        self.round = 0
+        self.tallies: dict[PollKey, list[int]] = {}
+        self._subscribers: dict[PollKey, set[Mailbox]] = collections.defaultdict(set)
+
+    @property
+    def viewers(self) -> int:
+        return sum(len(mailboxes) for mailboxes in self._subscribers.values())
+
+    def apply(
+        self,
+        round_: int,
+        created: dict[PollKey, int],
+        deltas: dict[PollKey, collections.Counter[int]],
+    ) -> None:
+        for key, option_count in created.items():
+            self.tallies[key] = [0] * option_count
+        for key, delta in deltas.items():
+            if not delta:
+                # An empty reveal_votes_batch changes nothing
+                continue
+            tallies = self.tallies.setdefault(key, [])
+            # Polls created before the follower's first round grow as their options are seen
+            tallies.extend([0] * (max(delta) + 1 - len(tallies)))
+            for option, votes in delta.items():
+                tallies[option] += votes
+            for mailbox in self._subscribers.get(key, ()):
+                mailbox.post(round_, delta)
+        self.round = round_
+
+    def subscribe(self, key: PollKey) -> tuple[Mailbox, int, list[int]]:
+        """Registers a viewer; returns its mailbox with the round and tallies it starts from."""
+        mailbox = Mailbox()
+        self._subscribers[key].add(mailbox)
+        return mailbox, self.round, list(self.tallies.get(key, []))
+
+    def unsubscribe(self, key: PollKey, mailbox: Mailbox) -> None:
+        self._subscribers[key].discard(mailbox)
+        if not self._subscribers[key]:
+            del self._subscribers[key]
+
+
+async def follow(hub: TallyHub, source: BlockSource, app_ids: set[int], *, from_round: int) -> None:
+    """Feeds the hub one block at a time; blocks are fetched and decoded off the event loop."""
+
+    def next_deltas(
+        blocks: Iterator[tuple[int, dict[str, Any]]],
+    ) -> tuple[int, dict[PollKey, int], dict[PollKey, collections.Counter[int]]] | None:
+        for round_, block in blocks:
+            return (round_, *block_deltas(round_, block, app_ids))
+        return None
+
+    blocks = source.blocks(from_round)
+    while (update := await asyncio.to_thread(next_deltas, blocks)) is not None:
+        hub.apply(*update)
+    logger.info(f"Block source ended after round {hub.round}")
+
+
+def _event(name: str, round_: int, data: dict[str, Any]) -> bytes:
+    return f"event: {name}\nid: {round_}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class TallyServer:
+    def __init__(self, hub: TallyHub, *, max_stall_seconds: float = DEFAULT_MAX_STALL_SECONDS) -> None:
+        self.hub = hub
+        self.max_stall_seconds = max_stall_seconds
+
+    async def _send(self, writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(data)
+        # Backpressure: a viewer that cannot take this write in time is dropped, and
+        # while we wait its mailbox keeps merging deltas rather than growing
+        await asyncio.wait_for(writer.drain(), self.max_stall_seconds)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()).strip():
+                pass  # Headers are not needed
+            match = _TALLIES_PATH.match(request_line[1]) if len(request_line) >= 2 else None
+            if request_line[:1] != ["GET"] or match is None:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+            await self._stream(writer, (int(match[1]), int(match[2])))
+        except (ConnectionError, TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter, key: PollKey) -> None:
+        mailbox, round_, tallies = self.hub.subscribe(key)
+        try:
+            await self._send(
+                writer,
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n"
+                + _event("snapshot", round_, {"app_id": key[0], "poll_id": key[1], "tallies": tallies}),
+            )
+            while True:
+                try:
+                    round_, delta = await asyncio.wait_for(mailbox.take(), KEEPALIVE_SECONDS)
+                except TimeoutError:
+                    await self._send(writer, b": keepalive\n\n")
+                    continue
+                await self._send(
+                    writer,
+                    _event("delta", round_, {"delta": {str(option): votes for option, votes in delta.items()}}),
+                )
+        finally:
+            self.hub.unsubscribe(key, mailbox)
+
+
+async def serve(
+    source: BlockSource,
+    app_ids: set[int],
+    *,
+    from_round: int,
+    host: str,
+    port: int,
+    max_stall_seconds: float = DEFAULT_MAX_STALL_SECONDS,
+) -> None:
+    hub = TallyHub()
+    server = await asyncio.start_server(
+        TallyServer(hub, max_stall_seconds=max_stall_seconds).handle, host, port
+    )
+    logger.info(f"Serving tallies for apps {sorted(app_ids)} on {host}:{port}")
+    async with server:
+        await asyncio.gather(server.serve_forever(), follow(hub, source, app_ids, from_round=from_round))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app-id", type=int, action="append", required=True)
+    parser.add_argument("--from-round", type=int, required=True, help="a round at or before the polls' creation")
+    parser.add_argument(
+        "--fixtures", type=Path, help="read <round>.msgpack blocks from this directory instead of algod"
+    )
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-stall-seconds", type=float, default=DEFAULT_MAX_STALL_SECONDS)
+    args = parser.parse_args()
+
+    source: BlockSource
+    if args.fixtures:
+        source = FixtureBlockSource(args.fixtures)
+    else:
+        from smart_contracts._helpers import clients
+        from smart_contracts.v_t.indexer import AlgodBlockSource
+
+        algod = clients.algorand_client().client.algod
+        source = AlgodBlockSource(algod, prefetch=args.prefetch)
+
+    try:
+        asyncio.run(
+            serve(
+                source,
+                set(args.app_id),
+                from_round=args.from_round,
+                host=args.host,
+                port=args.port,
+                max_stall_seconds=args.max_stall_seconds,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
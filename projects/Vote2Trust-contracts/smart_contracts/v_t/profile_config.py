@@ -0,0 +1,167 @@
+import logging
+from collections.abc import Iterator
+
+import algokit_utils
+
+from smart_contracts._helpers.profiler import ProfileStep
+from smart_contracts.v_t.commitments import commitment
+from smart_contracts.v_t.reveal_batch import PROFILED_BATCH, PROFILED_PAIR_BATCH
+
+logger = logging.getLogger(__name__)
+
+COMMIT_DURATION = 60
+REVEAL_DURATION = 60
+
+
+# define the calls `python -m smart_contracts profile` simulates, in an order that
+# walks a poll through every phase
+def profile_steps(
+    algorand: algokit_utils.AlgorandClient, deployer: algokit_utils.SigningAccount
+) -> Iterator[ProfileStep]:
+    from smart_contracts.artifacts.v_t.v_t_client import (
+        CreatePollArgs,
+        Vote2TrustFactory,
+    )
+
+    factory = algorand.client.get_typed_app_factory(
+        Vote2TrustFactory, default_sender=deployer.address
+    )
+    app_client, _ = factory.send.create.bare()
+    algorand.send.payment(
+        algokit_utils.PaymentParams(
+            amount=algokit_utils.AlgoAmount(algo=1),
+            sender=deployer.address,
+            receiver=app_client.app_address,
+        )
+    )
+
+    dispenser = algorand.account.localnet_dispenser()
+    # One voter reveals directly; the others are revealed by batches of one and of two,
+    # whose difference gives reveal_batch the cost of each reveal
+    voters = [algorand.account.random() for _ in range(4)]
+    for voter in voters:
+        algorand.account.ensure_funded(voter, dispenser, algokit_utils.AlgoAmount(algo=1))
+    voter_client, *relayed_clients = (
+        app_client.clone(default_sender=voter.address, default_signer=voter.signer)
+        for voter in voters
+    )
+    salt = b"\x01" * 32
+    vote_hash = commitment(1, salt)
+
+    poll_args = CreatePollArgs(
+        title="Profile poll",
+        description="Poll created by the opcode profiler",
+        options=["Yes", "No", "Abstain"],
+        commit_duration=COMMIT_DURATION,
+        reveal_duration=REVEAL_DURATION,
+    )
+    yield ProfileStep("create_poll", lambda: app_client.new_group().create_poll(args=poll_args))
+    poll_id = 0
+
+    yield ProfileStep(
+        "start_registration",
+        lambda: app_client.new_group().start_registration(args=(poll_id, b"", 0, 0)),
+    )
+    yield ProfileStep(
+        "register_voter",
+        lambda: voter_client.new_group().opt_in.register_voter(args=(poll_id,)),
+    )
+    for relayed_client in relayed_clients:
+        relayed_client.send.opt_in.register_voter(args=(poll_id,))
+    yield ProfileStep(
+        "get_voter_status",
+        lambda: voter_client.new_group().get_voter_status(args=(poll_id,)),
+        send=False,
+    )
+    yield ProfileStep(
+        "get_voter_status_for",
+        lambda: app_client.new_group().get_voter_status_for(
+            args=(poll_id, [voter.address for voter in voters])
+        ),
+        send=False,
+    )
+
+    yield ProfileStep(
+        "start_commit_phase", lambda: app_client.new_group().start_commit_phase(args=(poll_id,))
+    )
+    yield ProfileStep(
+        "commit_vote",
+        lambda: voter_client.new_group().commit_vote(args=(poll_id, vote_hash, b"")),
+    )
+    for relayed_client in relayed_clients:
+        relayed_client.send.commit_vote(args=(poll_id, vote_hash, b""))
+
+    yield ProfileStep(
+        "start_reveal_phase", lambda: app_client.new_group().start_reveal_phase(args=(poll_id,))
+    )
+    yield ProfileStep(
+        "reveal_vote",
+        lambda: voter_client.new_group().reveal_vote(args=(poll_id, 1, salt)),
+    )
+    yield ProfileStep(
+        PROFILED_BATCH,
+        lambda: app_client.new_group().reveal_votes_batch(
+            args=(poll_id, [voters[1].address], [1], [salt])
+        ),
+    )
+    yield ProfileStep(
+        PROFILED_PAIR_BATCH,
+        lambda: app_client.new_group().reveal_votes_batch(
+            args=(poll_id, [voter.address for voter in voters[2:]], [1, 1], [salt, salt])
+        ),
+    )
+    yield ProfileStep(
+        "get_poll_info", lambda: app_client.new_group().get_poll_info(args=(poll_id,)), send=False
+    )
+    yield ProfileStep(
+        "get_options",
+        lambda: app_client.new_group().get_options(args=(poll_id, 0, 2)),
+        send=False,
+    )
+    yield ProfileStep(
+        "get_vote_counts",
+        lambda: app_client.new_group().get_vote_counts(args=(poll_id,)),
+        send=False,
+    )
+    yield ProfileStep(
+        "get_snapshot", lambda: app_client.new_group().get_snapshot(args=(poll_id,)), send=False
+    )
+
+    # Move LocalNet's clock past the reveal deadline instead of waiting for it; the
+    # offset applies from the next block, so produce one
+    algorand.client.algod.set_timestamp_offset(COMMIT_DURATION + REVEAL_DURATION + 1)
+    algorand.send.payment(
+        algokit_utils.PaymentParams(
+            amount=algokit_utils.AlgoAmount(micro_algo=0),
+            sender=deployer.address,
+            receiver=deployer.address,
+        )
+    )
+    try:
+        yield ProfileStep(
+            "complete_voting", lambda: app_client.new_group().complete_voting(args=(poll_id,))
+        )
+    finally:
+        algorand.client.algod.set_timestamp_offset(0)
+
+    yield ProfileStep(
+        "emergency_stop", lambda: app_client.new_group().emergency_stop(args=(poll_id,))
+    )
+    yield ProfileStep(
+        "archive_poll", lambda: app_client.new_group().archive_poll(args=(poll_id,))
+    )
+    yield ProfileStep(
+        "reclaim_voters",
+        lambda: app_client.new_group().reclaim_voters(
+            args=(poll_id, [voter.address for voter in voters])
+        ),
+    )
+    yield ProfileStep(
+        "withdraw_reclaimed",
+        lambda: app_client.new_group().withdraw_reclaimed(
+            # Covers the inner payment to the admin
+            params=algokit_utils.CommonAppCallParams(
+                static_fee=algokit_utils.AlgoAmount(micro_algo=2_000)
+            )
+        ),
+    )
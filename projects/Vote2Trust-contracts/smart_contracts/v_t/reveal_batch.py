@@ -0,0 +1,186 @@
+import dataclasses
+import logging
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import algokit_utils
+
+from smart_contracts._helpers import telemetry
+from smart_contracts._helpers.profiler import load_baseline
+from smart_contracts.v_t.storage import (
+    VOTER_STORAGE_BOX,
+    VOTER_STORAGE_LOCAL,
+    poll_box_references,
+    voter_box_key,
+)
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
+logger = logging.getLogger(__name__)
+
+# An app call can reference at most 4 foreign accounts and 8 resources in all, and
+# every revealed voter's record has to be reachable from the call that reveals it.
+# Each call also references the poll and tally boxes, so a call can hold 4
+# local-state voters or 6 voter boxes
+REVEALS_PER_CALL = 4
+BOX_REVEALS_PER_CALL = 6
+# Protocol limit on transactions in an atomic group; opcode budget is pooled across it
+MAX_GROUP_SIZE = 16
+# Opcode budget each app call adds to its group's pool
+APP_CALL_BUDGET = 700
+# profile_config profiles reveal_votes_batch with one and with two reveals; the
+# difference between the two is the cost of a reveal
+PROFILED_BATCH = "reveal_votes_batch"
+PROFILED_PAIR_BATCH = "reveal_votes_batch[2]"
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True)
+class Reveal:
+    voter: str
+    choice: int
+    salt: bytes
+
+
+@dataclasses.dataclass(frozen=True)
+class RevealCost:
+    """Opcode cost of a reveal_votes_batch call: per_call once, plus per_reveal per voter."""
+
+    per_call: int
+    per_reveal: int
+
+    @classmethod
+    def from_baseline(cls, baseline: dict[str, dict[str, Any]]) -> "RevealCost":
+        """
+        Derives the cost from the profiled one- and two-reveal batches in a profile
+        baseline, or returns ESTIMATED_REVEAL_COST if either is missing.
+        """
+        if PROFILED_BATCH not in baseline or PROFILED_PAIR_BATCH not in baseline:
+            return ESTIMATED_REVEAL_COST
+        one = baseline[PROFILED_BATCH]["opcode_cost"]
+        two = baseline[PROFILED_PAIR_BATCH]["opcode_cost"]
+        return cls(per_call=2 * one - two, per_reveal=two - one)
+
+    def calls_for(self, reveals: int) -> int:
+        """Fewest calls whose pooled budget covers this many reveals."""
+        return -(-reveals * self.per_reveal // (APP_CALL_BUDGET - self.per_call))
+
+
+# Upper estimates read off the contract source, not measured: routing, argument
+# decoding and the poll and tally box reads and writes per call, and per reveal the
+# voter record load and store, sha256 (35 opcodes alone) and the tally update. Used
+# until profile_baseline.json holds measured figures
+ESTIMATED_REVEAL_COST = RevealCost(per_call=160, per_reveal=200)
+
+
+def _chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _spread(items: Sequence[T], parts: int) -> Iterator[Sequence[T]]:
+    """Splits items into parts that differ in length by at most one."""
+    size, extra = divmod(len(items), parts)
+    start = 0
+    for part in range(parts):
+        end = start + size + (part < extra)
+        yield items[start:end]
+        start = end
+
+
+def plan_groups(
+    reveals: Iterable[Reveal],
+    voter_storage: int = VOTER_STORAGE_LOCAL,
+    cost: RevealCost = ESTIMATED_REVEAL_COST,
+) -> list[list[Sequence[Reveal]]]:
+    """
+    Splits reveals into atomic groups of reveal_votes_batch calls. Each group holds as
+    many reveals as the references of 16 calls and their pooled opcode budget allow,
+    spread over just enough calls to pay for them.
+    """
+    if cost.per_call + cost.per_reveal > APP_CALL_BUDGET:
+        raise ValueError(
+            f"A reveal costs {cost.per_call + cost.per_reveal} opcodes, more than one app call's "
+            f"budget of {APP_CALL_BUDGET}"
+        )
+    per_call = BOX_REVEALS_PER_CALL if voter_storage == VOTER_STORAGE_BOX else REVEALS_PER_CALL
+    group_size = min(
+        MAX_GROUP_SIZE * per_call,
+        MAX_GROUP_SIZE * (APP_CALL_BUDGET - cost.per_call) // cost.per_reveal,
+    )
+    groups = []
+    for group in _chunks(list(reveals), group_size):
+        calls = max(-(-len(group) // per_call), cost.calls_for(len(group)))
+        groups.append(list(_spread(group, calls)))
+    return groups
+
+
+def _send_group(
+    app_client: "Vote2TrustClient",
+    poll_id: int,
+    calls: Sequence[Sequence[Reveal]],
+    voter_storage: int,
+    sender: str | None,
+) -> algokit_utils.SendAtomicTransactionComposerResults:
+    composer = app_client.new_group()
+    for call in calls:
+        if voter_storage == VOTER_STORAGE_BOX:
+            references = algokit_utils.CommonAppCallParams(
+                sender=sender,
+                box_references=[
+                    *poll_box_references(poll_id),
+                    *(
+                        algokit_utils.BoxReference(app_id=0, name=voter_box_key(poll_id, reveal.voter))
+                        for reveal in call
+                    ),
+                ],
+            )
+        else:
+            references = algokit_utils.CommonAppCallParams(
+                sender=sender,
+                account_references=[reveal.voter for reveal in call],
+                box_references=poll_box_references(poll_id),
+            )
+        composer = composer.reveal_votes_batch(
+            args=(
+                poll_id,
+                [reveal.voter for reveal in call],
+                [reveal.choice for reveal in call],
+                [reveal.salt for reveal in call],
+            ),
+            params=references,
+        )
+    return telemetry.send(app_client.algorand.client.algod, "reveal_votes_batch", composer)
+
+
+def submit_reveals(
+    app_client: "Vote2TrustClient",
+    poll_id: int,
+    reveals: Iterable[Reveal],
+    *,
+    voter_storage: int = VOTER_STORAGE_LOCAL,
+    sender: str | None = None,
+    max_workers: int = 4,
+    cost: RevealCost | None = None,
+) -> list[algokit_utils.SendAtomicTransactionComposerResults]:
+    """
+    Submits reveals as maximum-size atomic groups of reveal_votes_batch calls.
+    voter_storage is the poll's, and decides whether each call references the
+    voters' accounts or their voter boxes. Groups are sized by cost, which defaults
+    to the figures in this contract's profile baseline. Groups are independent of
+    each other, so they are sent concurrently.
+    """
+    if cost is None:
+        cost = RevealCost.from_baseline(load_baseline(Path(__file__).parent))
+    groups = plan_groups(reveals, voter_storage, cost)
+    logger.info(f"Submitting {len(groups)} reveal group(s) with {max_workers} worker(s)")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(
+                lambda calls: _send_group(app_client, poll_id, calls, voter_storage, sender), groups
+            )
+        )
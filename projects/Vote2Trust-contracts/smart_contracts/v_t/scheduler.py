@@ -0,0 +1,368 @@
+"""
+Fires Vote2Trust phase transitions at their deadlines, for any number of polls and apps.
+
+A single asyncio loop keeps a min-heap of the next transition due for every tracked
+poll: start_reveal_phase at the commit deadline, complete_voting once the reveal
+deadline has passed, and start_commit_phase when an operator-chosen registration
+close time is given. Polls still being created or registering with no close time
+are kept aside and re-planned on every rescan, so they are scheduled once the admin
+opens and closes registration by hand. Each transition re-reads the poll before submitting, so polls
+advanced by hand are simply re-planned, and a failed submit (e.g. the chain clock
+still lagging the deadline) is retried with backoff.
+
+Time and chain access go through the Clock and PhaseClient protocols, so the loop
+can be driven by a fake clock against a local stand-in node.
+
+Usage: python -m smart_contracts.v_t.scheduler --app-id 1234 --app-id 5678
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import heapq
+import itertools
+import logging
+import time
+from typing import TYPE_CHECKING, Protocol
+
+from smart_contracts._helpers import telemetry
+
+if TYPE_CHECKING:
+    import algokit_utils
+
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
+logger = logging.getLogger(__name__)
+
+PHASE_CREATED = 0
+PHASE_REGISTRATION = 1
+PHASE_COMMIT = 2
+PHASE_REVEAL = 3
+
+RETRY_BASE_SECONDS = 2.0
+RETRY_MAX_SECONDS = 60.0
+MAX_ATTEMPTS = 20
+MAX_IN_FLIGHT = 32
+
+
+class Clock(Protocol):
+    def now(self) -> float:
+        """Current unix time in seconds."""
+        ...
+
+    async def sleep(self, seconds: float) -> None: ...
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+@dataclasses.dataclass(frozen=True)
+class PollState:
+    voting_phase: int
+    commit_deadline: int
+    reveal_deadline: int
+
+
+class PhaseClient(Protocol):
+    async def poll_state(self, app_id: int, poll_id: int) -> PollState: ...
+
+    async def transition(self, app_id: int, poll_id: int, method: str) -> None:
+        """Submits method (e.g. start_reveal_phase) for the poll and waits for it to confirm."""
+        ...
+
+    async def poll_count(self, app_id: int) -> int:
+        """Number of polls the app has created, which is also the id of the next one."""
+        ...
+
+
+@dataclasses.dataclass(order=True)
+class _Entry:
+    due: float
+    sequence: int
+    app_id: int = dataclasses.field(compare=False)
+    poll_id: int = dataclasses.field(compare=False)
+    version: int = dataclasses.field(compare=False)
+
+
+@dataclasses.dataclass
+class _Poll:
+    registration_closes_at: float | None = None
+    version: int = 0
+    attempts: int = 0
+
+
+class PhaseScheduler:
+    """
+    Usage:
+        scheduler = PhaseScheduler(client)
+        await scheduler.track(app_id, poll_id)
+        await scheduler.run()
+    """
+
+    def __init__(
+        self,
+        client: PhaseClient,
+        *,
+        clock: Clock | None = None,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ) -> None:
+        self.client = client
+        self.clock = clock or SystemClock()
+        self._heap: list[_Entry] = []
+        self._polls: dict[tuple[int, int], _Poll] = {}
+        # Polls waiting for a transition only the admin can make, re-planned by rescan_waiting
+        self._waiting: set[tuple[int, int]] = set()
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def tracked(self) -> int:
+        return len(self._polls)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def _push(self, app_id: int, poll_id: int, due: float) -> None:
+        poll = self._polls[(app_id, poll_id)]
+        # Bumping the version makes any entry already in the heap for this poll stale
+        poll.version += 1
+        heapq.heappush(
+            self._heap, _Entry(due, next(self._sequence), app_id, poll_id, poll.version)
+        )
+        self._changed.set()
+
+    def _next_transition(self, poll: _Poll, state: PollState) -> tuple[str, float] | None:
+        if state.voting_phase == PHASE_REGISTRATION and poll.registration_closes_at is not None:
+            return "start_commit_phase", poll.registration_closes_at
+        if state.voting_phase == PHASE_COMMIT:
+            return "start_reveal_phase", float(state.commit_deadline)
+        if state.voting_phase == PHASE_REVEAL:
+            # complete_voting needs the latest block timestamp to be past the deadline
+            return "complete_voting", float(state.reveal_deadline + 1)
+        return None
+
+    async def track(
+        self, app_id: int, poll_id: int, *, registration_closes_at: float | None = None
+    ) -> None:
+        """
+        Starts scheduling a poll's transitions. Polls waiting on the admin are kept for
+        rescan_waiting, and polls with nothing left to do are dropped.
+        """
+        key = (app_id, poll_id)
+        poll = self._polls.setdefault(key, _Poll())
+        if registration_closes_at is not None:
+            poll.registration_closes_at = registration_closes_at
+        await self._plan(app_id, poll_id)
+
+    def untrack(self, app_id: int, poll_id: int) -> None:
+        self._polls.pop((app_id, poll_id), None)
+        self._waiting.discard((app_id, poll_id))
+
+    async def rescan_waiting(self) -> None:
+        """
+        Re-plans every poll waiting on the admin, e.g. after registration was opened.
+        Polls that could not be read keep waiting for the next rescan.
+        """
+        waiting, self._waiting = list(self._waiting), set()
+        results = await asyncio.gather(
+            *(self._plan(app_id, poll_id) for app_id, poll_id in waiting), return_exceptions=True
+        )
+        for (app_id, poll_id), result in zip(waiting, results):
+            if isinstance(result, Exception):
+                logger.warning(f"App {app_id} poll {poll_id}: rescan failed ({result}), retrying next rescan")
+                if (app_id, poll_id) in self._polls:
+                    self._waiting.add((app_id, poll_id))
+
+    def _park(self, app_id: int, poll_id: int, state: PollState) -> None:
+        """Keeps a poll with no transition due for rescan_waiting, or drops it if it is finished."""
+        if state.voting_phase in (PHASE_CREATED, PHASE_REGISTRATION):
+            self._waiting.add((app_id, poll_id))
+            return
+        logger.info(f"App {app_id} poll {poll_id} has no scheduled transitions left")
+        self.untrack(app_id, poll_id)
+
+    async def _plan(self, app_id: int, poll_id: int) -> None:
+        poll = self._polls.get((app_id, poll_id))
+        if poll is None:
+            return
+        state = await self.client.poll_state(app_id, poll_id)
+        transition = self._next_transition(poll, state)
+        if transition is None:
+            self._park(app_id, poll_id, state)
+            return
+        self._push(app_id, poll_id, transition[1])
+
+    async def _fire(self, entry: _Entry) -> None:
+        key = (entry.app_id, entry.poll_id)
+        async with self._in_flight:
+            poll = self._polls.get(key)
+            if poll is None:
+                return
+            try:
+                state = await self.client.poll_state(entry.app_id, entry.poll_id)
+                transition = self._next_transition(poll, state)
+                if transition is None:
+                    self._park(entry.app_id, entry.poll_id, state)
+                    return
+                method, due = transition
+                if due > self.clock.now():
+                    # The poll moved on (or back) since this entry was planned
+                    self._push(entry.app_id, entry.poll_id, due)
+                    return
+                await self.client.transition(entry.app_id, entry.poll_id, method)
+                logger.info(f"App {entry.app_id} poll {entry.poll_id}: {method} confirmed")
+                poll.attempts = 0
+                await self._plan(entry.app_id, entry.poll_id)
+            except Exception as e:
+                poll.attempts += 1
+                if poll.attempts >= MAX_ATTEMPTS:
+                    logger.error(
+                        f"App {entry.app_id} poll {entry.poll_id}: giving up after "
+                        f"{poll.attempts} attempts: {e}"
+                    )
+                    self.untrack(entry.app_id, entry.poll_id)
+                    return
+                delay = min(RETRY_BASE_SECONDS * 2 ** (poll.attempts - 1), RETRY_MAX_SECONDS)
+                logger.warning(
+                    f"App {entry.app_id} poll {entry.poll_id}: attempt {poll.attempts} "
+                    f"failed ({e}), retrying in {delay:.0f}s"
+                )
+                self._push(entry.app_id, entry.poll_id, self.clock.now() + delay)
+
+    def _pop_due(self) -> list[_Entry]:
+        now = self.clock.now()
+        due = []
+        while self._heap and self._heap[0].due <= now:
+            entry = heapq.heappop(self._heap)
+            poll = self._polls.get((entry.app_id, entry.poll_id))
+            if poll is not None and poll.version == entry.version:
+                due.append(entry)
+        return due
+
+    async def _wait_for_next(self) -> None:
+        """Sleeps until the earliest entry is due or the heap changes."""
+        self._changed.clear()
+        changed = asyncio.ensure_future(self._changed.wait())
+        waiters = {changed}
+        if self._heap:
+            waiters.add(asyncio.ensure_future(self.clock.sleep(self._heap[0].due - self.clock.now())))
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def run(self) -> None:
+        """Runs until cancelled."""
+        try:
+            while True:
+                for entry in self._pop_due():
+                    task = asyncio.create_task(self._fire(entry))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                await self._wait_for_next()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+
+class AlgokitPhaseClient:
+    """PhaseClient backed by the generated Vote2Trust client, run off the event loop."""
+
+    def __init__(self, algorand: "algokit_utils.AlgorandClient", sender: str) -> None:
+        self.algorand = algorand
+        self.sender = sender
+        self._clients: dict[int, "Vote2TrustClient"] = {}
+
+    def _client(self, app_id: int) -> "Vote2TrustClient":
+        from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
+        if app_id not in self._clients:
+            self._clients[app_id] = Vote2TrustClient(
+                algorand=self.algorand, app_id=app_id, default_sender=self.sender
+            )
+        return self._clients[app_id]
+
+    async def poll_state(self, app_id: int, poll_id: int) -> PollState:
+        result = await asyncio.to_thread(self._client(app_id).send.get_snapshot, args=(poll_id,))
+        snapshot = result.abi_return
+        assert snapshot is not None
+        return PollState(
+            voting_phase=snapshot.voting_phase,
+            commit_deadline=snapshot.commit_deadline,
+            reveal_deadline=snapshot.reveal_deadline,
+        )
+
+    async def transition(self, app_id: int, poll_id: int, method: str) -> None:
+        composer = getattr(self._client(app_id).new_group(), method)(args=(poll_id,))
+        await asyncio.to_thread(telemetry.send, self.algorand.client.algod, method, composer)
+
+    async def poll_count(self, app_id: int) -> int:
+        state = await asyncio.to_thread(lambda: self._client(app_id).state.global_state.poll_count)
+        return int(state)
+
+
+async def follow_apps(
+    scheduler: PhaseScheduler, client: PhaseClient, app_ids: list[int], rescan_seconds: float
+) -> None:
+    """
+    Every rescan_seconds, re-plans the polls waiting on the admin and starts tracking
+    polls created since the last scan. A failed scan is logged and retried on the next
+    one, so a node error does not stop the scheduler. Runs until cancelled.
+    """
+    known: dict[int, int] = {app_id: 0 for app_id in app_ids}
+    while True:
+        try:
+            await scheduler.rescan_waiting()
+            for app_id, next_poll_id in known.items():
+                poll_count = await client.poll_count(app_id)
+                for poll_id in range(next_poll_id, poll_count):
+                    await scheduler.track(app_id, poll_id)
+                    known[app_id] = poll_id + 1
+            logger.info(f"Tracking {scheduler.tracked} polls, {scheduler.waiting} waiting on the admin")
+        except Exception:
+            logger.exception(f"Rescan failed, retrying in {rescan_seconds:.0f}s")
+        telemetry.flush()
+        await scheduler.clock.sleep(rescan_seconds)
+
+
+async def _serve(app_ids: list[int], rescan_seconds: float) -> None:
+    from smart_contracts._helpers import clients
+
+    algorand = clients.algorand_client()
+    admin = algorand.account.from_environment("DEPLOYER")
+    client = AlgokitPhaseClient(algorand, admin.address)
+    scheduler = PhaseScheduler(client)
+    runner = asyncio.create_task(scheduler.run())
+    try:
+        await follow_apps(scheduler, client, app_ids, rescan_seconds)
+    finally:
+        runner.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app-id", type=int, action="append", required=True)
+    parser.add_argument("--rescan-seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    try:
+        asyncio.run(_serve(args.app_id, args.rescan_seconds))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, TypeVar
+
+import algokit_utils
+
+from smart_contracts.v_t.storage import poll_box_references
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.v_t.v_t_client import PollSnapshot, Vote2TrustClient
+
+logger = logging.getLogger(__name__)
+
+# Algorand produces a block roughly every 3 seconds, so a round number seen less than
+# a second ago is almost always still current
+DEFAULT_ROUND_TTL = 1.0
+
+T = TypeVar("T")
+
+
+class SnapshotCache:
+    """
+    Caches get_snapshot results per poll and confirmed round. State only changes when
+    a block is added, so every reader asking about a poll within one round gets the
+    same snapshot; concurrent readers of a snapshot not yet cached wait for a single
+    simulate call instead of each making their own. The current round itself is
+    fetched at most once per round_ttl seconds.
+
+    Safe to share between threads, e.g. across a web server's request handlers.
+    """
+
+    def __init__(
+        self, app_client: "Vote2TrustClient", *, round_ttl: float = DEFAULT_ROUND_TTL
+    ) -> None:
+        self.app_client = app_client
+        self.round_ttl = round_ttl
+        self._lock = threading.Lock()
+        self._round: Future[int] | None = None
+        self._round_fetched_at = 0.0
+        self._snapshots: dict[tuple[int, int], Future["PollSnapshot"]] = {}
+
+    def _single_flight(
+        self, future: "Future[T]", fetch: Callable[[], T], forget: Callable[[], None]
+    ) -> T:
+        """Runs fetch into a future other threads are waiting on; forget drops it on failure."""
+        try:
+            future.set_result(fetch())
+        except BaseException as error:
+            future.set_exception(error)
+            with self._lock:
+                forget()
+        return future.result()
+
+    def _forget_round(self, future: "Future[int]") -> None:
+        if self._round is future:
+            self._round = None
+
+    def current_round(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            future = self._round
+            owner = future is None or now - self._round_fetched_at >= self.round_ttl
+            if owner:
+                future = self._round = Future()
+                self._round_fetched_at = now
+        assert future is not None
+        if not owner:
+            return future.result()
+        algod = self.app_client.algorand.client.algod
+        return self._single_flight(
+            future, lambda: algod.status()["last-round"], lambda: self._forget_round(future)
+        )
+
+    def _fetch(self, poll_id: int) -> "PollSnapshot":
+        # get_snapshot is read-only, so the client simulates it: no fee and nothing signed
+        result = self.app_client.send.get_snapshot(
+            args=(poll_id,),
+            params=algokit_utils.CommonAppCallParams(
+                box_references=poll_box_references(poll_id)
+            ),
+        )
+        return result.abi_return  # type: ignore[return-value]
+
+    def get(self, poll_id: int) -> "PollSnapshot":
+        """The poll's snapshot as of the current round."""
+        current_round = self.current_round()
+        key = (poll_id, current_round)
+        with self._lock:
+            future = self._snapshots.get(key)
+            owner = future is None
+            if owner:
+                # Snapshots of earlier rounds will never be asked for again
+                self._snapshots = {
+                    cached_key: cached
+                    for cached_key, cached in self._snapshots.items()
+                    if cached_key[1] >= current_round
+                }
+                future = self._snapshots[key] = Future()
+        assert future is not None
+        if not owner:
+            return future.result()
+        logger.debug(f"Fetching snapshot of poll {poll_id} for round {current_round}")
+        return self._single_flight(
+            future, lambda: self._fetch(poll_id), lambda: self._snapshots.pop(key, None)
+        )
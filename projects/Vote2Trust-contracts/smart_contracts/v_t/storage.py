@@ -0,0 +1,112 @@
+"""Client-side mirror of the Vote2Trust box layout, for box references and funding."""
+
+import algokit_utils
+from algosdk import encoding
+
+POLL_PREFIX = b"p"
+POLL_INFO_PREFIX = b"i"
+TALLY_PREFIX = b"t"
+OPTIONS_PREFIX = b"o"
+VOTER_PREFIX = b"v"
+RESULTS_PREFIX = b"r"
+
+# Values of start_registration's voter_storage argument
+VOTER_STORAGE_LOCAL = 0
+VOTER_STORAGE_BOX = 1
+# Local state slots the app declares; a local-state voter's record for a poll takes one
+VOTER_POLL_SLOTS = 1
+
+# Protocol local state min balance: the opt-in plus a flat fee per byte-slice slot
+OPT_IN_MIN_BALANCE = 100_000
+BYTES_SLOT_MIN_BALANCE = 50_000
+# Protocol box min balance: a flat fee per box plus a fee per byte of key and value
+BOX_FLAT_MIN_BALANCE = 2_500
+BOX_BYTE_MIN_BALANCE = 400
+# PollRecord: seven uint64 fields and the 32 byte voter root
+POLL_RECORD_SIZE = 7 * 8 + 32
+# Offset of voter_storage, after voting_phase and the five other uint64 fields before it
+POLL_VOTER_STORAGE_OFFSET = 6 * 8
+TALLY_SIZE = 8
+# VoterRecord: the uint64 status word and the 32 byte commitment
+VOTER_RECORD_SIZE = 8 + 32
+# ArchivedResults: the uint64 final phase and the 32 byte results digest
+RESULTS_SIZE = 8 + 32
+
+
+def _key(prefix: bytes, poll_id: int) -> bytes:
+    return prefix + poll_id.to_bytes(8, "big")
+
+
+def poll_box_key(poll_id: int) -> bytes:
+    return _key(POLL_PREFIX, poll_id)
+
+
+def poll_info_box_key(poll_id: int) -> bytes:
+    return _key(POLL_INFO_PREFIX, poll_id)
+
+
+def tally_box_key(poll_id: int) -> bytes:
+    return _key(TALLY_PREFIX, poll_id)
+
+
+def options_box_key(poll_id: int) -> bytes:
+    return _key(OPTIONS_PREFIX, poll_id)
+
+
+def results_box_key(poll_id: int) -> bytes:
+    return _key(RESULTS_PREFIX, poll_id)
+
+
+def voter_box_prefix(poll_id: int) -> bytes:
+    """Common prefix of every voter box key of a poll."""
+    return _key(VOTER_PREFIX, poll_id)
+
+
+def voter_box_key(poll_id: int, address: str) -> bytes:
+    return voter_box_prefix(poll_id) + encoding.decode_address(address)
+
+
+def poll_box_references(
+    poll_id: int, *, info: bool = False, options: bool = False
+) -> list[algokit_utils.BoxReference]:
+    """Box references for a call touching a poll's record and tallies."""
+    keys = [poll_box_key(poll_id), tally_box_key(poll_id)]
+    if info:
+        keys.append(poll_info_box_key(poll_id))
+    if options:
+        keys.append(options_box_key(poll_id))
+    return [algokit_utils.BoxReference(app_id=0, name=key) for key in keys]
+
+
+def _arc4_string_size(value: str) -> int:
+    return 2 + len(value.encode())
+
+
+def _box_min_balance(value_size: int, key_size: int = len(_key(POLL_PREFIX, 0))) -> int:
+    return BOX_FLAT_MIN_BALANCE + BOX_BYTE_MIN_BALANCE * (key_size + value_size)
+
+
+def poll_min_balance(title: str, description: str, options: list[str]) -> int:
+    """Microalgos the app account must hold for the four boxes create_poll makes."""
+    info_size = 2 * 2 + _arc4_string_size(title) + _arc4_string_size(description)
+    options_size = 2 + sum(2 + _arc4_string_size(option) for option in options)
+    return sum(
+        _box_min_balance(size)
+        for size in (POLL_RECORD_SIZE, info_size, options_size, TALLY_SIZE * len(options))
+    )
+
+
+def voter_box_min_balance(voters: int) -> int:
+    """Microalgos the app account must hold for voters' records in a VOTER_STORAGE_BOX poll."""
+    # Key is the prefix, the poll id and the 32 byte address
+    return voters * _box_min_balance(VOTER_RECORD_SIZE, len(_key(VOTER_PREFIX, 0)) + 32)
+
+
+def results_box_min_balance() -> int:
+    """Microalgos the app account must hold for the digest box archive_poll creates."""
+    return _box_min_balance(RESULTS_SIZE)
+
+
+def voter_local_min_balance() -> int:
+    """Microalgos an opted-in voter of a VOTER_STORAGE_LOCAL poll locks, on top of their account minimum."""
+    return OPT_IN_MIN_BALANCE + BYTES_SLOT_MIN_BALANCE * VOTER_POLL_SLOTS
@@ -0,0 +1,270 @@
+"""
+Archives a finished Vote2Trust poll and deletes its voter records in parallel groups.
+
+archive_poll records the poll's results digest. After that, reclaim_voters deletes
+voter records in batches. The sweep sends maximum-size groups of reclaim_voters
+calls concurrently, so even a large election's voter records are cleared in a few
+rounds. The poll's own boxes (record, info, options and tallies) and its results box
+stay, so the results remain readable. Deleted voter boxes free their min balance in
+the app account, and --withdraw pays out exactly that amount to the admin. Voters in
+local-state polls get their own slot back at once, and their min balance back when
+they close out.
+
+Voters come from the tally indexer's SQLite database, or from a file with one address
+per line. For box-stored polls they are otherwise read from the app's box list, one
+page of voter boxes at a time.
+
+Usage: python -m smart_contracts.v_t.sweeper --app-id 1234 --poll-id 0 --archive --db tallies.sqlite
+"""
+
+import argparse
+import base64
+import logging
+import sqlite3
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeVar
+
+import algokit_utils
+from algosdk import constants, encoding
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers import telemetry
+from smart_contracts.v_t.storage import (
+    POLL_VOTER_STORAGE_OFFSET,
+    VOTER_STORAGE_BOX,
+    poll_box_key,
+    poll_box_references,
+    results_box_key,
+    results_box_min_balance,
+    voter_box_key,
+    voter_box_prefix,
+)
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
+logger = logging.getLogger(__name__)
+
+# An app call can reference at most 4 foreign accounts and 8 resources in all. Each
+# call also references the poll box, so a call can hold 4 local-state voters or 7
+# voter boxes
+LOCAL_VOTERS_PER_CALL = 4
+BOX_VOTERS_PER_CALL = 7
+# Protocol limit on transactions in an atomic group
+MAX_GROUP_SIZE = 16
+DEFAULT_MAX_WORKERS = 4
+# Box names algod returns per page when listing a poll's voter boxes
+BOX_PAGE_SIZE = 1_000
+
+T = TypeVar("T")
+
+
+def _chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def plan_groups(voters: Sequence[str], voter_storage: int) -> list[list[Sequence[str]]]:
+    """Splits voters into full atomic groups of reclaim_voters calls."""
+    per_call = BOX_VOTERS_PER_CALL if voter_storage == VOTER_STORAGE_BOX else LOCAL_VOTERS_PER_CALL
+    calls = list(_chunks(voters, per_call))
+    return [list(group) for group in _chunks(calls, MAX_GROUP_SIZE)]
+
+
+def poll_voter_storage(algod: AlgodClient, app_id: int, poll_id: int) -> int:
+    """Where the poll keeps voter records, read from its PollRecord box."""
+    box = algod.application_box_by_name(app_id, poll_box_key(poll_id))
+    record = base64.b64decode(box["value"])  # type: ignore[index]
+    return int.from_bytes(record[POLL_VOTER_STORAGE_OFFSET : POLL_VOTER_STORAGE_OFFSET + 8], "big")
+
+
+def voters_from_index(db_path: Path, app_id: int, poll_id: int) -> list[str]:
+    """Every voter of the poll seen by the tally indexer."""
+    db = sqlite3.connect(db_path)
+    try:
+        rows = db.execute(
+            "SELECT address FROM voters WHERE app_id = ? AND poll_id = ? ORDER BY address",
+            (app_id, poll_id),
+        ).fetchall()
+    finally:
+        db.close()
+    return [address for (address,) in rows]
+
+
+def voters_from_boxes(algod: AlgodClient, app_id: int, poll_id: int) -> list[str]:
+    """
+    Owners of the poll's remaining voter boxes. algod filters the app's boxes by the
+    poll's key prefix and returns them BOX_PAGE_SIZE at a time, so no single request
+    has to list every box of the app.
+    """
+    prefix = voter_box_prefix(poll_id)
+    params: dict[str, int | str] = {
+        "max": BOX_PAGE_SIZE,
+        "prefix": "b64:" + base64.b64encode(prefix).decode(),
+    }
+    voters = []
+    while True:
+        page = algod.algod_request("GET", f"/applications/{app_id}/boxes", params=params)
+        assert isinstance(page, dict)
+        for box in page.get("boxes") or []:
+            name = base64.b64decode(box["name"])
+            if name.startswith(prefix):
+                voters.append(encoding.encode_address(name[len(prefix) :]))
+        next_token = page.get("next-token")
+        if not next_token:
+            return voters
+        params["next"] = next_token
+
+
+def archive(
+    algorand: algokit_utils.AlgorandClient,
+    app_client: "Vote2TrustClient",
+    poll_id: int,
+    *,
+    sender: str,
+) -> bytes:
+    """Funds the digest box and archives the poll, returning its results digest."""
+    composer = (
+        app_client.new_group()
+        .add_transaction(
+            algorand.create_transaction.payment(
+                algokit_utils.PaymentParams(
+                    amount=algokit_utils.AlgoAmount(micro_algo=results_box_min_balance()),
+                    sender=sender,
+                    receiver=app_client.app_address,
+                )
+            )
+        )
+        .archive_poll(
+            args=(poll_id,),
+            params=algokit_utils.CommonAppCallParams(
+                sender=sender,
+                box_references=[
+                    *poll_box_references(poll_id),
+                    algokit_utils.BoxReference(app_id=0, name=results_box_key(poll_id)),
+                ],
+            ),
+        )
+    )
+    result = telemetry.send(algorand.client.algod, "archive_poll", composer)
+    return bytes(result.returns[-1].value)  # type: ignore[arg-type]
+
+
+def _send_group(
+    app_client: "Vote2TrustClient",
+    poll_id: int,
+    calls: Sequence[Sequence[str]],
+    voter_storage: int,
+    sender: str | None,
+) -> int:
+    composer = app_client.new_group()
+    for call in calls:
+        if voter_storage == VOTER_STORAGE_BOX:
+            references = algokit_utils.CommonAppCallParams(
+                sender=sender,
+                box_references=[
+                    algokit_utils.BoxReference(app_id=0, name=key)
+                    for key in (poll_box_key(poll_id), *(voter_box_key(poll_id, voter) for voter in call))
+                ],
+            )
+        else:
+            references = algokit_utils.CommonAppCallParams(
+                sender=sender,
+                account_references=list(call),
+                box_references=[algokit_utils.BoxReference(app_id=0, name=poll_box_key(poll_id))],
+            )
+        composer = composer.reclaim_voters(args=(poll_id, list(call)), params=references)
+    result = telemetry.send(app_client.algorand.client.algod, "reclaim_voters", composer)
+    return sum(abi_return.value for abi_return in result.returns)  # type: ignore[misc]
+
+
+def sweep(
+    app_client: "Vote2TrustClient",
+    poll_id: int,
+    voters: Sequence[str],
+    *,
+    voter_storage: int,
+    sender: str | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> int:
+    """
+    Deletes the voter records of an archived poll as maximum-size atomic groups of
+    reclaim_voters calls. Groups are independent of each other, so they are sent
+    concurrently. Returns how many records were deleted.
+    """
+    groups = plan_groups(voters, voter_storage)
+    logger.info(f"Reclaiming {len(voters)} voter(s) in {len(groups)} group(s) with {max_workers} worker(s)")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(
+            executor.map(
+                lambda calls: _send_group(app_client, poll_id, calls, voter_storage, sender), groups
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app-id", type=int, required=True)
+    parser.add_argument("--poll-id", type=int, required=True)
+    parser.add_argument("--archive", action="store_true", help="archive the poll before sweeping")
+    voter_source = parser.add_mutually_exclusive_group()
+    voter_source.add_argument("--db", type=Path, help="tally indexer database listing the poll's voters")
+    voter_source.add_argument("--addresses", type=Path, help="file with one voter address per line")
+    parser.add_argument(
+        "--withdraw", action="store_true", help="pay the min balance freed by voter boxes to the admin"
+    )
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    from smart_contracts._helpers import clients
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
+    load_dotenv()
+    algorand = clients.algorand_client()
+    admin = algorand.account.from_environment("DEPLOYER")
+    app_client = Vote2TrustClient(algorand=algorand, app_id=args.app_id, default_sender=admin.address)
+    algod = algorand.client.algod
+
+    if args.archive:
+        digest = archive(algorand, app_client, args.poll_id, sender=admin.address)
+        logger.info(f"Archived poll {args.poll_id}, results digest {digest.hex()}")
+
+    voter_storage = poll_voter_storage(algod, args.app_id, args.poll_id)
+    if args.db:
+        voters = voters_from_index(args.db, args.app_id, args.poll_id)
+    elif args.addresses:
+        voters = [line.strip() for line in args.addresses.read_text().splitlines() if line.strip()]
+    elif voter_storage == VOTER_STORAGE_BOX:
+        voters = voters_from_boxes(algod, args.app_id, args.poll_id)
+    else:
+        parser.error("local-state polls need --db or --addresses to find their voters")
+
+    deleted = sweep(
+        app_client,
+        args.poll_id,
+        voters,
+        voter_storage=voter_storage,
+        max_workers=args.max_workers,
+    )
+    logger.info(f"Deleted {deleted} voter record(s) of poll {args.poll_id}")
+
+    if args.withdraw:
+        # The fee covers the inner payment as well
+        composer = app_client.new_group().withdraw_reclaimed(
+            params=algokit_utils.CommonAppCallParams(
+                static_fee=algokit_utils.AlgoAmount(micro_algo=2 * constants.MIN_TXN_FEE)
+            )
+        )
+        result = telemetry.send(algod, "withdraw_reclaimed", composer)
+        logger.info(f"Withdrew {result.returns[-1].value} microalgo to {admin.address}")
+    clients.log_stats()
+    telemetry.flush()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
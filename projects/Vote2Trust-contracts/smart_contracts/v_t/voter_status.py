@@ -0,0 +1,193 @@
+"""
+Reads the status of many voters of a poll at once through simulated get_voter_status_for calls.
+
+Addresses are split into maximum-size groups of get_voter_status_for calls, and the
+groups are simulated concurrently. Nothing is signed or sent, so a scan costs no fees.
+The result is a VoterStatusTable: one packed status word per address in an unsigned
+array, with the contract's bit layout decoded on demand.
+
+Usage: python -m smart_contracts.v_t.voter_status --app-id 1234 --poll-id 0 addresses.txt
+"""
+
+import argparse
+import array
+import dataclasses
+import logging
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
+logger = logging.getLogger(__name__)
+
+# Local-state voters are foreign accounts, and an app call can reference at most 4
+VOTERS_PER_CALL = 4
+# Protocol limit on transactions in an atomic group
+MAX_GROUP_SIZE = 16
+DEFAULT_MAX_WORKERS = 16
+
+# Bit layout of the contract's status word
+REGISTERED_BIT = 0
+COMMITTED_BIT = 1
+REVEALED_BIT = 2
+CHOICE_SHIFT = 8
+
+T = TypeVar("T")
+
+
+def _chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@dataclasses.dataclass
+class VoterStatusTable:
+    """Status words of a poll's voters, in the order the addresses were given."""
+
+    addresses: list[str]
+    status: array.array  # 'Q', one word per address
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def _bits(self, bit: int) -> list[bool]:
+        return [bool(word >> bit & 1) for word in self.status]
+
+    @property
+    def registered(self) -> list[bool]:
+        return self._bits(REGISTERED_BIT)
+
+    @property
+    def committed(self) -> list[bool]:
+        return self._bits(COMMITTED_BIT)
+
+    @property
+    def revealed(self) -> list[bool]:
+        return self._bits(REVEALED_BIT)
+
+    @property
+    def choices(self) -> list[int | None]:
+        """Revealed choice per voter; None where the voter has not revealed."""
+        return [
+            word >> CHOICE_SHIFT & 0xFF if word >> REVEALED_BIT & 1 else None for word in self.status
+        ]
+
+    def pending_reveals(self) -> list[str]:
+        """Voters who committed but have not revealed yet."""
+        mask = 1 << COMMITTED_BIT | 1 << REVEALED_BIT
+        return [
+            address
+            for address, word in zip(self.addresses, self.status)
+            if word & mask == 1 << COMMITTED_BIT
+        ]
+
+    def counts(self) -> dict[str, int]:
+        return {
+            "voters": len(self),
+            "registered": sum(self.registered),
+            "committed": sum(self.committed),
+            "revealed": sum(self.revealed),
+        }
+
+    def to_numpy(self) -> Any:
+        """
+        The table as a NumPy structured array with address, registered, committed,
+        revealed and choice fields. NumPy is not a dependency of this project, so it
+        has to be installed separately.
+        """
+        import numpy as np
+
+        status = np.frombuffer(self.status, dtype=np.uint64)
+        table = np.empty(
+            len(self),
+            dtype=[
+                ("address", "U58"),
+                ("registered", "?"),
+                ("committed", "?"),
+                ("revealed", "?"),
+                ("choice", "u1"),
+            ],
+        )
+        table["address"] = self.addresses
+        table["registered"] = status >> REGISTERED_BIT & 1
+        table["committed"] = status >> COMMITTED_BIT & 1
+        table["revealed"] = status >> REVEALED_BIT & 1
+        table["choice"] = status >> CHOICE_SHIFT & 0xFF
+        return table
+
+
+def plan_groups(addresses: Sequence[str]) -> list[list[Sequence[str]]]:
+    """Splits addresses into full groups of get_voter_status_for calls."""
+    calls = list(_chunks(addresses, VOTERS_PER_CALL))
+    return [list(group) for group in _chunks(calls, MAX_GROUP_SIZE)]
+
+
+def _simulate_group(
+    app_client: "Vote2TrustClient", poll_id: int, calls: Sequence[Sequence[str]]
+) -> list[int]:
+    composer = app_client.new_group()
+    for call in calls:
+        composer = composer.get_voter_status_for(args=(poll_id, list(call)))
+    # The simulator resolves the voters' local state or boxes itself, so no references
+    # are listed and nothing has to be signed
+    result = composer.simulate(allow_unnamed_resources=True, skip_signatures=True)
+    return [word for abi_return in result.returns for word in abi_return.value]
+
+
+def scan_voter_status(
+    app_client: "Vote2TrustClient",
+    poll_id: int,
+    addresses: Sequence[str],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> VoterStatusTable:
+    """Reads the status of every address, simulating groups concurrently."""
+    groups = plan_groups(addresses)
+    logger.info(
+        f"Reading {len(addresses)} voter(s) of poll {poll_id} in {len(groups)} group(s) "
+        f"with {max_workers} worker(s)"
+    )
+    status = array.array("Q")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for words in executor.map(lambda calls: _simulate_group(app_client, poll_id, calls), groups):
+            status.extend(words)
+    return VoterStatusTable(list(addresses), status)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app-id", type=int, required=True)
+    parser.add_argument("--poll-id", type=int, required=True)
+    parser.add_argument("addresses", type=Path, help="file with one voter address per line")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument(
+        "--pending-reveals", action="store_true", help="print voters who committed but did not reveal"
+    )
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    from smart_contracts._helpers import clients
+    from smart_contracts.artifacts.v_t.v_t_client import Vote2TrustClient
+
+    load_dotenv()
+    algorand = clients.algorand_client()
+    # Simulation still checks that the sender can pay the fees it would be charged
+    sender = algorand.account.from_environment("DEPLOYER")
+    app_client = Vote2TrustClient(algorand=algorand, app_id=args.app_id, default_sender=sender.address)
+    addresses = [line.strip() for line in args.addresses.read_text().splitlines() if line.strip()]
+
+    table = scan_voter_status(app_client, args.poll_id, addresses, max_workers=args.max_workers)
+    if args.pending_reveals:
+        print("\n".join(table.pending_reveals()))
+    else:
+        print(table.counts())
+    clients.log_stats()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
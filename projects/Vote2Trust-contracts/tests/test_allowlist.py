@@ -0,0 +1,85 @@
+import hashlib
+import json
+
+import pytest
+from algosdk import account, encoding
+
+from smart_contracts.v_t import allowlist
+from smart_contracts.v_t.allowlist import HASH_SIZE, build_tree, read_addresses, write_proofs
+
+
+def _addresses(count: int) -> list[str]:
+    return [account.generate_account()[1] for _ in range(count)]
+
+
+def _verify(root: bytes, address: str, proof: bytes) -> bool:
+    """Mirror of the contract's is_allowlisted."""
+    assert len(proof) % HASH_SIZE == 0
+    node = hashlib.sha256(b"\x00" + encoding.decode_address(address)).digest()
+    for offset in range(0, len(proof), HASH_SIZE):
+        sibling = proof[offset : offset + HASH_SIZE]
+        if int.from_bytes(node, "big") < int.from_bytes(sibling, "big"):
+            node = hashlib.sha256(b"\x01" + node + sibling).digest()
+        else:
+            node = hashlib.sha256(b"\x01" + sibling + node).digest()
+    return node == root
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 13])
+def test_every_proof_verifies_against_the_root(tmp_path, monkeypatch, count: int) -> None:
+    # Small chunks, so pairs and writes cross chunk boundaries
+    monkeypatch.setattr(allowlist, "_CHUNK_NODES", 2)
+    addresses = _addresses(count)
+    tree = build_tree(iter(addresses), tmp_path)
+
+    proofs = list(tree.proofs())
+
+    assert [index for index, _ in proofs] == list(range(count))
+    assert all(_verify(tree.root, address, proof) for address, (_, proof) in zip(addresses, proofs))
+
+
+def test_proof_does_not_verify_for_another_address(tmp_path) -> None:
+    addresses = _addresses(4)
+    tree = build_tree(iter(addresses), tmp_path)
+    (_, proof), *_ = tree.proofs()
+    assert not _verify(tree.root, _addresses(1)[0], proof)
+
+
+def test_single_voter_root_is_its_leaf(tmp_path) -> None:
+    (address,) = _addresses(1)
+    tree = build_tree(iter([address]), tmp_path)
+    assert tree.root == allowlist.leaf_hash(address)
+    assert list(tree.proofs()) == [(0, b"")]
+
+
+def test_build_tree_rejects_empty_allowlist(tmp_path) -> None:
+    with pytest.raises(ValueError, match="without any addresses"):
+        build_tree(iter([]), tmp_path)
+
+
+def test_read_addresses_skips_header_and_blank_rows(tmp_path) -> None:
+    addresses = _addresses(2)
+    path = tmp_path / "voters.csv"
+    path.write_text(f"address,name\n{addresses[0]},a\n\n{addresses[1]}\n")
+    assert list(read_addresses(path)) == addresses
+
+
+def test_read_addresses_reports_invalid_address(tmp_path) -> None:
+    path = tmp_path / "voters.csv"
+    path.write_text(f"{_addresses(1)[0]}\nnot-an-address\n")
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_addresses(path))
+
+
+def test_write_proofs_writes_one_line_per_voter(tmp_path) -> None:
+    addresses = _addresses(3)
+    path = tmp_path / "voters.csv"
+    path.write_text("\n".join(addresses) + "\n")
+    tree = build_tree(read_addresses(path), tmp_path / "tree")
+    output = tmp_path / "proofs.jsonl"
+
+    write_proofs(path, tree, output)
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["address"] for line in lines] == addresses
+    assert all(_verify(tree.root, line["address"], bytes.fromhex(line["proof"])) for line in lines)
@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers import build_cache
+from smart_contracts._helpers.build_cache import (
+    MANIFEST_FILE_NAME,
+    collect_sources,
+    compute_key,
+    is_up_to_date,
+    write_manifest,
+)
+
+FLAGS = ["--optimization-level=2"]
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    package = tmp_path / "app"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "contract.py").write_text(
+        "import json\nfrom app import helpers\nfrom .constants import LIMIT\n"
+    )
+    (package / "helpers.py").write_text("from app.nested.deep import VALUE\n")
+    (package / "constants.py").write_text("LIMIT = 1\n")
+    (package / "unused.py").write_text("UNUSED = 1\n")
+    (package / "nested").mkdir()
+    (package / "nested" / "__init__.py").write_text("")
+    (package / "nested" / "deep.py").write_text("from ..constants import LIMIT\nVALUE = LIMIT\n")
+    return tmp_path
+
+
+@pytest.fixture
+def output_dir(tmp_path: Path) -> Path:
+    directory = tmp_path / "artifacts"
+    directory.mkdir()
+    (directory / "App.approval.teal").write_text("#pragma version 10\n")
+    (directory / "App.arc56.json").write_text("{}\n")
+    return directory
+
+
+def test_collect_sources_follows_project_imports(project: Path) -> None:
+    sources = collect_sources(project / "app" / "contract.py", project)
+    assert [str(path.relative_to(project)) for path in sources] == [
+        "app/__init__.py",
+        "app/constants.py",
+        "app/contract.py",
+        "app/helpers.py",
+        "app/nested/__init__.py",
+        "app/nested/deep.py",
+    ]
+
+
+def test_key_changes_with_imported_sources_and_flags(project: Path) -> None:
+    contract = project / "app" / "contract.py"
+    key = compute_key(contract, project, FLAGS)
+
+    assert compute_key(contract, project, FLAGS).digest == key.digest
+    (project / "app" / "unused.py").write_text("UNUSED = 2\n")
+    assert compute_key(contract, project, FLAGS).digest == key.digest
+    assert compute_key(contract, project, [*FLAGS, "--debug-level=2"]).digest != key.digest
+    (project / "app" / "nested" / "deep.py").write_text("VALUE = 2\n")
+    assert compute_key(contract, project, FLAGS).digest != key.digest
+
+
+def test_key_changes_with_toolchain(project: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    contract = project / "app" / "contract.py"
+    key = compute_key(contract, project, FLAGS)
+    monkeypatch.setattr(build_cache, "toolchain_versions", lambda: {"puyapy": "0.0.0"})
+    assert compute_key(contract, project, FLAGS).digest != key.digest
+
+
+def test_up_to_date_after_writing_manifest(project: Path, output_dir: Path) -> None:
+    key = compute_key(project / "app" / "contract.py", project, FLAGS)
+    assert not is_up_to_date(output_dir, key)
+
+    write_manifest(output_dir, key)
+
+    assert is_up_to_date(output_dir, key)
+    manifest = json.loads((output_dir / MANIFEST_FILE_NAME).read_text())
+    assert sorted(manifest["artifacts"]) == ["App.approval.teal", "App.arc56.json"]
+
+
+def test_modified_or_missing_artifacts_are_stale(project: Path, output_dir: Path) -> None:
+    key = compute_key(project / "app" / "contract.py", project, FLAGS)
+    write_manifest(output_dir, key)
+
+    (output_dir / "App.approval.teal").write_text("#pragma version 11\n")
+    assert not is_up_to_date(output_dir, key)
+
+    write_manifest(output_dir, key)
+    (output_dir / "App.arc56.json").unlink()
+    assert not is_up_to_date(output_dir, key)
+
+
+def test_unreadable_or_old_manifests_are_stale(project: Path, output_dir: Path) -> None:
+    key = compute_key(project / "app" / "contract.py", project, FLAGS)
+    manifest_path = output_dir / MANIFEST_FILE_NAME
+
+    manifest_path.write_text("{not json")
+    assert not is_up_to_date(output_dir, key)
+
+    write_manifest(output_dir, key)
+    manifest = json.loads(manifest_path.read_text())
+    manifest_path.write_text(json.dumps({**manifest, "version": build_cache.MANIFEST_VERSION + 1}))
+    assert not is_up_to_date(output_dir, key)
+
+
+def test_manifest_without_artifacts_is_stale(project: Path, tmp_path: Path) -> None:
+    key = compute_key(project / "app" / "contract.py", project, FLAGS)
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    write_manifest(empty, key)
+    assert not is_up_to_date(empty, key)
@@ -0,0 +1,88 @@
+import hashlib
+import sqlite3
+
+import pytest
+from algosdk import account
+
+from smart_contracts.v_t import commitments
+from smart_contracts.v_t.commitments import Commitment, commitment
+from smart_contracts.v_t.indexer import TallyIndexer
+
+APP_ID = 1234
+POLL_ID = 0
+
+
+def test_commitment_matches_contract_hash() -> None:
+    salt = bytes(range(32))
+    assert commitment(2, salt) == hashlib.sha256(b"\x00" * 7 + b"\x02" + salt).digest()
+
+
+def test_read_votes_skips_header(tmp_path) -> None:
+    address = account.generate_account()[1]
+    path = tmp_path / "votes.csv"
+    path.write_text(f"address,choice\n{address},1\n\n{address}, 2\n")
+    assert list(commitments.read_votes(path)) == [(address, 1), (address, 2)]
+
+
+def test_read_votes_reports_bad_row_width(tmp_path) -> None:
+    address = account.generate_account()[1]
+    path = tmp_path / "votes.csv"
+    path.write_text(f"{address},1\n{address}\n")
+    with pytest.raises(ValueError, match=r"votes.csv:2: expected address,choice, got 1 field"):
+        list(commitments.read_votes(path))
+
+
+def test_read_votes_reports_bad_choice(tmp_path) -> None:
+    address = account.generate_account()[1]
+    path = tmp_path / "votes.csv"
+    path.write_text(f"{address},1\n{address},yes\n")
+    with pytest.raises(ValueError, match=r"votes.csv:2: choice 'yes' is not a number"):
+        list(commitments.read_votes(path))
+
+
+def test_generate_then_audit(tmp_path) -> None:
+    votes = [(account.generate_account()[1], index % 3) for index in range(10)]
+    path = tmp_path / "commitments.bin"
+    assert commitments.generate(votes, path, workers=1) == 10
+    records = list(commitments.read_commitments(path))
+    assert [(record.address, record.choice) for record in records] == votes
+    assert commitments.audit(path, workers=1) == (10, [])
+
+
+def test_audit_revealed_from_indexer_db(tmp_path) -> None:
+    db_path = tmp_path / "tallies.sqlite"
+    TallyIndexer(db_path, APP_ID).close()
+    honest, cheater, pending = (account.generate_account()[1] for _ in range(3))
+    salt = bytes(32)
+    db = sqlite3.connect(db_path)
+    with db:
+        db.executemany(
+            "INSERT INTO voters"
+            " (app_id, poll_id, address, revealed, choice, commit_hash, salt, last_round)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+            [
+                (APP_ID, POLL_ID, honest, 1, 1, commitment(1, salt), salt),
+                (APP_ID, POLL_ID, cheater, 1, 2, commitment(1, salt), salt),
+                (APP_ID, POLL_ID, pending, 0, None, commitment(0, salt), None),
+            ],
+        )
+    db.close()
+
+    revealed = list(commitments.read_revealed(db_path, APP_ID, POLL_ID))
+    assert sorted(vote.address for vote in revealed) == sorted([honest, cheater])
+    count, failed = commitments.audit_revealed(revealed, workers=1)
+    assert count == 2
+    assert failed == [Commitment(cheater, 2, salt, commitment(1, salt))]
+
+
+def test_audit_revealed_keeps_failures_in_order_across_chunks(monkeypatch) -> None:
+    monkeypatch.setattr(commitments, "CHUNK_RECORDS", 3)
+    salt = bytes(32)
+    address = account.generate_account()[1]
+    votes = [
+        Commitment(address, index % 3, salt, commitment(index % 3 if index % 4 else 9, salt))
+        for index in range(10)
+    ]
+    count, failed = commitments.audit_revealed(votes, workers=2)
+    assert count == 10
+    assert failed == [votes[0], votes[4], votes[8]]
@@ -0,0 +1,60 @@
+import pytest
+
+from smart_contracts._helpers import confirmation
+from smart_contracts._helpers.confirmation import wait_for_confirmations
+
+
+class FakeAlgod:
+    """A chain that is already at last_round, with txids confirmed in the given rounds."""
+
+    def __init__(self, last_round: int, confirmed: dict[str, int], failures: int = 0) -> None:
+        self.last_round = last_round
+        self.confirmed = confirmed
+        self.failures = failures
+        self.scanned: list[int] = []
+
+    def status(self) -> dict:
+        return {"last-round": self.last_round}
+
+    def status_after_block(self, round_: int) -> dict:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("node unavailable")
+        return {"last-round": self.last_round}
+
+    def get_block_txids(self, round_: int) -> dict:
+        self.scanned.append(round_)
+        return {"blockTxids": [txid for txid, block in self.confirmed.items() if block == round_]}
+
+    def pending_transaction_info(self, txid: str) -> dict:
+        return {"confirmed-round": self.confirmed.get(txid, 0)}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(confirmation, "RETRY_BASE_SECONDS", 0.0)
+
+
+def test_scans_from_first_round() -> None:
+    algod = FakeAlgod(last_round=20, confirmed={"a": 12, "b": 15})
+    infos = wait_for_confirmations(algod, ["a", "b"], first_round=10)  # type: ignore[arg-type]
+    assert [info["confirmed-round"] for info in infos] == [12, 15]
+    assert algod.scanned == [10, 11, 12, 13, 14, 15]
+
+
+def test_retries_node_errors() -> None:
+    algod = FakeAlgod(last_round=20, confirmed={"a": 11}, failures=3)
+    (info,) = wait_for_confirmations(algod, ["a"], first_round=10)  # type: ignore[arg-type]
+    assert info["confirmed-round"] == 11
+
+
+def test_fails_pending_futures_after_repeated_errors() -> None:
+    algod = FakeAlgod(last_round=20, confirmed={"a": 11}, failures=confirmation.MAX_SCAN_FAILURES)
+    with pytest.raises(ConnectionError):
+        wait_for_confirmations(algod, ["a"], first_round=10)  # type: ignore[arg-type]
+
+
+def test_expired_transaction_fails() -> None:
+    algod = FakeAlgod(last_round=20, confirmed={})
+    with pytest.raises(confirmation.ConfirmationError):
+        wait_for_confirmations(algod, ["a"], first_round=10, wait_rounds=2)  # type: ignore[arg-type]
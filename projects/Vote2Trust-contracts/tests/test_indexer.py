@@ -0,0 +1,187 @@
+import sqlite3
+from typing import Any
+
+import msgpack
+from algosdk import abi, account, encoding
+
+from smart_contracts.v_t.commitments import commitment
+from smart_contracts.v_t.indexer import RETURN_PREFIX, FixtureBlockSource, TallyIndexer, decode_block
+
+APP_ID = 1234
+OTHER_APP_ID = 99
+POLL_ID = 0
+ADMIN = account.generate_account()[1]
+
+
+def _call(
+    signature: str, sender: str, *args: Any, app_id: int = APP_ID, returns: bytes | None = None
+) -> dict:
+    method = abi.Method.from_signature(signature)
+    signed: dict[str, Any] = {
+        "txn": {
+            "type": "appl",
+            "apid": app_id,
+            "snd": encoding.decode_address(sender),
+            "apaa": [method.get_selector()]
+            + [arg.type.encode(value) for arg, value in zip(method.args, args, strict=True)],
+        }
+    }
+    if returns is not None:
+        signed["dt"] = {"lg": [RETURN_PREFIX + returns]}
+    return signed
+
+
+def _block(*txns: dict) -> dict[str, Any]:
+    # Round trip through msgpack like a block fetched from algod
+    return decode_block(msgpack.packb({"block": {"txns": list(txns)}}))
+
+
+def _create_poll(options: int = 3) -> dict:
+    return _call(
+        "create_poll(string,string,string[],uint64,uint64)uint64",
+        ADMIN,
+        "Poll",
+        "Description",
+        [f"Option {index}" for index in range(options)],
+        3600,
+        3600,
+        returns=POLL_ID.to_bytes(8, "big"),
+    )
+
+
+def _rows(db_path, query: str) -> list[tuple]:
+    db = sqlite3.connect(db_path)
+    try:
+        return db.execute(query).fetchall()
+    finally:
+        db.close()
+
+
+def test_full_poll_is_indexed(tmp_path) -> None:
+    db_path = tmp_path / "tallies.sqlite"
+    honest, cheater = (account.generate_account()[1] for _ in range(2))
+    salt = bytes(range(32))
+    blocks = [
+        _block(
+            _create_poll(),
+            _call("start_registration(uint64,byte[],uint64,uint64)void", ADMIN, POLL_ID, b"", 0, 0),
+        ),
+        _block(*(_call("register_voter(uint64)void", voter, POLL_ID) for voter in (honest, cheater))),
+        _block(
+            _call("start_commit_phase(uint64)void", ADMIN, POLL_ID),
+            _call("commit_vote(uint64,byte[],byte[])void", honest, POLL_ID, commitment(1, salt), b""),
+            _call("commit_vote(uint64,byte[],byte[])void", cheater, POLL_ID, commitment(0, salt), b""),
+        ),
+        _block(
+            _call("start_reveal_phase(uint64)void", ADMIN, POLL_ID),
+            _call("reveal_vote(uint64,uint64,byte[])void", honest, POLL_ID, 1, salt),
+            _call("reveal_vote(uint64,uint64,byte[])void", cheater, POLL_ID, 2, salt),
+            _call("complete_voting(uint64)void", ADMIN, POLL_ID),
+        ),
+    ]
+
+    indexer = TallyIndexer(db_path, APP_ID)
+    applied = [indexer.process_block(round_, block) for round_, block in enumerate(blocks, start=10)]
+    assert indexer.last_round == 13
+    indexer.close()
+
+    assert applied == [2, 2, 3, 4]
+    assert _rows(db_path, "SELECT voting_phase, option_count, total_voters, total_votes FROM polls") == [
+        (4, 3, 2, 2)
+    ]
+    assert _rows(db_path, "SELECT option, votes FROM tallies ORDER BY option") == [(0, 0), (1, 1), (2, 1)]
+    voters = {
+        address: rest
+        for address, *rest in _rows(
+            db_path, "SELECT address, revealed, choice, salt, commitment_valid, last_round FROM voters"
+        )
+    }
+    assert voters == {honest: [1, 1, salt, 1, 13], cheater: [1, 2, salt, 0, 13]}
+
+
+def test_batch_reveals_record_each_salt(tmp_path) -> None:
+    db_path = tmp_path / "tallies.sqlite"
+    voters = [account.generate_account()[1] for _ in range(3)]
+    salts = [bytes([index]) * 32 for index in range(3)]
+    indexer = TallyIndexer(db_path, APP_ID)
+    indexer.process_block(
+        1,
+        _block(
+            _create_poll(),
+            *(
+                _call("commit_vote(uint64,byte[],byte[])void", voter, POLL_ID, commitment(0, salt), b"")
+                for voter, salt in zip(voters, salts)
+            ),
+            _call(
+                "reveal_votes_batch(uint64,address[],uint64[],byte[][])void",
+                ADMIN,
+                POLL_ID,
+                voters,
+                [0, 0, 0],
+                salts,
+            ),
+        ),
+    )
+    indexer.close()
+
+    assert _rows(db_path, "SELECT total_votes FROM polls") == [(3,)]
+    assert sorted(_rows(db_path, "SELECT address, salt, commitment_valid FROM voters")) == sorted(
+        (voter, salt, 1) for voter, salt in zip(voters, salts)
+    )
+
+
+def test_other_apps_and_unknown_calls_are_ignored(tmp_path) -> None:
+    indexer = TallyIndexer(tmp_path / "tallies.sqlite", APP_ID)
+    payment = {"txn": {"type": "pay", "snd": encoding.decode_address(ADMIN)}}
+    other_app = _call("register_voter(uint64)void", ADMIN, POLL_ID, app_id=OTHER_APP_ID)
+    unknown = _call("unknown_method(uint64)void", ADMIN, POLL_ID)
+    no_return = _create_poll()
+    del no_return["dt"]
+
+    assert indexer.process_block(5, _block(payment, other_app, unknown, no_return)) == 1
+    assert indexer.db.execute("SELECT COUNT(*) FROM polls").fetchone() == (0,)
+    assert indexer.last_round == 5
+    indexer.close()
+
+
+def test_run_resumes_after_the_checkpoint(tmp_path) -> None:
+    fixtures = tmp_path / "blocks"
+    fixtures.mkdir()
+    voters = [account.generate_account()[1] for _ in range(3)]
+    blocks = {
+        1: {"block": {"txns": [_create_poll()]}},
+        2: {"block": {"txns": [_call("register_voter(uint64)void", voters[0], POLL_ID)]}},
+        3: {"block": {"txns": [_call("register_voter(uint64)void", voters[1], POLL_ID)]}},
+        4: {"block": {"txns": [_call("register_voter(uint64)void", voters[2], POLL_ID)]}},
+    }
+    for round_, block in blocks.items():
+        (fixtures / f"{round_}.msgpack").write_bytes(msgpack.packb(block))
+    db_path = tmp_path / "tallies.sqlite"
+
+    indexer = TallyIndexer(db_path, APP_ID)
+    indexer.run(FixtureBlockSource(fixtures), until_round=2)
+    assert indexer.last_round == 2
+    indexer.close()
+
+    # Rerunning from round 1 must not apply rounds 1 and 2 a second time
+    indexer = TallyIndexer(db_path, APP_ID)
+    indexer.run(FixtureBlockSource(fixtures), from_round=1)
+    assert indexer.last_round == 4
+    indexer.close()
+    assert _rows(db_path, "SELECT total_voters FROM polls") == [(3,)]
+
+
+def test_salt_column_is_added_to_old_databases(tmp_path) -> None:
+    db_path = tmp_path / "tallies.sqlite"
+    db = sqlite3.connect(db_path)
+    db.execute(
+        "CREATE TABLE voters (app_id INTEGER NOT NULL, poll_id INTEGER NOT NULL, address TEXT NOT NULL,"
+        " registered INTEGER NOT NULL DEFAULT 0, committed INTEGER NOT NULL DEFAULT 0,"
+        " revealed INTEGER NOT NULL DEFAULT 0, choice INTEGER, commit_hash BLOB,"
+        " commitment_valid INTEGER, last_round INTEGER NOT NULL, PRIMARY KEY (app_id, poll_id, address))"
+    )
+    db.close()
+
+    TallyIndexer(db_path, APP_ID).close()
+
+    assert "salt" in {row[1] for row in _rows(db_path, "PRAGMA table_info(voters)")}
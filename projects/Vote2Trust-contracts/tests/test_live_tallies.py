@@ -0,0 +1,45 @@
+import asyncio
+import collections
+
+from smart_contracts.v_t.live_tallies import TallyHub
+
+POLL = (1234, 0)
+
+
+def test_created_poll_starts_at_zero() -> None:
+    hub = TallyHub()
+    hub.apply(10, {POLL: 3}, {})
+    assert hub.tallies[POLL] == [0, 0, 0]
+    assert hub.round == 10
+
+
+def test_deltas_accumulate() -> None:
+    hub = TallyHub()
+    hub.apply(10, {POLL: 3}, {POLL: collections.Counter({0: 2, 2: 1})})
+    hub.apply(11, {}, {POLL: collections.Counter({2: 4})})
+    assert hub.tallies[POLL] == [2, 0, 5]
+
+
+def test_unknown_poll_grows_to_highest_option() -> None:
+    hub = TallyHub()
+    hub.apply(10, {}, {POLL: collections.Counter({4: 1})})
+    assert hub.tallies[POLL] == [0, 0, 0, 0, 1]
+
+
+def test_empty_batch_is_skipped() -> None:
+    hub = TallyHub()
+    mailbox, _, _ = hub.subscribe(POLL)
+    # An empty reveal_votes_batch yields an empty Counter for its poll
+    hub.apply(10, {}, {POLL: collections.Counter()})
+    assert POLL not in hub.tallies
+    assert not mailbox.pending
+    assert hub.round == 10
+
+
+def test_mailbox_merges_pending_deltas() -> None:
+    hub = TallyHub()
+    mailbox, round_, tallies = hub.subscribe(POLL)
+    assert (round_, tallies) == (0, [])
+    hub.apply(10, {POLL: 2}, {POLL: collections.Counter({0: 1})})
+    hub.apply(11, {}, {POLL: collections.Counter({0: 2, 1: 1})})
+    assert asyncio.run(mailbox.take()) == (11, {0: 3, 1: 1})
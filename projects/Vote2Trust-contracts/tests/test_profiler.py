@@ -0,0 +1,67 @@
+import base64
+import dataclasses
+
+from smart_contracts._helpers import profiler
+from smart_contracts._helpers.profiler import MethodProfile, find_regressions
+
+
+def _profile(method: str, opcode_cost: int = 100) -> MethodProfile:
+    return MethodProfile(
+        method=method,
+        opcode_cost=opcode_cost,
+        budget_added=700,
+        budget_headroom=700 - opcode_cost,
+        transactions=1,
+        min_fee=1_000,
+        state_reads=2,
+        reads_by_type={"box": 2},
+        state_writes=1,
+        writes_by_type={"box": 1},
+        resources_accessed={},
+    )
+
+
+def test_missing_baseline_is_a_regression(tmp_path) -> None:
+    baseline = profiler.load_baseline(tmp_path)
+    assert baseline == {}
+    regressions = find_regressions({"commit_vote": _profile("commit_vote")}, baseline, 0.05)
+    assert regressions == ["commit_vote: no baseline, run profile with --update-baseline"]
+
+
+def test_method_missing_from_baseline_is_a_regression() -> None:
+    baseline = {"reveal_vote": dataclasses.asdict(_profile("reveal_vote"))}
+    profiles = {"reveal_vote": _profile("reveal_vote"), "commit_vote": _profile("commit_vote")}
+    assert find_regressions(profiles, baseline, 0.05) == [
+        "commit_vote: no baseline, run profile with --update-baseline"
+    ]
+
+
+def test_threshold(tmp_path) -> None:
+    profiler.write_baseline(tmp_path, {"commit_vote": _profile("commit_vote", opcode_cost=100)})
+    baseline = profiler.load_baseline(tmp_path)
+    within = {"commit_vote": _profile("commit_vote", opcode_cost=105)}
+    assert find_regressions(within, baseline, 0.05) == []
+    over = {"commit_vote": _profile("commit_vote", opcode_cost=106)}
+    assert find_regressions(over, baseline, 0.05) == ["commit_vote.opcode_cost: 100 -> 106"]
+
+
+def test_state_reads_are_counted_from_traced_opcodes() -> None:
+    # int 1; app_global_get; box_get; app_local_get_ex; app_global_put
+    program = bytes([0x0A, 0x81, 0x01, 0x64, 0xBE, 0x63, 0x67])
+    trace = {"approval-program-trace": [{"pc": pc} for pc in (1, 3, 4, 5, 6, 3)]}
+    deployed = [
+        {"txn-result": {"txn": {"txn": {"type": "appl", "apid": 7}}}, "exec-trace": trace},
+        {"txn-result": {"txn": {"txn": {"type": "pay"}}}},
+    ]
+    assert profiler._state_reads(deployed, {7: program}.__getitem__) == {"global": 2, "box": 1, "local": 1}
+
+    created = [
+        {
+            "txn-result": {
+                "txn": {"txn": {"type": "appl", "apap": base64.b64encode(program).decode()}},
+                "application-index": 8,
+            },
+            "exec-trace": trace,
+        }
+    ]
+    assert profiler._state_reads(created, {}.__getitem__) == {"global": 2, "box": 1, "local": 1}
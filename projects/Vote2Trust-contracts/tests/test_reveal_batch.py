@@ -0,0 +1,119 @@
+import types
+
+import algokit_utils
+import pytest
+from algosdk import account
+
+from smart_contracts.v_t import reveal_batch
+from smart_contracts.v_t.reveal_batch import (
+    APP_CALL_BUDGET,
+    ESTIMATED_REVEAL_COST,
+    Reveal,
+    RevealCost,
+    plan_groups,
+)
+from smart_contracts.v_t.storage import (
+    VOTER_STORAGE_BOX,
+    VOTER_STORAGE_LOCAL,
+    poll_box_key,
+    tally_box_key,
+    voter_box_key,
+)
+
+POLL_ID = 3
+# Protocol limit on an app call's references
+MAX_REFERENCES = 8
+# Cheap enough that only references limit a call
+CHEAP_COST = RevealCost(per_call=100, per_reveal=100)
+
+
+class RecordingComposer:
+    def __init__(self) -> None:
+        self.calls: list[tuple[tuple, algokit_utils.CommonAppCallParams]] = []
+
+    def reveal_votes_batch(
+        self, *, args: tuple, params: algokit_utils.CommonAppCallParams
+    ) -> "RecordingComposer":
+        self.calls.append((args, params))
+        return self
+
+
+def _reveals(count: int) -> list[Reveal]:
+    return [
+        Reveal(account.generate_account()[1], index % 3, bytes([index]) * 32) for index in range(count)
+    ]
+
+
+def _send(
+    monkeypatch: pytest.MonkeyPatch, voter_storage: int, reveals: list[Reveal]
+) -> RecordingComposer:
+    composer = RecordingComposer()
+    app_client = types.SimpleNamespace(
+        new_group=lambda: composer,
+        algorand=types.SimpleNamespace(client=types.SimpleNamespace(algod=None)),
+    )
+    monkeypatch.setattr(reveal_batch.telemetry, "send", lambda algod, operation, composer: composer)
+    (calls,) = plan_groups(reveals, voter_storage, CHEAP_COST)
+    reveal_batch._send_group(app_client, POLL_ID, calls, voter_storage, None)  # type: ignore[arg-type]
+    return composer
+
+
+def test_plan_groups_fills_calls_and_groups() -> None:
+    reveals = _reveals(100)
+    local = plan_groups(reveals, VOTER_STORAGE_LOCAL, CHEAP_COST)
+    assert [len(group) for group in local] == [16, 9]
+    assert all(len(call) <= 4 for group in local for call in group)
+    box = plan_groups(reveals, VOTER_STORAGE_BOX, CHEAP_COST)
+    assert [len(group) for group in box] == [16, 1]
+    assert [len(call) for call in box[0]] == [6] * 16
+    assert [reveal for group in box for call in group for reveal in call] == reveals
+
+
+@pytest.mark.parametrize("voter_storage", [VOTER_STORAGE_LOCAL, VOTER_STORAGE_BOX])
+def test_plan_groups_stays_within_pooled_budget(voter_storage: int) -> None:
+    reveals = _reveals(100)
+    cost = ESTIMATED_REVEAL_COST
+    groups = plan_groups(reveals, voter_storage, cost)
+    for group in groups:
+        assert len(group) <= 16
+        spent = sum(cost.per_call + len(call) * cost.per_reveal for call in group)
+        assert spent <= len(group) * APP_CALL_BUDGET
+    # Every group but the last is as full as the pooled budget of 16 calls allows
+    full = 16 * (APP_CALL_BUDGET - cost.per_call) // cost.per_reveal
+    assert [sum(map(len, group)) for group in groups[:-1]] == [full] * (len(groups) - 1)
+    assert [reveal for group in groups for call in group for reveal in call] == reveals
+
+
+def test_plan_groups_rejects_reveal_over_call_budget() -> None:
+    with pytest.raises(ValueError, match="more than one app call's budget"):
+        plan_groups(_reveals(1), VOTER_STORAGE_LOCAL, RevealCost(per_call=400, per_reveal=400))
+
+
+def test_reveal_cost_from_profile_baseline() -> None:
+    baseline = {
+        "reveal_votes_batch": {"opcode_cost": 300},
+        "reveal_votes_batch[2]": {"opcode_cost": 480},
+    }
+    assert RevealCost.from_baseline(baseline) == RevealCost(per_call=120, per_reveal=180)
+    assert RevealCost.from_baseline({"reveal_votes_batch": {"opcode_cost": 300}}) == ESTIMATED_REVEAL_COST
+
+
+def test_local_mode_references_voter_accounts(monkeypatch: pytest.MonkeyPatch) -> None:
+    reveals = _reveals(4)
+    ((args, params),) = _send(monkeypatch, VOTER_STORAGE_LOCAL, reveals).calls
+    assert args[1] == [reveal.voter for reveal in reveals]
+    assert params.account_references == [reveal.voter for reveal in reveals]
+    assert [box.name for box in params.box_references] == [poll_box_key(POLL_ID), tally_box_key(POLL_ID)]
+
+
+def test_box_mode_references_voter_boxes(monkeypatch: pytest.MonkeyPatch) -> None:
+    reveals = _reveals(6)
+    ((args, params),) = _send(monkeypatch, VOTER_STORAGE_BOX, reveals).calls
+    assert args[1] == [reveal.voter for reveal in reveals]
+    assert not params.account_references
+    assert [box.name for box in params.box_references] == [
+        poll_box_key(POLL_ID),
+        tally_box_key(POLL_ID),
+        *(voter_box_key(POLL_ID, reveal.voter) for reveal in reveals),
+    ]
+    assert len(params.box_references) <= MAX_REFERENCES
@@ -0,0 +1,152 @@
+import asyncio
+
+from smart_contracts.v_t.scheduler import PhaseScheduler, PollState, follow_apps
+
+APP_ID = 1234
+
+
+class FakeClock:
+    """Jumps straight to the end of every sleep."""
+
+    def __init__(self) -> None:
+        self.time = 0.0
+
+    def now(self) -> float:
+        return self.time
+
+    async def sleep(self, seconds: float) -> None:
+        self.time += max(seconds, 0.0)
+        await asyncio.sleep(0)
+
+
+class FakePhaseClient:
+    def __init__(self, states: dict[int, PollState], *, failures: int = 0) -> None:
+        self.states = states
+        self.transitions: list[tuple[int, str]] = []
+        # Reads that raise before the node "recovers"
+        self.failures = failures
+
+    def _read(self) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("algod unavailable")
+
+    async def poll_state(self, app_id: int, poll_id: int) -> PollState:
+        self._read()
+        return self.states[poll_id]
+
+    async def poll_count(self, app_id: int) -> int:
+        self._read()
+        return len(self.states)
+
+    async def transition(self, app_id: int, poll_id: int, method: str) -> None:
+        state = self.states[poll_id]
+        self.states[poll_id] = PollState(state.voting_phase + 1, state.commit_deadline, state.reveal_deadline)
+        self.transitions.append((poll_id, method))
+
+
+async def _run_until(scheduler: PhaseScheduler, done) -> None:
+    runner = asyncio.create_task(scheduler.run())
+    try:
+        for _ in range(1_000):
+            if done():
+                return
+            await asyncio.sleep(0)
+        raise AssertionError("scheduler did not finish")
+    finally:
+        runner.cancel()
+
+
+def test_fires_transitions_at_deadlines() -> None:
+    async def scenario() -> None:
+        clock = FakeClock()
+        client = FakePhaseClient({0: PollState(2, 100, 200)})
+        scheduler = PhaseScheduler(client, clock=clock)
+        await scheduler.track(APP_ID, 0)
+        await _run_until(scheduler, lambda: scheduler.tracked == 0)
+        assert client.transitions == [(0, "start_reveal_phase"), (0, "complete_voting")]
+        assert clock.now() >= 201
+
+    asyncio.run(scenario())
+
+
+def test_registration_phase_poll_waits_for_rescan() -> None:
+    async def scenario() -> None:
+        client = FakePhaseClient({0: PollState(1, 100, 200)})
+        scheduler = PhaseScheduler(client, clock=FakeClock())
+        await scheduler.track(APP_ID, 0)
+        assert (scheduler.tracked, scheduler.waiting) == (1, 1)
+
+        # Still registering: the rescan keeps it waiting
+        await scheduler.rescan_waiting()
+        assert (scheduler.tracked, scheduler.waiting) == (1, 1)
+
+        # The admin closes registration by hand
+        client.states[0] = PollState(2, 100, 200)
+        await scheduler.rescan_waiting()
+        assert scheduler.waiting == 0
+        await _run_until(scheduler, lambda: scheduler.tracked == 0)
+        assert client.transitions == [(0, "start_reveal_phase"), (0, "complete_voting")]
+
+    asyncio.run(scenario())
+
+
+def test_registration_close_time_is_scheduled() -> None:
+    async def scenario() -> None:
+        client = FakePhaseClient({0: PollState(1, 100, 200)})
+        scheduler = PhaseScheduler(client, clock=FakeClock())
+        await scheduler.track(APP_ID, 0, registration_closes_at=50)
+        assert scheduler.waiting == 0
+        await _run_until(scheduler, lambda: scheduler.tracked == 0)
+        assert [method for _, method in client.transitions] == [
+            "start_commit_phase",
+            "start_reveal_phase",
+            "complete_voting",
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_finished_polls_are_dropped() -> None:
+    async def scenario() -> None:
+        client = FakePhaseClient({0: PollState(4, 100, 200), 1: PollState(6, 100, 200)})
+        scheduler = PhaseScheduler(client, clock=FakeClock())
+        await scheduler.track(APP_ID, 0)
+        await scheduler.track(APP_ID, 1)
+        assert (scheduler.tracked, scheduler.waiting) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_failed_rescan_keeps_polls_waiting() -> None:
+    async def scenario() -> None:
+        client = FakePhaseClient({0: PollState(1, 100, 200), 1: PollState(1, 100, 200)})
+        scheduler = PhaseScheduler(client, clock=FakeClock())
+        await scheduler.track(APP_ID, 0)
+        await scheduler.track(APP_ID, 1)
+        client.states[0] = PollState(2, 100, 200)
+        client.states[1] = PollState(2, 100, 200)
+
+        # One read fails: that poll keeps waiting, the other is planned
+        client.failures = 1
+        await scheduler.rescan_waiting()
+        assert (scheduler.tracked, scheduler.waiting) == (2, 1)
+
+        await scheduler.rescan_waiting()
+        assert scheduler.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_follow_apps_survives_a_failed_scan() -> None:
+    async def scenario() -> None:
+        client = FakePhaseClient({0: PollState(2, 100, 200)}, failures=1)
+        scheduler = PhaseScheduler(client, clock=FakeClock())
+        follower = asyncio.create_task(follow_apps(scheduler, client, [APP_ID], rescan_seconds=10))
+        try:
+            await _run_until(scheduler, lambda: len(client.transitions) == 2)
+        finally:
+            follower.cancel()
+        assert client.transitions == [(0, "start_reveal_phase"), (0, "complete_voting")]
+
+    asyncio.run(scenario())
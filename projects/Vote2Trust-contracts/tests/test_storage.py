@@ -0,0 +1,17 @@
+from smart_contracts.v_t import storage
+
+
+def test_voter_box_min_balance() -> None:
+    # 2,500 + 400 x (41 byte key + 40 byte packed record)
+    assert storage.voter_box_min_balance(1) == 34_900
+    assert storage.voter_box_min_balance(1_000) == 34_900_000
+
+
+def test_results_box_min_balance() -> None:
+    # 2,500 + 400 x (9 byte key + 8 byte final phase + 32 byte digest)
+    assert storage.results_box_min_balance() == 22_100
+
+
+def test_voter_local_min_balance() -> None:
+    # The opt-in plus one byte-slice slot; the five-key schema locked 264,000
+    assert storage.voter_local_min_balance() == 150_000
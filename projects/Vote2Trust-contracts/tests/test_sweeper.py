@@ -0,0 +1,64 @@
+import base64
+
+from algosdk import account
+
+from smart_contracts.v_t import sweeper
+from smart_contracts.v_t.storage import VOTER_STORAGE_BOX, VOTER_STORAGE_LOCAL, voter_box_key
+
+APP_ID = 1234
+POLL_ID = 2
+
+
+def _addresses(count: int) -> list[str]:
+    return [account.generate_account()[1] for _ in range(count)]
+
+
+def test_plan_groups_local() -> None:
+    voters = _addresses(70)
+    groups = sweeper.plan_groups(voters, VOTER_STORAGE_LOCAL)
+    assert [len(group) for group in groups] == [16, 2]
+    assert all(len(call) <= sweeper.LOCAL_VOTERS_PER_CALL for group in groups for call in group)
+    assert [voter for group in groups for call in group for voter in call] == voters
+
+
+def test_plan_groups_box() -> None:
+    voters = _addresses(120)
+    groups = sweeper.plan_groups(voters, VOTER_STORAGE_BOX)
+    assert [len(group) for group in groups] == [16, 2]
+    assert [len(call) for call in groups[0]] == [sweeper.BOX_VOTERS_PER_CALL] * 16
+    assert [voter for group in groups for call in group for voter in call] == voters
+
+
+def test_plan_groups_empty() -> None:
+    assert sweeper.plan_groups([], VOTER_STORAGE_BOX) == []
+
+
+class PagingAlgod:
+    def __init__(self, names: list[bytes], page_size: int) -> None:
+        self.names = names
+        self.page_size = page_size
+        self.requests: list[dict] = []
+
+    def algod_request(self, method: str, path: str, params: dict) -> dict:
+        assert (method, path) == ("GET", f"/applications/{APP_ID}/boxes")
+        self.requests.append(dict(params))
+        prefix = base64.b64decode(params["prefix"].removeprefix("b64:"))
+        matching = [name for name in self.names if name.startswith(prefix)]
+        start = int(params.get("next", 0))
+        page = matching[start : start + self.page_size]
+        response = {"boxes": [{"name": base64.b64encode(name).decode()} for name in page]}
+        if start + self.page_size < len(matching):
+            response["next-token"] = str(start + self.page_size)
+        return response
+
+
+def test_voters_from_boxes_pages_through_the_poll_prefix() -> None:
+    voters = _addresses(5)
+    others = _addresses(3)
+    names = [voter_box_key(POLL_ID, voter) for voter in voters]
+    names += [voter_box_key(POLL_ID + 1, voter) for voter in others]
+    algod = PagingAlgod(names, page_size=2)
+
+    assert sweeper.voters_from_boxes(algod, APP_ID, POLL_ID) == voters  # type: ignore[arg-type]
+    assert len(algod.requests) == 3
+    assert "next" not in algod.requests[0]
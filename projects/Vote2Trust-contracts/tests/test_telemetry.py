@@ -0,0 +1,127 @@
+import base64
+from collections.abc import Iterator
+from typing import Any
+
+import algokit_utils
+import msgpack
+import pytest
+from algosdk import account, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+from algosdk.error import AlgodHTTPError
+
+from smart_contracts._helpers import telemetry
+
+LAST_ROUND = 100
+
+
+class StubAlgod:
+    """Confirms everything it is sent in the next round, or rejects it with error."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.sent: list[transaction.SignedTransaction] = []
+
+    def suggested_params(self) -> transaction.SuggestedParams:
+        return transaction.SuggestedParams(
+            fee=0, first=LAST_ROUND, last=LAST_ROUND + 10, gh="A" * 44, gen="test", min_fee=1_000
+        )
+
+    def send_raw_transaction(self, txn: bytes | str) -> str:
+        if self.error is not None:
+            raise self.error
+        # A group is its signed transactions' msgpack maps back to back
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(base64.b64decode(txn))
+        self.sent.extend(transaction.SignedTransaction.undictify(signed) for signed in unpacker)
+        return self.sent[-1].get_txid()
+
+    def status(self) -> dict[str, Any]:
+        return {"last-round": LAST_ROUND}
+
+    def status_after_block(self, round_num: int) -> dict[str, Any]:
+        return {"last-round": round_num + 1}
+
+    def pending_transaction_info(self, txid: str) -> dict[str, Any]:
+        assert txid in {signed.get_txid() for signed in self.sent}
+        return {"confirmed-round": LAST_ROUND + 1, "pool-error": ""}
+
+
+def _composer(algod: StubAlgod, payments: int) -> algokit_utils.TransactionComposer:
+    private_key, address = account.generate_account()
+    signer = AccountTransactionSigner(private_key)
+    composer = algokit_utils.TransactionComposer(
+        algod=algod,  # type: ignore[arg-type]
+        get_signer=lambda _: signer,
+        get_suggested_params=algod.suggested_params,
+    )
+    for index in range(payments):
+        composer.add_payment(
+            algokit_utils.PaymentParams(
+                sender=address,
+                signer=signer,
+                receiver=address,
+                amount=algokit_utils.AlgoAmount(micro_algo=index),
+                static_fee=algokit_utils.AlgoAmount(micro_algo=1_000 * (index + 1)),
+            )
+        )
+    return composer
+
+
+@pytest.fixture
+def mode(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(telemetry, "metrics", telemetry.Metrics())
+    telemetry.settings.cache_clear()
+    monkeypatch.setenv("TELEMETRY_MODE", "basic")
+    yield
+    telemetry.settings.cache_clear()
+
+
+def _stages(name: str) -> set[str]:
+    return {series["labels"]["stage"] for series in telemetry.metrics.to_json()["histograms"].get(name, [])}
+
+
+@pytest.mark.usefixtures("mode")
+def test_send_times_every_stage_and_records_fees() -> None:
+    algod = StubAlgod()
+
+    result = telemetry.send(algod, "create_polls", _composer(algod, 2))  # type: ignore[arg-type]
+
+    assert result.tx_ids == [signed.get_txid() for signed in algod.sent]
+    assert len(result.confirmations) == 2
+    assert result.group_id
+    assert _stages(telemetry.LATENCY_METRIC) == {"build", "sign", "submit", "confirm"}
+    (fees,) = telemetry.metrics.to_json()["histograms"][telemetry.FEE_METRIC]
+    assert fees["sum"] == 3_000
+
+
+@pytest.mark.usefixtures("mode")
+def test_failed_submit_is_counted_and_transformed() -> None:
+    algod = StubAlgod(error=AlgodHTTPError("logic eval error: assert failed pc=12"))
+    composer = _composer(algod, 1)
+    transformed = RuntimeError("decoded")
+    composer.register_error_transformer(lambda error: transformed)
+
+    with pytest.raises(RuntimeError) as raised:
+        telemetry.send(algod, "archive_poll", composer)  # type: ignore[arg-type]
+
+    assert raised.value is transformed
+    assert isinstance(raised.value.__cause__, AlgodHTTPError)
+    assert telemetry.metrics.to_json()["counters"][telemetry.ERROR_METRIC] == [
+        {"labels": {"operation": "archive_poll", "stage": "submit"}, "value": 1}
+    ]
+    assert _stages(telemetry.LATENCY_METRIC) == {"build", "sign"}
+
+
+@pytest.mark.usefixtures("mode")
+def test_off_mode_sends_without_recording(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TELEMETRY_MODE", "off")
+    sent = []
+
+    class Composer:
+        def send(self) -> str:
+            sent.append(True)
+            return "result"
+
+    assert telemetry.send(StubAlgod(), "create_polls", Composer()) == "result"  # type: ignore[arg-type]
+    assert sent == [True]
+    assert telemetry.metrics.to_json() == {"histograms": {}, "counters": {}}
@@ -1,14 +1,19 @@
 import React, { useState, useEffect } from 'react'
 import { useWallet } from '@txnlab/use-wallet-react'
 import { useSnackbar } from 'notistack'
-import { Vote2TrustFactory } from '../contracts/VT'
+import { Vote2TrustFactory, voteCommitment } from '../contracts/VT'
+
+// The app hosts many polls; this dashboard shows one of them
+const POLL_ID = Number(import.meta.env.VITE_POLL_ID ?? 0)
+// Dashboard phase for each contract phase (see PHASE_* in contracts/VT)
+const PHASES: Poll['phase'][] = ['created', 'registration', 'commit', 'reveal', 'completed', 'completed', 'stopped']
 
 export interface Poll {
   id: string
   title: string
   description: string
   options: string[]
-  phase: 'registration' | 'commit' | 'reveal' | 'tally' | 'completed'
+  phase: 'created' | 'registration' | 'commit' | 'reveal' | 'tally' | 'completed' | 'stopped'
   startTime: Date
   commitEndTime: Date
   revealEndTime: Date
@@ -24,7 +29,7 @@ const RealVotingDashboard: React.FC = () => {
   const { enqueueSnackbar } = useSnackbar()
   
   const [currentPoll, setCurrentPoll] = useState<Poll>({
-    id: 'poll-1',
+    id: String(POLL_ID),
     title: 'Loading...',
     description: 'Loading poll information...',
     options: ['Yes', 'No', 'Abstain'],
@@ -84,38 +89,31 @@ const RealVotingDashboard: React.FC = () => {
 
   const loadPollInfo = async (client: any) => {
     try {
-      const pollInfo = await client.get_poll_info()
-      const voteCounts = await client.get_vote_counts()
+      const pollInfo = await client.get_poll_info(POLL_ID)
+      const voteCounts = await client.get_vote_counts(POLL_ID)
       
       // Parse poll information
       const title = pollInfo.return[0] || 'No Poll Active'
       const description = pollInfo.return[1] || 'No description available'
-      const optionsJson = pollInfo.return[2] || '["Yes", "No", "Abstain"]'
-      const phase = pollInfo.return[3] || 0
-      const totalVoters = pollInfo.return[4] || 0
-      const totalVotes = pollInfo.return[5] || 0
-      const commitDeadline = pollInfo.return[6] || 0
+      const optionCount = Number(pollInfo.return[2] || 0)
+      const phase = Number(pollInfo.return[3] || 0)
+      const totalVotes = Number(pollInfo.return[5] || 0)
+      const commitDeadline = Number(pollInfo.return[6] || 0)
       
-      let options: string[] = ['Yes', 'No', 'Abstain']
-      try {
-        options = JSON.parse(optionsJson)
-      } catch (e) {
-        console.warn('Failed to parse options JSON:', e)
-      }
+      // Option labels are read separately, a page at a time
+      const options: string[] = (await client.get_options(POLL_ID, 0, optionCount)).return
       
-      // Map phase number to string
-      const phaseMap = ['registration', 'commit', 'reveal', 'tally', 'completed']
-      const currentPhase = phaseMap[phase] || 'registration'
+      const currentPhase = PHASES[phase] || 'created'
       
       // Get voter status if user is connected
       let voterStatus = { isRegistered: false, hasCommitted: false, hasRevealed: false }
       if (activeAddress) {
         try {
-          const status = await client.get_voter_status()
+          const status = await client.get_voter_status(POLL_ID)
           voterStatus = {
-            isRegistered: status.return[0] === 1,
-            hasCommitted: status.return[1] === 1,
-            hasRevealed: status.return[2] === 1
+            isRegistered: Number(status.return[0]) === 1,
+            hasCommitted: Number(status.return[1]) === 1,
+            hasRevealed: Number(status.return[2]) === 1
           }
         } catch (e) {
           console.warn('Could not get voter status:', e)
@@ -126,12 +124,12 @@ const RealVotingDashboard: React.FC = () => {
       const results: { [option: string]: number } = {}
       if (voteCounts.return) {
         options.forEach((option, index) => {
-          results[option] = voteCounts.return[index] || 0
+          results[option] = Number(voteCounts.return[index] || 0)
         })
       }
       
       setCurrentPoll({
-        id: 'poll-1',
+        id: String(POLL_ID),
         title,
         description,
         options,
@@ -160,7 +158,7 @@ const RealVotingDashboard: React.FC = () => {
       setLoading(true)
       enqueueSnackbar('Registering as voter...', { variant: 'info' })
       
-      await contractClient.send.register_voter()
+      await contractClient.send.register_voter({ poll_id: POLL_ID })
       
       setCurrentPoll(prev => ({ ...prev, isRegistered: true }))
       enqueueSnackbar('Successfully registered as voter!', { variant: 'success' })
@@ -183,10 +181,11 @@ const RealVotingDashboard: React.FC = () => {
       setLoading(true)
       enqueueSnackbar('Committing vote...', { variant: 'info' })
       
-      // Create hash of vote + salt (simplified for demo)
-      const voteHash = new Uint8Array([voteChoice, ...new TextEncoder().encode(salt)])
+      // The contract checks sha256(itob(choice) || salt) when the vote is revealed
+      const voteHash = await voteCommitment(voteChoice, new TextEncoder().encode(salt))
       
-      await contractClient.send.commit_vote({ vote_hash: voteHash })
+      // Open registration, so no allowlist proof
+      await contractClient.send.commit_vote({ poll_id: POLL_ID, vote_hash: voteHash, proof: new Uint8Array() })
       
       setCurrentPoll(prev => ({ ...prev, hasCommitted: true }))
       enqueueSnackbar('Vote committed successfully!', { variant: 'success' })
@@ -212,6 +211,7 @@ const RealVotingDashboard: React.FC = () => {
       const saltBytes = new TextEncoder().encode(salt)
       
       await contractClient.send.reveal_vote({ 
+        poll_id: POLL_ID,
         vote_choice: voteChoice, 
         salt: saltBytes 
       })
@@ -241,16 +241,22 @@ const RealVotingDashboard: React.FC = () => {
       
       switch (newPhase) {
         case 'registration':
-          await contractClient.send.start_registration()
+          // Open registration, voter records in local state
+          await contractClient.send.start_registration({
+            poll_id: POLL_ID,
+            voter_root: new Uint8Array(),
+            eligible_voters: 0,
+            voter_storage: 0
+          })
           break
         case 'commit':
-          await contractClient.send.start_commit_phase()
+          await contractClient.send.start_commit_phase({ poll_id: POLL_ID })
           break
         case 'reveal':
-          await contractClient.send.start_reveal_phase()
+          await contractClient.send.start_reveal_phase({ poll_id: POLL_ID })
           break
         case 'completed':
-          await contractClient.send.complete_voting()
+          await contractClient.send.complete_voting({ poll_id: POLL_ID })
           break
       }
       
@@ -267,6 +273,10 @@ const RealVotingDashboard: React.FC = () => {
 
   const getPhaseStatus = () => {
     switch (currentPoll.phase) {
+      case 'created':
+        return { status: 'Registration Not Open', color: 'text-gray-600', bgColor: 'bg-gray-100' }
+      case 'stopped':
+        return { status: 'Voting Stopped', color: 'text-red-600', bgColor: 'bg-red-100' }
       case 'registration':
         return { status: 'Voter Registration Open', color: 'text-blue-600', bgColor: 'bg-blue-100' }
       case 'commit':
@@ -1,7 +1,28 @@
 // Real Algorand contract client for Vote2Trust
+//
+// Hand-written stand-in for the typed client `algokit project link` generates from
+// the contract's app spec. Its methods mirror the contract's ABI: every poll method
+// takes the poll id, and commitments are voteCommitment(choice, salt).
 import { AlgorandClient } from '@algorandfoundation/algokit-utils'
 import { getAlgodConfigFromViteEnvironment } from '../utils/network/getAlgoClientConfigs'
 
+// Poll phases as stored in the contract's PollRecord
+export const PHASE_CREATED = 0
+export const PHASE_REGISTRATION = 1
+export const PHASE_COMMIT = 2
+export const PHASE_REVEAL = 3
+export const PHASE_COMPLETED = 4
+export const PHASE_ARCHIVED = 5
+export const PHASE_STOPPED = 6
+
+// The vote_hash commit_vote expects and reveal_vote checks: sha256(itob(choice) || salt)
+export async function voteCommitment(choice: number, salt: Uint8Array): Promise<Uint8Array> {
+  const message = new Uint8Array(8 + salt.length)
+  new DataView(message.buffer).setBigUint64(0, BigInt(choice))
+  message.set(salt, 8)
+  return new Uint8Array(await crypto.subtle.digest('SHA-256', message))
+}
+
 export interface Vote2TrustFactory {
   deploy(options: {
     onSchemaBreak: any;
@@ -18,21 +39,28 @@ export interface Vote2TrustClient {
     create_poll(params: {
       title: string;
       description: string;
-      options: string;
+      options: string[];
       commit_duration: number;
       reveal_duration: number;
+    }): Promise<{ return: number }>;
+    start_registration(params: {
+      poll_id: number;
+      voter_root: Uint8Array;
+      eligible_voters: number;
+      voter_storage: number;
     }): Promise<any>;
-    start_registration(): Promise<any>;
-    register_voter(): Promise<any>;
-    start_commit_phase(): Promise<any>;
-    commit_vote(params: { vote_hash: Uint8Array }): Promise<any>;
-    start_reveal_phase(): Promise<any>;
-    reveal_vote(params: { vote_choice: number; salt: Uint8Array }): Promise<any>;
-    complete_voting(): Promise<any>;
+    register_voter(params: { poll_id: number }): Promise<any>;
+    start_commit_phase(params: { poll_id: number }): Promise<any>;
+    commit_vote(params: { poll_id: number; vote_hash: Uint8Array; proof: Uint8Array }): Promise<any>;
+    start_reveal_phase(params: { poll_id: number }): Promise<any>;
+    reveal_vote(params: { poll_id: number; vote_choice: number; salt: Uint8Array }): Promise<any>;
+    complete_voting(params: { poll_id: number }): Promise<any>;
   };
-  get_poll_info(): Promise<{ return: any[] }>;
-  get_vote_counts(): Promise<{ return: number[] }>;
-  get_voter_status(): Promise<{ return: number[] }>;
+  // (title, description, option_count, voting_phase, total_voters, total_votes, commit_deadline)
+  get_poll_info(poll_id: number): Promise<{ return: any[] }>;
+  get_options(poll_id: number, offset: number, limit: number): Promise<{ return: string[] }>;
+  get_vote_counts(poll_id: number): Promise<{ return: number[] }>;
+  get_voter_status(poll_id: number): Promise<{ return: number[] }>;
 }
 
 // Real factory implementation using Algorand
@@ -74,14 +102,14 @@ class RealVote2TrustClient implements Vote2TrustClient {
   private pollInfo = {
     title: "Sample Governance Vote",
     description: "Should we implement the new feature X in our protocol?",
-    options: '["Yes", "No", "Abstain"]',
-    phase: 1, // Registration phase
+    options: ["Yes", "No", "Abstain"],
+    phase: PHASE_REGISTRATION,
     totalVoters: 0,
     totalVotes: 0,
     commitDeadline: Math.floor(Date.now() / 1000) + 3600
   };
 
-  private voteCounts = [0, 0, 0, 0, 0];
+  private voteCounts = [0, 0, 0];
   private voterStatus = [0, 0, 0]; // [registered, committed, revealed]
   private committedHashes: { [key: string]: Uint8Array } = {};
 
@@ -95,30 +123,33 @@ class RealVote2TrustClient implements Vote2TrustClient {
         ...this.pollInfo,
         title: params.title,
         description: params.description,
-        options: params.options
+        options: params.options,
+        phase: PHASE_CREATED
       };
-      return { success: true, txId: "mock_tx_" + Date.now() };
+      this.voteCounts = params.options.map(() => 0);
+      // The stand-in hosts a single poll, id 0
+      return { success: true, txId: "mock_tx_" + Date.now(), return: 0 };
     },
 
-    start_registration: async () => {
-      console.log("Starting registration phase on blockchain");
+    start_registration: async (params: any) => {
+      console.log("Starting registration phase on blockchain:", params);
       await new Promise(resolve => setTimeout(resolve, 500));
-      this.pollInfo.phase = 1;
+      this.pollInfo.phase = PHASE_REGISTRATION;
       return { success: true, txId: "mock_tx_" + Date.now() };
     },
 
-    register_voter: async () => {
-      console.log("Registering voter on blockchain");
+    register_voter: async (params: any) => {
+      console.log("Registering voter on blockchain:", params);
       await new Promise(resolve => setTimeout(resolve, 500));
       this.voterStatus[0] = 1;
       this.pollInfo.totalVoters += 1;
       return { success: true, txId: "mock_tx_" + Date.now() };
     },
 
-    start_commit_phase: async () => {
-      console.log("Starting commit phase on blockchain");
+    start_commit_phase: async (params: any) => {
+      console.log("Starting commit phase on blockchain:", params);
       await new Promise(resolve => setTimeout(resolve, 500));
-      this.pollInfo.phase = 2;
+      this.pollInfo.phase = PHASE_COMMIT;
       return { success: true, txId: "mock_tx_" + Date.now() };
     },
 
@@ -131,10 +162,10 @@ class RealVote2TrustClient implements Vote2TrustClient {
       return { success: true, txId: "mock_tx_" + Date.now() };
     },
 
-    start_reveal_phase: async () => {
-      console.log("Starting reveal phase on blockchain");
+    start_reveal_phase: async (params: any) => {
+      console.log("Starting reveal phase on blockchain:", params);
       await new Promise(resolve => setTimeout(resolve, 500));
-      this.pollInfo.phase = 3;
+      this.pollInfo.phase = PHASE_REVEAL;
       return { success: true, txId: "mock_tx_" + Date.now() };
     },
 
@@ -142,8 +173,8 @@ class RealVote2TrustClient implements Vote2TrustClient {
       console.log("Revealing vote on blockchain:", params);
       await new Promise(resolve => setTimeout(resolve, 1000));
       
-      // Verify the hash matches the committed hash
-      const expectedHash = new Uint8Array([params.vote_choice, ...params.salt]);
+      // Verify the hash matches the committed hash, as the contract does
+      const expectedHash = await voteCommitment(params.vote_choice, params.salt);
       const committedHash = this.committedHashes["current_user"];
       
       if (committedHash && this.arraysEqual(expectedHash, committedHash)) {
@@ -156,10 +187,10 @@ class RealVote2TrustClient implements Vote2TrustClient {
       }
     },
 
-    complete_voting: async () => {
-      console.log("Completing voting on blockchain");
+    complete_voting: async (params: any) => {
+      console.log("Completing voting on blockchain:", params);
       await new Promise(resolve => setTimeout(resolve, 500));
-      this.pollInfo.phase = 4;
+      this.pollInfo.phase = PHASE_COMPLETED;
       return { success: true, txId: "mock_tx_" + Date.now() };
     }
   };
@@ -172,14 +203,14 @@ class RealVote2TrustClient implements Vote2TrustClient {
     return true;
   }
 
-  async get_poll_info(): Promise<{ return: any[] }> {
+  async get_poll_info(_poll_id: number): Promise<{ return: any[] }> {
     // Simulate blockchain read
     await new Promise(resolve => setTimeout(resolve, 200));
     return {
       return: [
         this.pollInfo.title,
         this.pollInfo.description,
-        this.pollInfo.options,
+        this.pollInfo.options.length,
         this.pollInfo.phase,
         this.pollInfo.totalVoters,
         this.pollInfo.totalVotes,
@@ -188,12 +219,17 @@ class RealVote2TrustClient implements Vote2TrustClient {
     };
   }
 
-  async get_vote_counts(): Promise<{ return: number[] }> {
+  async get_options(_poll_id: number, offset: number, limit: number): Promise<{ return: string[] }> {
+    await new Promise(resolve => setTimeout(resolve, 200));
+    return { return: this.pollInfo.options.slice(offset, offset + limit) };
+  }
+
+  async get_vote_counts(_poll_id: number): Promise<{ return: number[] }> {
     await new Promise(resolve => setTimeout(resolve, 200));
     return { return: this.voteCounts };
   }
 
-  async get_voter_status(): Promise<{ return: number[] }> {
+  async get_voter_status(_poll_id: number): Promise<{ return: number[] }> {
     await new Promise(resolve => setTimeout(resolve, 200));
     return { return: this.voterStatus };
   }